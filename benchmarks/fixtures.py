@@ -0,0 +1,167 @@
+"""Synthetic FHIR, genomics, and OCR data for the benchmarks
+
+Every generator is seeded so that each run measures the same work.
+"""
+
+import random
+from typing import List
+
+import pandas as pd
+
+SYSTEMS = [
+    "http://loinc.org",
+    "http://snomed.info/sct",
+    "http://www.nlm.nih.gov/research/umls/rxnorm",
+]
+
+
+def coding(rng: random.Random, index: int) -> dict:
+    return {
+        "system": rng.choice(SYSTEMS),
+        "code": f"{rng.randint(1000, 99999)}-{index % 10}",
+        "display": f"Display {rng.randint(0, 500)}",
+    }
+
+
+def observation(rng: random.Random, index: int) -> dict:
+    return {
+        "id": f"obs-{index}",
+        "resourceType": "Observation",
+        "subject": {"reference": f"Patient/patient-{index % 1000}"},
+        "meta": {
+            "lastUpdated": "2021-02-24T12:58:32.058Z",
+            "tag": [
+                {"system": "http://lifeomic.com/fhir/dataset", "code": "proj"},
+                {"system": "http://lifeomic.com/fhir/source", "code": "src"},
+            ],
+        },
+        "code": {
+            "coding": [coding(rng, index), coding(rng, index + 1)],
+            "text": "Observation",
+        },
+        "valueQuantity": {
+            "value": rng.random() * 100,
+            "unit": "mg/dL",
+            "system": "http://unitsofmeasure.org",
+        },
+        # A mix of the partial dates and offsets found in FHIR
+        "effectiveDateTime": rng.choice(
+            [
+                f"20{rng.randint(10, 21)}",
+                f"20{rng.randint(10, 21)}-0{rng.randint(1, 9)}",
+                f"20{rng.randint(10, 21)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+                f"20{rng.randint(10, 21)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T12:00:00.000Z",
+                f"20{rng.randint(10, 21)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T12:00:00-05:00",
+            ]
+        ),
+    }
+
+
+def observations(count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    return [observation(rng, i) for i in range(count)]
+
+
+def observation_frame(count: int, seed: int = 0) -> pd.DataFrame:
+    return pd.DataFrame(observations(count, seed))
+
+
+def ids(count: int) -> List[str]:
+    return [f"00000000-0000-0000-0000-{i:012d}" for i in range(count)]
+
+
+def variants(count: int, seed: int = 0) -> List[dict]:
+    "Genomic short variants shaped like the ga4gh variant search results"
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"variant-{i}",
+            "chromosome": f"chr{rng.randint(1, 22)}",
+            "position": rng.randint(1, 10**8),
+            "reference": rng.choice("ACGT"),
+            "alternate": rng.choice("ACGT"),
+            "gene": f"GENE{rng.randint(1, 2000)}",
+            "zygosity": rng.choice(["heterozygous", "homozygous"]),
+            "vcf": {"qual": str(rng.randint(1, 60))},
+        }
+        for i in range(count)
+    ]
+
+
+def composite_pages(pages: int, buckets: int, keys: List[str]) -> List[dict]:
+    "Composite aggregation results as returned for each page"
+    return [
+        {
+            key: {
+                "after_key": {"value": f"{key}-{page}"},
+                "buckets": [
+                    {
+                        "key": {"value": f"{key}-{page}-{i}"},
+                        "doc_count": i + 1,
+                    }
+                    for i in range(buckets)
+                ],
+            }
+            for key in keys
+        }
+        for page in range(pages)
+    ]
+
+
+def block_frame(pages: int, lines: int, words: int) -> pd.DataFrame:
+    "Textract blocks (pages of lines of words) in shuffled order"
+    rows = []
+
+    for p in range(pages):
+        line_ids = [f"line-{p}-{l}" for l in range(lines)]
+        rows.append(
+            {
+                "Id": f"page-{p}",
+                "Page": p + 1,
+                "BlockType": "PAGE",
+                "Relationships": [{"Type": "CHILD", "Ids": line_ids}],
+            }
+        )
+
+        for l, line_id in enumerate(line_ids):
+            word_ids = [f"word-{p}-{l}-{w}" for w in range(words)]
+            rows.append(
+                {
+                    "Id": line_id,
+                    "Page": p + 1,
+                    "BlockType": "LINE",
+                    "Relationships": [{"Type": "CHILD", "Ids": word_ids}],
+                }
+            )
+            rows.extend(
+                {
+                    "Id": word_id,
+                    "Page": p + 1,
+                    "BlockType": "WORD",
+                    "Relationships": None,
+                }
+                for word_id in word_ids
+            )
+
+    random.Random(0).shuffle(rows)
+    return pd.DataFrame(rows).set_index("Id")
+
+
+def scroll_pages(records: List[dict], page_size: int) -> List[dict]:
+    "FSS scroll responses (ending with an empty page)"
+    chunks = [
+        records[i : i + page_size] for i in range(0, len(records), page_size)
+    ] + [[]]
+
+    return [
+        {
+            "_scroll_id": f"scroll-{i + 1}",
+            "hits": {
+                "total": {"value": len(records)},
+                "hits": [
+                    {"_source": record, "_id": record["id"]} for record in chunk
+                ],
+            },
+        }
+        for i, chunk in enumerate(chunks)
+    ]
@@ -0,0 +1,353 @@
+"""Benchmarks for the hot paths of the SDK
+
+Run from the repository root:
+
+    python benchmarks/run.py                  # compare with a fresh run of HEAD
+    python benchmarks/run.py --base master    # compare with a fresh run of master
+    python benchmarks/run.py -k expand        # only matching benchmarks
+    python benchmarks/run.py --save           # record timings locally
+    python benchmarks/run.py --baseline benchmarks/baseline.json
+
+Each benchmark is timed several times with the base revision (checked out in a
+temporary git worktree, in a new process) right before the working tree, so both
+see the same machine and load. The run fails when the median run is slower than
+the base revision's median by more than the threshold (25% by default).
+
+Timings are machine specific so none are committed. `--save` records them to an
+ignored local file that `--baseline` compares with instead of a base revision.
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa: E402
+import pandas as pd  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], None]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark. The decorated function does any setup and returns
+    the function that is timed."""
+
+    def register(setup: Callable[[], Callable[[], None]]):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+@benchmark("codeable_expand_column")
+def codeable_expand_column():
+    from phc.easy.codeable import Codeable
+
+    column = fixtures.observation_frame(5_000).code
+    return lambda: Codeable.expand_column(column)
+
+
+@benchmark("generic_codeable_to_dict")
+def generic_codeable_to_dict():
+    from phc.easy.codeable import generic_codeable_to_dict
+
+    records = fixtures.observations(5_000)
+    return lambda: [generic_codeable_to_dict(r["code"]) for r in records]
+
+
+@benchmark("frame_expand_dates")
+def frame_expand_dates():
+    from phc.easy.frame import Frame
+
+    frame = fixtures.observation_frame(20_000)[["id", "effectiveDateTime"]]
+    return lambda: Frame.expand(frame.copy())
+
+
+@benchmark("frame_expand_observations")
+def frame_expand_observations():
+    from phc.easy.frame import Frame
+
+    frame = fixtures.observation_frame(5_000)
+    return lambda: Frame.expand(frame.copy())
+
+
+@benchmark("build_queries_100k_ids")
+def build_queries_100k_ids():
+    from phc.easy.query.fhir_dsl_query import build_queries
+
+    query = {
+        "type": "select",
+        "columns": "*",
+        "from": [{"table": "observation"}],
+    }
+    ids = fixtures.ids(100_000)
+    return lambda: build_queries(query, patient_ids=ids)
+
+
+@benchmark("csv_writer_many_batches")
+def csv_writer_many_batches():
+    from phc.util.csv_writer import CSVWriter
+
+    frame = fixtures.observation_frame(500)[
+        ["id", "effectiveDateTime", "resourceType"]
+    ]
+    batches = [
+        # Later batches add columns
+        frame.assign(**{f"extra_{i}": i}) if i % 10 == 0 else frame
+        for i in range(50)
+    ]
+
+    def run():
+        with tempfile.TemporaryDirectory() as directory:
+            writer = CSVWriter(os.path.join(directory, "out.csv"))
+            for batch in batches:
+                writer.write(batch.copy())
+
+    return run
+
+
+@benchmark("api_cache_read_csv")
+def api_cache_read_csv():
+    from phc.easy.util.api_cache import APICache
+
+    directory = tempfile.mkdtemp()
+    filename = os.path.join(directory, "cache.csv")
+    pd.DataFrame(fixtures.variants(20_000)).assign(
+        date=fixtures.observation_frame(20_000).effectiveDateTime
+    ).to_csv(filename, index=False)
+
+    return lambda: APICache.read_csv(filename)
+
+
+@benchmark("reduce_composite_results")
+def reduce_composite_results():
+    from phc.easy.query.fhir_aggregation import FhirAggregation
+
+    pages = fixtures.composite_pages(
+        200, 100, ["meta.tag", "code.coding", "component.code.coding"]
+    )
+    return lambda: functools.reduce(
+        FhirAggregation.reduce_composite_results, pages, {}
+    )
+
+
+@benchmark("block_sort")
+def block_sort():
+    from phc.easy.ocr.block import Block
+
+    frame = fixtures.block_frame(pages=20, lines=50, words=10)
+    return lambda: Block.sort(frame)
+
+
+@benchmark("fhir_dsl_scroll_end_to_end")
+def fhir_dsl_scroll_end_to_end():
+    from phc.easy.auth import Auth
+    from phc.easy.query import Query
+    from phc.replay_adapter import ReplayAdapter
+
+    adapter = ReplayAdapter(repeat=True)
+    pages = fixtures.scroll_pages(fixtures.observations(10_000), 1_000)
+    for i, page in enumerate(pages):
+        adapter.add(
+            "POST",
+            "https://fhir/v1/fhir-search/projects/proj",
+            page,
+            params={"scroll": "true" if i == 0 else f"scroll-{i}"},
+        )
+
+    auth = Auth({"account": "bench", "project_id": "proj", "adapter": adapter})
+    query = {
+        "type": "select",
+        "columns": "*",
+        "from": [{"table": "observation"}],
+    }
+
+    return lambda: Query.execute_fhir_dsl(
+        query, all_results=True, auth_args=auth
+    )
+
+
+def measure(setup: Callable[[], Callable[[], None]], repeat: int) -> dict:
+    run = setup()
+    run()  # Warm up (imports, caches)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    return {"median": statistics.median(times), "min": min(times)}
+
+
+@contextlib.contextmanager
+def worktree(revision: str):
+    "Check out another revision in a temporary git worktree"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "source")
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", source, revision],
+            cwd=root,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+        try:
+            yield source
+        finally:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", source],
+                cwd=root,
+                check=True,
+            )
+
+
+def measure_source(source: str, name: str, repeat: int) -> dict:
+    "Time one benchmark with the SDK in another directory (in a new process)"
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "baseline.json")
+        subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--source",
+                source,
+                "--save",
+                output,
+                "-k",
+                name,
+                "--repeat",
+                str(repeat),
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+        with open(output, "r") as f:
+            return json.load(f)["results"].get(name, {})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-k", dest="pattern", default="")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument(
+        "--base",
+        default="HEAD",
+        help="Compare with a fresh run of this git revision",
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Compare with timings saved on this machine instead of --base",
+    )
+    parser.add_argument(
+        "--source", help="Time the SDK in this directory (used by --base)"
+    )
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        help="Only record the timings (to a local file)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.source:
+        sys.path.insert(0, args.source)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    regressions = []
+
+    with contextlib.ExitStack() as stack:
+        base_source = (
+            None
+            if args.save or args.baseline
+            else stack.enter_context(worktree(args.base))
+        )
+
+        for name, setup in BENCHMARKS.items():
+            if args.pattern not in name:
+                continue
+
+            if base_source:
+                # Timed right before the working tree so both see the same load
+                baseline[name] = measure_source(base_source, name, args.repeat)
+
+            # Silence progress output from the SDK while timing
+            with open(os.devnull, "w") as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    results[name] = measure(setup, args.repeat)
+                except ImportError as e:
+                    # e.g. code that an older revision doesn't have
+                    skipped = e
+                else:
+                    skipped = None
+                finally:
+                    sys.stdout = stdout
+
+            if skipped is not None:
+                print(f"{name:32} {'skipped':>13} ({skipped})")
+                continue
+
+            median = results[name]["median"]
+            previous = baseline.get(name, {}).get("median")
+            change = "" if previous is None else f"{median / previous - 1:+.1%}"
+            print(f"{name:32} {median * 1000:10.2f} ms {change:>8}")
+
+            if previous is not None and median / previous > 1 + args.threshold:
+                regressions.append(name)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "machine": {
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "processor": platform.machine(),
+                    },
+                    "results": {**baseline, **results},
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+            f.write("\n")
+        print(f"Saved timings to {args.save}")
+        return 0
+
+    if len(regressions) > 0:
+        print(
+            f"Slower than the baseline by more than {args.threshold:.0%}: "
+            + ", ".join(regressions)
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
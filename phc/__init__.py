@@ -2,11 +2,11 @@
 .. include:: ../README.md
 """
 
+import importlib
+
 import nest_asyncio
 from phc.session import Session
 from phc.api_response import ApiResponse
-import phc.services as services
-import phc.util as util
 
 # https://markhneedham.com/blog/2019/05/10/jupyter-runtimeerror-this-event-loop-is-already-running/
 nest_asyncio.apply()
@@ -19,3 +19,18 @@ __pdoc__ = {
     "api_response": False,
     "session": False,
 }
+
+# Sub-packages are imported on first access (e.g. `phc.services`) so that
+# `import phc` stays fast
+_LAZY_SUBMODULES = {"services", "util", "easy"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f"phc.{name}")
+
+    raise AttributeError(f"module 'phc' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_LAZY_SUBMODULES))
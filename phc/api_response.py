@@ -5,13 +5,6 @@ from typing import Callable, Any, Optional, Union
 from urllib.parse import urlparse, parse_qs
 import phc.errors as e
 
-try:
-    import pandas as _pd
-except ImportError:
-    _has_pandas = False
-else:
-    _has_pandas = True
-
 
 class ApiResponse:
     """Represents an API response.
@@ -113,7 +106,10 @@ class ApiResponse:
         ImportError
             If pandas is not installed
         """
-        if not _has_pandas:
+        # Imported on first use to keep `import phc` fast
+        try:
+            import pandas as _pd
+        except ImportError:
             raise ImportError("pandas is required")
 
         if mapFunc is not None:
@@ -1,11 +1,17 @@
 """A Python module for a base PHC web client."""
 
 import asyncio
+import copy
+import functools
+import json
 import os
 import platform
+import queue
 import sys
-from typing import Union, Dict, Any, Mapping
-from urllib.parse import urlencode, urljoin
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Dict, Any, Callable, Iterator, List, Mapping, Optional
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse
 from importlib import metadata
 
 import backoff
@@ -17,6 +23,27 @@ from phc.errors import ApiError, RequestError
 PHC_ACCESS_TOKEN_ENV = "PHC_ACCESS_TOKEN"
 PHC_REFRESH_TOKEN_ENV = "PHC_REFRESH_TOKEN"
 
+_DONE = object()
+
+
+def next_page_token(data: Any) -> Optional[str]:
+    """Find the token of the next page in a list response (or None)"""
+    if not isinstance(data, dict):
+        return None
+
+    next_url = (data.get("links") or {}).get("next")
+    if next_url:
+        return (
+            parse_qs(urlparse(next_url).query).get("nextPageToken") or [None]
+        )[0]
+
+    token = data.get("nextPageToken") or data.get("next_page_token")
+    if token and isinstance(token, dict):
+        # Some APIs return the token as an object
+        return json.dumps(token)
+
+    return token if isinstance(token, str) and token != "" else None
+
 
 class BaseClient:
     """Base client for making API requests."""
@@ -156,6 +183,122 @@ class BaseClient:
             headers,
         )
 
+    def _thread_client(self):
+        """A synchronous copy of this client that can be used from another
+        thread (it creates an event loop for that thread when needed)"""
+        client = copy.copy(self)
+        client.run_async = False
+        client._event_loop_ptr = None
+        return client
+
+    def _iter_list(
+        self,
+        list_page: Callable[["BaseClient", Any], ApiResponse],
+        items_key: Optional[str] = "items",
+        get_next_token: Optional[Callable[[ApiResponse, Any], Any]] = None,
+        prefetch: bool = True,
+    ) -> Iterator[Any]:
+        """Lazily iterate over the items of every page of a list endpoint
+
+        Arguments:
+            list_page {Callable} -- Fetch a page given a client and the page token (None for the first page)
+
+        Keyword Arguments:
+            items_key {str} -- The key of the items in each page or None if the page is a list (default: {"items"})
+            get_next_token {Callable} -- Find the next token given the response and current token (default: the nextPageToken)
+            prefetch {bool} -- Request the next page while the current one is consumed (default: {True})
+        """
+        # Pages are fetched with a synchronous copy of this client so that the
+        # prefetch thread gets its own event loop
+        client = self._thread_client()
+
+        def get_items(response: ApiResponse):
+            data = response.data
+            items = data if items_key is None else data.get(items_key)
+            return items or []
+
+        def get_token(response: ApiResponse, token):
+            if get_next_token is not None:
+                return get_next_token(response, token)
+
+            return next_page_token(response.data)
+
+        if not prefetch:
+            token = None
+            while True:
+                response = list_page(client, token)
+                yield from get_items(response)
+
+                token = get_token(response, token)
+                if token is None:
+                    return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            token = None
+            future = executor.submit(list_page, client, token)
+
+            while future is not None:
+                response = future.result()
+                token = get_token(response, token)
+                future = (
+                    executor.submit(list_page, client, token)
+                    if token is not None
+                    else None
+                )
+
+                yield from get_items(response)
+
+    @staticmethod
+    def _merge_iters(
+        make_iters: List[Callable[[], Iterator[Any]]],
+        max_concurrency: int = 8,
+        buffer_size: int = 10_000,
+    ) -> Iterator[Any]:
+        """Consume several iterators concurrently and yield their items as
+        they arrive (in no particular order)"""
+        items = queue.Queue(maxsize=buffer_size)
+        stopped = threading.Event()
+
+        def put(value):
+            # Give up once the consumer has stopped so threads can exit
+            while not stopped.is_set():
+                try:
+                    return items.put(value, timeout=0.1)
+                except queue.Full:
+                    continue
+
+        def consume(make_iter):
+            try:
+                for item in make_iter():
+                    if stopped.is_set():
+                        return
+                    put((None, item))
+            except Exception as e:
+                put((e, None))
+            finally:
+                put((None, _DONE))
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_concurrency, len(make_iters)))
+        ) as executor:
+            for make_iter in make_iters:
+                executor.submit(consume, make_iter)
+
+            try:
+                remaining = len(make_iters)
+                while remaining > 0:
+                    error, item = items.get()
+
+                    if error is not None:
+                        raise error
+
+                    if item is _DONE:
+                        remaining -= 1
+                    else:
+                        yield item
+            finally:
+                stopped.set()
+
     def _refresh_token(self):
         res = self._api_call_impl(
             url=self.session.api_url,
@@ -223,7 +366,7 @@ class BaseClient:
 
         Keyword Arguments:
             http_verb {str} -- The http verb (default: {'POST'})
-            upload_file {str|bytes} -- Path to a local file (default: {None})
+            upload_file {str|bytes|IO} -- Path to a local file, bytes, or a readable binary stream (default: {None})
             json {dict} -- The JSON request body (default: {None})
             data {str} -- Request body as raw string (default: None)
             headers {dict} -- Additional headers to provide in the request (default: {{}})
@@ -271,16 +414,24 @@ class BaseClient:
         return self._event_loop.run_until_complete(future)
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def _get_user_agent():
         """Construct the user-agent header with the package info,
-        Python version and OS version.
+        Python version and OS version. (Computed once since reading the
+        package metadata is slow relative to a request.)
 
         Returns:
             The user agent string.
             e.g. 'Python/3.6.7 phc-sdk-py/2.0.0 Darwin/17.7.0'
         """
+        try:
+            version = metadata.version(__package__)
+        except metadata.PackageNotFoundError:
+            # Running from a source checkout that is not installed
+            version = "unknown"
+
         # __name__ returns all classes, we only want the client
-        client = f"phc-sdk-py/{metadata.version(__package__)}"
+        client = f"phc-sdk-py/{version}"
         python_version = f"Python/{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
         system_info = f"{platform.system()}/{platform.release()}"
         user_agent_string = " ".join([python_version, client, system_info])
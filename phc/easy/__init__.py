@@ -1,52 +1,114 @@
-from phc.easy.abstract.fhir_service_item import FhirServiceItem
-from phc.easy.abstract.fhir_service_patient_item import FhirServicePatientItem
-from phc.easy.audit_event import AuditEvent
-from phc.easy.auth import Auth
-from phc.easy.care_plan import CarePlan
-from phc.easy.clinical_impression import ClinicalImpression
-from phc.easy.codeable import Codeable
-from phc.easy.composition import Composition
-from phc.easy.condition import Condition
-from phc.easy.consent import Consent
-from phc.easy.diagnostic_report import DiagnosticReport
-from phc.easy.document_reference import DocumentReference
-from phc.easy.encounter import Encounter
-from phc.easy.frame import Frame
-from phc.easy.goal import Goal
-from phc.easy.imaging_study import ImagingStudy
-from phc.easy.immunization import Immunization
-from phc.easy.media import Media
-from phc.easy.medication_administration import MedicationAdministration
-from phc.easy.medication_dispense import MedicationDispense
-from phc.easy.medication_request import MedicationRequest
-from phc.easy.medication_statement import MedicationStatement
-from phc.easy.observation import Observation
-from phc.easy.ocr import Ocr
-from phc.easy.omics.gene import Gene
-from phc.easy.omics.gene_set import GeneSet
-from phc.easy.omics.genomic_copy_number_variant import GenomicCopyNumberVariant
-from phc.easy.omics.genomic_expression import GenomicExpression
-from phc.easy.omics.genomic_short_variant import GenomicShortVariant
-from phc.easy.omics.genomic_structural_variant import GenomicStructuralVariant
-from phc.easy.omics.genomic_test import GenomicTest
-from phc.easy.option import Option
-from phc.easy.organization import Organization
-from phc.easy.patients import Patient
-from phc.easy.person import Person
-from phc.easy.practitioner import Practitioner
-from phc.easy.procedure import Procedure
-from phc.easy.procedure_request import ProcedureRequest
-from phc.easy.projects import Project
-from phc.easy.provenance import Provenance
-from phc.easy.query import Query
-from phc.easy.referral_request import ReferralRequest
-from phc.easy.sequence import Sequence
-from phc.easy.specimen import Specimen
+import importlib
+from typing import TYPE_CHECKING
 
-from phc.easy.summary.counts import SummaryCounts
-from phc.easy.summary.item_counts import SummaryItemCounts
-from phc.easy.summary.clinical_counts import SummaryClinicalCounts
-from phc.easy.summary.omics_counts import SummaryOmicsCounts
+if TYPE_CHECKING:
+    from phc.easy.abstract.fhir_service_item import FhirServiceItem
+    from phc.easy.abstract.fhir_service_patient_item import (
+        FhirServicePatientItem,
+    )
+    from phc.easy.audit_event import AuditEvent
+    from phc.easy.auth import Auth
+    from phc.easy.care_plan import CarePlan
+    from phc.easy.clinical_impression import ClinicalImpression
+    from phc.easy.codeable import Codeable
+    from phc.easy.composition import Composition
+    from phc.easy.condition import Condition
+    from phc.easy.consent import Consent
+    from phc.easy.diagnostic_report import DiagnosticReport
+    from phc.easy.document_reference import DocumentReference
+    from phc.easy.encounter import Encounter
+    from phc.easy.frame import Frame
+    from phc.easy.goal import Goal
+    from phc.easy.imaging_study import ImagingStudy
+    from phc.easy.immunization import Immunization
+    from phc.easy.media import Media
+    from phc.easy.medication_administration import MedicationAdministration
+    from phc.easy.medication_dispense import MedicationDispense
+    from phc.easy.medication_request import MedicationRequest
+    from phc.easy.medication_statement import MedicationStatement
+    from phc.easy.observation import Observation
+    from phc.easy.ocr import Ocr
+    from phc.easy.omics.gene import Gene
+    from phc.easy.omics.gene_set import GeneSet
+    from phc.easy.omics.genomic_copy_number_variant import (
+        GenomicCopyNumberVariant,
+    )
+    from phc.easy.omics.genomic_expression import GenomicExpression
+    from phc.easy.omics.genomic_short_variant import GenomicShortVariant
+    from phc.easy.omics.genomic_structural_variant import (
+        GenomicStructuralVariant,
+    )
+    from phc.easy.omics.genomic_test import GenomicTest
+    from phc.easy.option import Option
+    from phc.easy.organization import Organization
+    from phc.easy.patients import Patient
+    from phc.easy.person import Person
+    from phc.easy.practitioner import Practitioner
+    from phc.easy.procedure import Procedure
+    from phc.easy.procedure_request import ProcedureRequest
+    from phc.easy.projects import Project
+    from phc.easy.provenance import Provenance
+    from phc.easy.query import Query
+    from phc.easy.referral_request import ReferralRequest
+    from phc.easy.sequence import Sequence
+    from phc.easy.specimen import Specimen
+    from phc.easy.summary.counts import SummaryCounts
+    from phc.easy.summary.item_counts import SummaryItemCounts
+    from phc.easy.summary.clinical_counts import SummaryClinicalCounts
+    from phc.easy.summary.omics_counts import SummaryOmicsCounts
+
+# Each name is imported from its module on first access so that importing
+# this package does not import every module (and their dependencies)
+_LAZY_IMPORTS = {
+    "FhirServiceItem": "phc.easy.abstract.fhir_service_item",
+    "FhirServicePatientItem": "phc.easy.abstract.fhir_service_patient_item",
+    "AuditEvent": "phc.easy.audit_event",
+    "Auth": "phc.easy.auth",
+    "CarePlan": "phc.easy.care_plan",
+    "ClinicalImpression": "phc.easy.clinical_impression",
+    "Codeable": "phc.easy.codeable",
+    "Composition": "phc.easy.composition",
+    "Condition": "phc.easy.condition",
+    "Consent": "phc.easy.consent",
+    "DiagnosticReport": "phc.easy.diagnostic_report",
+    "DocumentReference": "phc.easy.document_reference",
+    "Encounter": "phc.easy.encounter",
+    "Frame": "phc.easy.frame",
+    "Goal": "phc.easy.goal",
+    "ImagingStudy": "phc.easy.imaging_study",
+    "Immunization": "phc.easy.immunization",
+    "Media": "phc.easy.media",
+    "MedicationAdministration": "phc.easy.medication_administration",
+    "MedicationDispense": "phc.easy.medication_dispense",
+    "MedicationRequest": "phc.easy.medication_request",
+    "MedicationStatement": "phc.easy.medication_statement",
+    "Observation": "phc.easy.observation",
+    "Ocr": "phc.easy.ocr",
+    "Gene": "phc.easy.omics.gene",
+    "GeneSet": "phc.easy.omics.gene_set",
+    "GenomicCopyNumberVariant": "phc.easy.omics.genomic_copy_number_variant",
+    "GenomicExpression": "phc.easy.omics.genomic_expression",
+    "GenomicShortVariant": "phc.easy.omics.genomic_short_variant",
+    "GenomicStructuralVariant": "phc.easy.omics.genomic_structural_variant",
+    "GenomicTest": "phc.easy.omics.genomic_test",
+    "Option": "phc.easy.option",
+    "Organization": "phc.easy.organization",
+    "Patient": "phc.easy.patients",
+    "Person": "phc.easy.person",
+    "Practitioner": "phc.easy.practitioner",
+    "Procedure": "phc.easy.procedure",
+    "ProcedureRequest": "phc.easy.procedure_request",
+    "Project": "phc.easy.projects",
+    "Provenance": "phc.easy.provenance",
+    "Query": "phc.easy.query",
+    "ReferralRequest": "phc.easy.referral_request",
+    "Sequence": "phc.easy.sequence",
+    "Specimen": "phc.easy.specimen",
+    "SummaryCounts": "phc.easy.summary.counts",
+    "SummaryItemCounts": "phc.easy.summary.item_counts",
+    "SummaryClinicalCounts": "phc.easy.summary.clinical_counts",
+    "SummaryOmicsCounts": "phc.easy.summary.omics_counts",
+}
 
 __all__ = [
     "AuditEvent",
@@ -98,3 +160,19 @@ __all__ = [
     "SummaryOmicsCounts",
     "SummaryClinicalCounts",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'phc.easy' has no attribute '{name}'")
+
+    value = getattr(importlib.import_module(module_name), name)
+
+    # Cache the value so this function is only called once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_LAZY_IMPORTS.keys()))
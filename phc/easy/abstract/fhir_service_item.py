@@ -1,12 +1,16 @@
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Union
 
 import pandas as pd
 from phc.easy.auth import Auth
 from phc.easy.dstu3 import DSTU3
-from phc.easy.query import Query
+from phc.easy.query import DEFAULT_SHARD_ROWS, Query
 from phc.easy.query.fhir_dsl_query import DEFAULT_MAX_TERMS
 from phc.easy.util import without_keys
+from phc.easy.util.batch import iter_frames
+from phc.easy.util.categorical import CategoricalEncoder
+from phc.easy.util.frame_schema import FrameSchema, get_schema
 from phc.util.string_case import snake_to_title_case
+from toolz import identity
 
 
 class ClassProperty(property):
@@ -61,6 +65,28 @@ class FhirServiceItem:
         "Returns the code keys (e.g. when searching for codes)"
         return []
 
+    @classmethod
+    def schema(cls) -> FrameSchema:
+        """Returns the column dtypes that frames are cast to when `typed=True`
+
+        Register a different schema for the table with
+        `phc.easy.util.frame_schema.register_schema`.
+        """
+        return get_schema(cls.table_name(), cls.code_fields())
+
+    @classmethod
+    def _transformer(cls, expand_args: dict, typed: bool):
+        "Build the function that transforms each data frame batch"
+
+        # Shared by every batch so that categories match across batches
+        encoder = CategoricalEncoder()
+
+        def transform(df: pd.DataFrame):
+            frame = cls.transform_results(df, **expand_args)
+            return encoder.encode(cls.schema().cast(frame)) if typed else frame
+
+        return transform
+
     @classmethod
     def get_count(cls, query_overrides: dict = {}, auth_args=Auth.shared()):
         "Get the count for a given FSS query"
@@ -90,6 +116,7 @@ class FhirServiceItem:
         auth_args=Auth.shared(),
         ignore_cache: bool = False,
         expand_args: dict = {},
+        typed: bool = False,
         log: bool = False,
         id: Optional[str] = None,
         ids: List[str] = [],
@@ -133,6 +160,11 @@ class FhirServiceItem:
         expand_args : Any
             Additional arguments passed to phc.Frame.expand
 
+        typed : bool = False
+            Cast the columns to compact dtypes (e.g. category, string, and
+            datetime64) with the schema of the entity (See `schema`) and
+            encode other repetitive columns as categoricals
+
         log : bool = False
             Whether to log some diagnostic statements for debugging
 
@@ -181,8 +213,7 @@ class FhirServiceItem:
 
         code_fields = [*cls.code_fields(), *code_fields]
 
-        def transform(df: pd.DataFrame):
-            return cls.transform_results(df, **expand_args)
+        transform = cls._transformer(expand_args, typed)
 
         return Query.execute_fhir_dsl_with_options(
             query,
@@ -208,6 +239,195 @@ class FhirServiceItem:
             ids=ids,
         )
 
+    @classmethod
+    def _query_kwargs(cls, code_fields: List[str] = [], **kwargs) -> dict:
+        "Build the arguments passed to build_queries for this entity"
+        return {"code_fields": [*cls.code_fields(), *code_fields], **kwargs}
+
+    @classmethod
+    def _iter_pages(
+        cls,
+        all_results: bool = True,
+        query_overrides: dict = {},
+        auth_args=Auth.shared(),
+        max_pages: Union[int, None] = None,
+        log: bool = False,
+        **query_kwargs,
+    ):
+        query = {
+            "type": "select",
+            "columns": "*",
+            "from": [{"table": cls.table_name()}],
+        }
+
+        return Query.iter_fhir_dsl(
+            {**query, **query_overrides},
+            all_results=all_results,
+            auth_args=auth_args,
+            max_pages=max_pages,
+            log=log,
+            **cls._query_kwargs(**query_kwargs),
+        )
+
+    @classmethod
+    def iter_records(cls, **kwargs) -> Iterator[dict]:
+        """Lazily retrieve raw records one at a time
+
+        Pages are requested as the previous page is consumed. Accepts the same
+        filters as `get_data_frame` (except caching and expansion options).
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({'account': '<your-account-name>'})
+        >>> phc.Project.set_current('My Project Name')
+        >>>
+        >>> for record in phc.Observation.iter_records(patient_id='<patient-id>'):
+        >>>     print(record["id"])
+        """
+        for page in cls._iter_pages(**kwargs):
+            yield from page
+
+    @classmethod
+    def iter_data_frames(
+        cls,
+        chunk_rows: Optional[int] = None,
+        raw: bool = False,
+        expand_args: dict = {},
+        typed: bool = False,
+        **kwargs,
+    ) -> Iterator[pd.DataFrame]:
+        """Lazily retrieve records as a series of expanded data frames
+
+        Each frame is built and transformed as its page arrives and the next
+        page is only requested once the frame has been consumed, so datasets of
+        any size can be processed in constant memory.
+
+        Attributes
+        ----------
+        chunk_rows : int
+            The number of rows in each frame (defaults to one frame per page)
+
+        raw : bool = False
+            If raw, then values will not be expanded
+
+        expand_args : Any
+            Additional arguments passed to phc.Frame.expand
+
+        typed : bool = False
+            Cast the columns to compact dtypes (e.g. category, string, and
+            datetime64) with the schema of the entity (See `schema`) and
+            encode other repetitive columns as categoricals
+
+        kwargs : dict
+            The same filters as `get_data_frame` (e.g. patient_id, code,
+            page_size, max_pages)
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({'account': '<your-account-name>'})
+        >>> phc.Project.set_current('My Project Name')
+        >>>
+        >>> for frame in phc.Observation.iter_data_frames(chunk_rows=50_000):
+        >>>     frame.to_parquet(...)
+        """
+
+        transform = cls._transformer(expand_args, typed)
+
+        return iter_frames(
+            cls._iter_pages(**kwargs),
+            chunk_rows=chunk_rows,
+            transform=identity if raw else transform,
+        )
+
+    @classmethod
+    def export(
+        cls,
+        dest: str,
+        format: str = "parquet",
+        shard_rows: int = DEFAULT_SHARD_ROWS,
+        raw: bool = False,
+        query_overrides: dict = {},
+        auth_args=Auth.shared(),
+        expand_args: dict = {},
+        typed: bool = False,
+        max_pages: Union[int, None] = None,
+        log: bool = False,
+        **query_kwargs,
+    ):
+        """Stream all records into Parquet or NDJSON shard files
+
+        Each page is transformed (unless raw) and written as it arrives so that
+        tables larger than memory can be extracted. Returns the manifest that
+        is also written to `dest`.
+
+        Attributes
+        ----------
+        dest : str
+            The directory to write the shards and manifest into
+
+        format : "parquet" | "ndjson"
+            The file format of each shard
+
+        shard_rows : int
+            The number of rows written to each shard before rotating
+
+        raw : bool = False
+            If raw, then values will not be expanded
+
+        query_overrides : dict = {}
+            Override any part of the elasticsearch FHIR query
+
+        auth_args : Any
+            The authenication to use for the account and project (defaults to shared)
+
+        expand_args : Any
+            Additional arguments passed to phc.Frame.expand
+
+        typed : bool = False
+            Cast the columns to compact dtypes (e.g. category, string, and
+            datetime64) with the schema of the entity (See `schema`) and
+            encode other repetitive columns as categoricals
+
+        max_pages : int
+            The number of pages to retrieve (useful if working with tons of records)
+
+        log : bool = False
+            Whether to log some diagnostic statements for debugging
+
+        query_kwargs : dict
+            Filters such as id, ids, term, terms, code, display, and system
+            (See `get_data_frame`)
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({'account': '<your-account-name>'})
+        >>> phc.Project.set_current('My Project Name')
+        >>>
+        >>> phc.Observation.export('./observations', shard_rows=500_000)
+        """
+        query = {
+            "type": "select",
+            "columns": "*",
+            "from": [{"table": cls.table_name()}],
+        }
+
+        transform = cls._transformer(expand_args, typed)
+
+        return Query.export_fhir_dsl(
+            {**query, **query_overrides},
+            dest,
+            format=format,
+            shard_rows=shard_rows,
+            transform=identity if raw else transform,
+            auth_args=auth_args,
+            max_pages=max_pages,
+            log=log,
+            **cls._query_kwargs(**query_kwargs),
+        )
+
     @classmethod
     def get_codes(
         cls,
@@ -267,3 +487,27 @@ class FhirServiceItem:
         return Query.get_count_by_field(
             table_name=cls.table_name(), field=field, **kwargs
         )
+
+    @classmethod
+    def get_counts_by_fields(cls, fields: List[str], **kwargs):
+        """Count records by several fields with as few requests as possible
+
+        See argments for :func:`~phc.easy.query.Query.get_counts_by_fields`
+
+        Attributes
+        ----------
+        fields : List[str]
+            The field names to count the values of (e.g. ["status", "category.coding.code"])
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({'account': '<your-account-name>'})
+        >>> phc.Project.set_current('My Project Name')
+        >>>
+        >>> counts = phc.Observation.get_counts_by_fields(['status', 'category.coding.code'])
+        >>> counts['status']
+        """
+        return Query.get_counts_by_fields(
+            table_name=cls.table_name(), fields=fields, **kwargs
+        )
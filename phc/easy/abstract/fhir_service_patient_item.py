@@ -37,6 +37,7 @@ class FhirServicePatientItem(FhirServiceItem):
         auth_args=Auth.shared(),
         ignore_cache: bool = False,
         expand_args: dict = {},
+        typed: bool = False,
         log: bool = False,
         # Terms
         term: Optional[dict] = None,
@@ -96,6 +97,11 @@ class FhirServicePatientItem(FhirServiceItem):
         expand_args : Any
             Additional arguments passed to phc.Frame.expand
 
+        typed : bool = False
+            Cast the columns to compact dtypes (e.g. category, string, and
+            datetime64) with the schema of the entity (See `schema`) and
+            encode other repetitive columns as categoricals
+
         log : bool = False
             Whether to log some diagnostic statements for debugging
 
@@ -138,8 +144,7 @@ class FhirServicePatientItem(FhirServiceItem):
 
         code_fields = [*cls.code_fields(), *code_fields]
 
-        def transform(df: pd.DataFrame):
-            return cls.transform_results(df, **expand_args)
+        transform = cls._transformer(expand_args, typed)
 
         # TODO: As of Feb 2023, only observations with patient references are indexed.
         # So in order to query for observations associated with a device we have to set the
@@ -179,6 +184,26 @@ class FhirServicePatientItem(FhirServiceItem):
             system=system,
         )
 
+    @classmethod
+    def _query_kwargs(
+        cls,
+        device_id: Union[None, str] = None,
+        device_ids: List[str] = [],
+        **kwargs,
+    ) -> dict:
+        # See device_id workaround in get_data_frame
+        if device_id:
+            kwargs["patient_id"] = device_id
+
+        if device_ids:
+            kwargs["patient_ids"] = device_ids
+
+        return super()._query_kwargs(
+            patient_key=cls.patient_key(),
+            patient_id_prefixes=cls.patient_id_prefixes(),
+            **kwargs,
+        )
+
     @classmethod
     def get_count_by_patient(cls, **kwargs):
         """Count records by a given field
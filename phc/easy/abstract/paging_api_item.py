@@ -1,15 +1,27 @@
-from typing import Any, Union, List
+from typing import Any, Callable, List, Optional, Union
 import inspect
 from enum import Enum
+from functools import lru_cache
 
 import pandas as pd
 from phc.easy.frame import Frame
 from phc.easy.query import Query
+from phc.easy.util.batch import iter_frames
+from phc.easy.util.categorical import CategoricalEncoder
 from pydantic import BaseModel
 from toolz import groupby
 
-EXECUTE_QUERY_ARGS = inspect.getfullargspec(Query.execute_paging_api).args
-EXPAND_ARGS = inspect.getfullargspec(Frame.expand).args
+
+@lru_cache(maxsize=None)
+def arg_names(fn: Callable) -> List[str]:
+    "Argument names of a function (inspected once instead of at import)"
+    return inspect.getfullargspec(fn).args
+
+
+# Referenced at import (and inspected on first use) so that patching these
+# methods does not change how arguments are split
+_execute_paging_api = Query.execute_paging_api
+_expand = Frame.expand
 
 
 class PagingApiOptions(BaseModel):
@@ -39,10 +51,13 @@ def split_kw_args(
     blacklist: List[str] = [],
     additional_expand_keys: List[str] = [],
 ):
+    execute_query_args = arg_names(_execute_paging_api)
+    expand_args = [*arg_names(_expand), *additional_expand_keys]
+
     def value(pair):
-        if pair[0] in EXECUTE_QUERY_ARGS:
+        if pair[0] in execute_query_args:
             return "execute"
-        elif pair[0] in [*EXPAND_ARGS, *additional_expand_keys]:
+        elif pair[0] in expand_args:
             return "expand"
         else:
             return "query"
@@ -91,10 +106,11 @@ class PagingApiItem:
         return {k: local_vars[k] for k in all_arg_names if k not in EXCEPTIONS}
 
     @classmethod
-    def get_data_frame(cls, **kw_args):
+    def _split_args(cls, kw_args: dict):
+        "Split keyword arguments into query params, expand args, and execute options"
         expand_keys = [
             k
-            for k in inspect.getfullargspec(cls.transform_results).args
+            for k in arg_names(cls.transform_results)
             if k not in ["frame", "expand_keys"]
         ]
         overrides = cls.execute_args()
@@ -103,17 +119,76 @@ class PagingApiItem:
             blacklist=["item_key"],
             additional_expand_keys=expand_keys,
         )
-        params, expand_args, execute_options = (
+
+        return (
             cls.process_params(split_args.get("query", {})),
             split_args.get("expand", {}),
             split_args.get("execute", {}),
         )
 
+    @classmethod
+    def iter_data_frames(cls, chunk_rows: Optional[int] = None, **kw_args):
+        """Lazily retrieve results as a series of transformed data frames
+
+        Accepts the same arguments as `get_data_frame` (defaulting to all
+        results). Each frame is built as its page arrives and the next page is
+        only requested once the frame has been consumed.
+
+        Attributes
+        ----------
+        chunk_rows : int
+            The number of rows in each frame (defaults to one frame per page)
+
+        typed : bool = False
+            Encode repetitive columns (e.g. genes) as categoricals with the
+            same categories in every frame
+        """
+        encoder = CategoricalEncoder() if kw_args.pop("typed", False) else None
+        params, expand_args, execute_options = cls._split_args(
+            {"all_results": True, **kw_args}
+        )
+        raw = execute_options.pop("raw", False)
+        # Iterated results are never cached
+        execute_options.pop("ignore_cache", None)
+
+        def transform(df: pd.DataFrame):
+            if raw or len(df) == 0:
+                return df
+
+            return cls._encode(
+                cls.transform_results(df, params=params, **expand_args),
+                encoder,
+            )
+
+        return iter_frames(
+            Query.iter_paging_api(
+                cls.resource_path(),
+                params,
+                **execute_options,
+                response_to_items=cls.response_to_items,
+            ),
+            chunk_rows=chunk_rows,
+            transform=transform,
+        )
+
+    @staticmethod
+    def _encode(frame: pd.DataFrame, encoder: Optional[CategoricalEncoder]):
+        return frame if encoder is None else encoder.encode(frame)
+
+    @classmethod
+    def get_data_frame(cls, **kw_args):
+        # Shared by every batch so that categories match across batches
+        encoder = CategoricalEncoder() if kw_args.pop("typed", False) else None
+        params, expand_args, execute_options = cls._split_args(kw_args)
+
         def transform(df: pd.DataFrame):
             if len(df) == 0:
                 return df
 
-            return cls.transform_results(df, params=params, **expand_args)
+            return cls._encode(
+                cls.transform_results(df, params=params, **expand_args),
+                encoder,
+            )
 
         df = Query.execute_paging_api(
             cls.resource_path(),
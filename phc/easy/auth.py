@@ -1,13 +1,30 @@
 import os
-from typing import Any, Dict, Union
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Type, TypeVar, Union
 
 from phc import Session
 from phc.adapter import Adapter
+from phc.base_client import BaseClient
 from phc.easy.util import defaultprop
 from phc.services import Accounts
 
 _shared_auth = None
 
+# Sessions are reused for the same credentials (token, account, and adapter)
+SESSION_CACHE_SIZE = 32
+_sessions: "OrderedDict[tuple, Session]" = OrderedDict()
+_sessions_lock = threading.Lock()
+
+# Clients hold an event loop so they are only reused within a thread. Clearing
+# the cache bumps the generation so every thread drops its clients on next use.
+_clients = threading.local()
+_clients_generation = 0
+
+_default_adapter = Adapter()
+
+Client = TypeVar("Client", bound=BaseClient)
+
 
 class Auth:
     token: str
@@ -95,13 +112,69 @@ class Auth:
 
     @defaultprop
     def adapter(self):
-        return Adapter()
+        return _default_adapter
 
     def session(self):
-        "Create an API session for use with modules not in the 'easy' namespace"
-        return Session(
-            token=self.token, account=self.account, adapter=self.adapter
-        )
+        """Create an API session for use with modules not in the 'easy' namespace
+
+        The session is reused by every auth object with the same credentials.
+        """
+        key = self._cache_key()
+
+        with _sessions_lock:
+            session = _sessions.get(key)
+
+            if session is None:
+                session = Session(
+                    token=self.token, account=self.account, adapter=self.adapter
+                )
+                _sessions[key] = session
+
+                if len(_sessions) > SESSION_CACHE_SIZE:
+                    _sessions.popitem(last=False)
+            else:
+                _sessions.move_to_end(key)
+
+        return session
+
+    def client(self, client_class: Type[Client] = BaseClient) -> Client:
+        """Reuse a client (e.g. `phc.services.Fhir`) for this session
+
+        Clients are cached per thread since each one holds an event loop.
+        """
+        session = self.session()
+        clients = getattr(_clients, "clients", None)
+        if clients is None or _clients.generation != _clients_generation:
+            clients = _clients.clients = {}
+            _clients.generation = _clients_generation
+
+        key = (self._cache_key(), client_class)
+        client = clients.get(key)
+
+        # Rebuild the client if its session was evicted from the cache
+        if client is None or client.session is not session:
+            if len(clients) >= SESSION_CACHE_SIZE:
+                clients.clear()
+
+            client = clients[key] = client_class(session)
+
+        return client
+
+    @staticmethod
+    def clear_cache():
+        "Forget all reused sessions and clients (e.g. after tokens are revoked)"
+        global _clients_generation
+
+        with _sessions_lock:
+            _sessions.clear()
+            _clients_generation += 1
+
+        _clients.__dict__.clear()
+
+    def _cache_key(self):
+        # Updating the credentials changes the key so a stale session (or
+        # client) is never returned
+        return (self.token, self.account, self.adapter)
 
     def accounts(self):
         "List available accounts for the authenticated user"
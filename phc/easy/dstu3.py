@@ -1,9 +1,43 @@
 import json
-from typing import Callable
+from typing import Callable, List, Optional, Union
 
-from phc.base_client import BaseClient
 from phc.easy.auth import Auth
 from phc.errors import ApiError
+from pmap import pmap
+
+DEFAULT_BUNDLE_SIZE = 100
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Bundle types sent to the FHIR base URL (or "concurrent" for one request per
+# record when bundles are not an option)
+BUNDLE_MODES = ["batch", "transaction", "concurrent"]
+
+
+def parse_data(data: Union[str, dict, None]):
+    "Responses are only text if the content type was not application/json"
+    if isinstance(data, str):
+        return json.loads(data) if data.strip() != "" else None
+
+    return data
+
+
+def parse_status(status: str) -> int:
+    "Bundle entry statuses look like '201 Created'"
+    return int(str(status).split(" ")[0])
+
+
+def outcome(id: Optional[str], status: int, resource=None, error=None):
+    return {
+        "id": id,
+        "status": status,
+        "ok": 200 <= status < 300,
+        "resource": resource,
+        "error": error,
+    }
+
+
+def chunks(items: list, size: int):
+    return [items[i : i + size] for i in range(0, len(items), size)]
 
 
 class DSTU3:
@@ -20,7 +54,7 @@ class DSTU3:
     ):
         """Perform a GET on the DSTU3 resource"""
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        client = auth.client()
 
         try:
             response = client._fhir_call(
@@ -32,7 +66,7 @@ class DSTU3:
 
             raise e
 
-        return json.loads(response)
+        return parse_data(response)
 
     def update(
         self,
@@ -53,7 +87,7 @@ class DSTU3:
         (Recommended to use `update(...)` unless a direct PUT is required.)
         """
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        client = auth.client()
 
         response = client._fhir_call(
             f"{self.entity}/{record_id}", http_verb="PUT", json=data
@@ -67,7 +101,7 @@ class DSTU3:
     def create(self, data: dict, auth_args: Auth = Auth.shared()):
         """Perform a POST for the DSTU3 resource"""
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        client = auth.client()
 
         response = client._fhir_call(
             f"{self.entity}", http_verb="POST", json=data
@@ -84,8 +118,186 @@ class DSTU3:
         Returns nothing.
         """
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        client = auth.client()
 
         return client._fhir_call(
             f"{self.entity}/{record_id}", http_verb="DELETE"
         ).data
+
+    def get_many(self, record_ids: List[str], **kwargs) -> List[dict]:
+        """Perform a GET for many DSTU3 resources
+
+        See `execute_many` for options. The resource of each outcome is the
+        retrieved record.
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Patient.DSTU3.get_many(["<id-1>", "<id-2>"])
+        """
+        return self.execute_many(
+            [("GET", record_id, None) for record_id in record_ids], **kwargs
+        )
+
+    def put_many(self, records: List[dict], **kwargs) -> List[dict]:
+        """Perform a PUT for many DSTU3 resources (each record must have an id)
+
+        See `execute_many` for options.
+        """
+        if any(not record.get("id") for record in records):
+            raise ValueError("Every record must have an id to be PUT")
+
+        return self.execute_many(
+            [("PUT", record["id"], record) for record in records], **kwargs
+        )
+
+    def create_many(self, records: List[dict], **kwargs) -> List[dict]:
+        """Perform a POST for many DSTU3 resources
+
+        See `execute_many` for options.
+        """
+        return self.execute_many(
+            [("POST", None, record) for record in records], **kwargs
+        )
+
+    def delete_many(self, record_ids: List[str], **kwargs) -> List[dict]:
+        """Perform a DELETE for many DSTU3 resources
+
+        See `execute_many` for options.
+        """
+        return self.execute_many(
+            [("DELETE", record_id, None) for record_id in record_ids], **kwargs
+        )
+
+    def execute_many(
+        self,
+        requests: List[tuple],
+        mode: str = "batch",
+        bundle_size: int = DEFAULT_BUNDLE_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        auth_args: Auth = Auth.shared(),
+    ) -> List[dict]:
+        """Perform many DSTU3 requests packed into FHIR Bundles
+
+        Returns one outcome per request (in order) with the keys id, status,
+        ok, resource, and error.
+
+        Attributes
+        ----------
+        requests : List[Tuple[str, Optional[str], Optional[dict]]]
+            The http verb, record id, and record of each request
+
+        mode : "batch" | "transaction" | "concurrent"
+            Send batch Bundles (entries succeed or fail independently),
+            transaction Bundles (all entries of a bundle succeed or fail
+            together), or one request per record
+
+        bundle_size : int
+            The number of entries per Bundle
+
+        max_concurrency : int
+            The number of Bundles (or requests) in flight at once
+
+        auth_args : Auth, dict
+            Additional arguments for authentication
+        """
+        if mode not in BUNDLE_MODES:
+            raise ValueError(
+                f"Mode must be one of {BUNDLE_MODES} (not '{mode}')"
+            )
+
+        auth = Auth(auth_args)
+
+        if mode == "concurrent":
+            batches = [[request] for request in requests]
+
+            def send(batch):
+                return [self._execute_single(*batch[0], auth)]
+
+        else:
+            batches = chunks(requests, bundle_size)
+
+            def send(batch):
+                return self._execute_bundle(batch, mode, auth)
+
+        if len(batches) <= 1 or max_concurrency <= 1:
+            results = map(send, batches)
+        else:
+            results = pmap(
+                send, batches, threads=min(max_concurrency, len(batches))
+            )
+
+        return [result for batch in results for result in batch]
+
+    def _execute_single(
+        self, http_verb: str, record_id: Optional[str], data, auth: Auth
+    ):
+        client = auth.client()
+        path = (
+            self.entity if record_id is None else f"{self.entity}/{record_id}"
+        )
+
+        try:
+            response = client._fhir_call(
+                path,
+                http_verb=http_verb,
+                **({} if data is None else {"json": data}),
+            )
+        except ApiError as e:
+            return outcome(
+                record_id, e.response.status_code, error=e.response.data
+            )
+
+        resource = parse_data(response.data)
+
+        return outcome(
+            record_id or (resource or {}).get("id"),
+            response.status_code,
+            resource=resource,
+        )
+
+    def _execute_bundle(self, batch: List[tuple], mode: str, auth: Auth):
+        client = auth.client()
+        bundle = {
+            "resourceType": "Bundle",
+            "type": mode,
+            "entry": [
+                {
+                    **({} if data is None else {"resource": data}),
+                    "request": {
+                        "method": http_verb,
+                        "url": (
+                            self.entity
+                            if record_id is None
+                            else f"{self.entity}/{record_id}"
+                        ),
+                    },
+                }
+                for http_verb, record_id, data in batch
+            ],
+        }
+
+        try:
+            response = client._fhir_call("", http_verb="POST", json=bundle)
+        except ApiError as e:
+            # A failed transaction (or rejected bundle) fails every entry
+            return [
+                outcome(
+                    record_id, e.response.status_code, error=e.response.data
+                )
+                for _, record_id, _ in batch
+            ]
+
+        entries = (parse_data(response.data) or {}).get("entry", [])
+        # Entries missing from the response are reported as failed
+        entries = entries + [{}] * (len(batch) - len(entries))
+
+        return [
+            outcome(
+                record_id or (entry.get("resource") or {}).get("id"),
+                parse_status(entry.get("response", {}).get("status", 0)),
+                resource=entry.get("resource"),
+                error=entry.get("response", {}).get("outcome"),
+            )
+            for (_, record_id, _), entry in zip(batch, entries)
+        ]
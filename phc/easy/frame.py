@@ -1,12 +1,10 @@
 from toolz import curry
 from typing import Callable, List, Tuple
 
-import re
 import pandas as pd
 
 from phc.easy.codeable import Codeable
-
-TZ_REGEX = re.compile(r"[-+]\d{2}:?\d{2}Z?$")
+from phc.easy.util.fhir_date import TZ_REGEX, parse_fhir_dates
 
 CODE_COLUMNS = [
     "meta",
@@ -127,31 +125,10 @@ class Frame:
             local_key = f"{column_key}.local"
             tz_key = f"{column_key}.tz"
 
-            try:
-                utc = pd.to_datetime(combined[column_key], utc=True)
-
-                # Cleverness: Use regex to remove TZ and parse as utc=True to
-                # produce local datetime. The column name will have ".local" as
-                # suffix so it'll be clear what's happening.
-                localized = pd.to_datetime(
-                    combined[column_key].str.replace(TZ_REGEX, ""), utc=True
-                )
-            except pd.errors.OutOfBoundsDatetime as ex:
-                print(
-                    "[WARNING]: OutOfBoundsDatetime encountered. Casting to NaT.",
-                    ex,
-                )
-                utc = pd.to_datetime(
-                    combined[column_key], utc=True, errors="coerce"
-                )
-                localized = pd.to_datetime(
-                    combined[column_key].str.replace(TZ_REGEX, ""),
-                    utc=True,
-                    errors="coerce",
-                )
-
-            combined[tz_key] = (localized - utc).dt.total_seconds() / 3600
-            combined[local_key] = localized
+            parsed = parse_fhir_dates(combined[column_key])
+
+            combined[tz_key] = parsed.tz
+            combined[local_key] = parsed.local
 
         # Drop duplicate columns (nicety for same transform applied to cache)
         # Sort columns by original order (where possible)
@@ -1,6 +1,7 @@
-from time import sleep
+import os
+from time import monotonic, sleep
+from typing import Iterator, List
 
-from phc.base_client import BaseClient
 from phc.easy.auth import Auth
 from phc.easy.ocr.block import Block
 from phc.easy.ocr.config import Config
@@ -8,6 +9,9 @@ from phc.easy.ocr.suggestion import Suggestion
 from phc.easy.ocr.document import Document
 from phc.easy.ocr.document_composition import DocumentComposition
 from phc.services import Files
+from pmap import pmap
+
+DEFAULT_MAX_CONCURRENCY = 8
 
 
 class Ocr:
@@ -23,7 +27,7 @@ class Ocr:
     ):
         """Upload a file from a path to the ocr directory (defaults to 'ocr-uploads')"""
         auth = Auth(auth_args)
-        files = Files(auth.session())
+        files = auth.client(Files)
         filename = source.split("/")[-1]
 
         return files.upload(
@@ -58,18 +62,139 @@ class Ocr:
         Returns the DocumentReference
         """
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        document_reference_id = Ocr.submit(file_id, auth_args=auth)
+
+        # Unfortunately, we just have to wait for it to be in FSS
+        sleep(pause_time)
+
+        return Document.get(
+            id=document_reference_id, auth_args=auth_args, **document_kw_args
+        )
+
+    @staticmethod
+    def submit(file_id: str, auth_args: Auth = Auth.shared()) -> str:
+        """Start PrecisionOCR on a specific file id
+
+        Returns the DocumentReference id (which is not yet searchable)
+        """
+        auth = Auth(auth_args)
+        client = auth.client()
 
         response = client._api_call(
             "ocr/documents",
             json={"project": auth.project_id, "fileId": file_id},
         )
 
-        document_reference_id = response.data["documentReferenceId"]
+        return response.data["documentReferenceId"]
 
-        # Unfortunately, we just have to wait for it to be in FSS
-        sleep(pause_time)
+    @staticmethod
+    def run_many(
+        sources: List[str],
+        folder="ocr-uploads",
+        auth_args: Auth = Auth.shared(),
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        submit_batch_size: int = 100,
+        initial_wait: float = 1,
+        max_wait: float = 30,
+        timeout: float = 600,
+        **document_kw_args,
+    ) -> Iterator[dict]:
+        """Upload (if needed) and run PrecisionOCR on many documents
 
-        return Document.get(
-            id=document_reference_id, auth_args=auth_args, **document_kw_args
-        )
+        Files are uploaded and submitted concurrently in batches. Readiness of
+        all pending documents is checked with a single `ids=` query that backs
+        off between attempts. DocumentReferences are yielded as soon as they
+        are searchable (in completion order).
+
+        Attributes
+        ----------
+        sources : List[str]
+            Local file paths to upload or ids of files already uploaded
+
+        folder : str
+            The folder to upload local files to (defaults to 'ocr-uploads')
+
+        auth_args : Auth, dict
+            Additional arguments for authentication
+
+        max_concurrency : int
+            The number of uploads and submissions in flight at once
+
+        submit_batch_size : int
+            The number of documents submitted before checking for results
+
+        initial_wait : float
+            Seconds to wait before the first readiness check (doubles for each
+            check without new documents up to max_wait)
+
+        max_wait : float
+            The longest time to wait between readiness checks
+
+        timeout : float
+            Seconds to wait for all documents after the last submission before
+            raising a TimeoutError
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({'account': '<your-account-name>'})
+        >>> phc.Project.set_current('My Project Name')
+        >>>
+        >>> for document in phc.Ocr.run_many(["./scan-1.pdf", "./scan-2.pdf"]):
+        >>>     print(document["id"])
+        """
+        auth = Auth(auth_args)
+
+        def upload_and_submit(source: str):
+            file_id = (
+                Ocr.upload(source, folder=folder, auth_args=auth)["id"]
+                if os.path.isfile(source)
+                else source
+            )
+
+            return Ocr.submit(file_id, auth_args=auth)
+
+        def ready_documents(pending: set):
+            return Document.get_data_frame(
+                ids=list(pending),
+                all_results=True,
+                auth_args=auth,
+                **document_kw_args,
+            ).to_dict("records")
+
+        pending = set()
+
+        for start in range(0, len(sources), submit_batch_size):
+            batch = sources[start : start + submit_batch_size]
+            pending.update(
+                pmap(
+                    upload_and_submit,
+                    batch,
+                    threads=max(1, min(max_concurrency, len(batch))),
+                )
+            )
+
+            # Stream whatever finished while the next batch is submitted
+            if start + submit_batch_size < len(sources):
+                for document in ready_documents(pending):
+                    pending.discard(document["id"])
+                    yield document
+
+        wait = initial_wait
+        deadline = monotonic() + timeout
+
+        while len(pending) > 0:
+            if monotonic() > deadline:
+                raise TimeoutError(
+                    f"{len(pending)} OCR documents were not ready after "
+                    f"{timeout}s: {sorted(pending)}"
+                )
+
+            sleep(wait)
+            documents = ready_documents(pending)
+
+            for document in documents:
+                pending.discard(document["id"])
+                yield document
+
+            wait = initial_wait if len(documents) else min(wait * 2, max_wait)
@@ -1,4 +1,5 @@
-import os
+import json
+from typing import Dict, Iterable, List, Union
 
 import pandas as pd
 import toolz.curried as c
@@ -7,7 +8,8 @@ from phc.easy.auth import Auth
 from phc.easy.frame import Frame
 from phc.easy.ocr.document import Document
 from phc.services import Files
-from toolz import curry, get_in, partial, pipe
+from pmap import pmap
+from toolz import get_in, partial, pipe
 
 
 class Block:
@@ -18,6 +20,47 @@ class Block:
         auth = Auth(auth_args)
         document = Document.get(document_id, auth_args=auth_args)
 
+        return Block.get_data_frame_for_document(document, raw, auth)
+
+    @staticmethod
+    def get_data_frames(
+        document_ids: List[str],
+        raw: bool = False,
+        auth_args: Auth = Auth.shared(),
+        max_concurrency: int = 8,
+    ) -> Dict[str, pd.DataFrame]:
+        """Retrieve the sorted blocks of many documents
+
+        The documents are found with one query and their block files are
+        downloaded concurrently. Returns a frame for each document id.
+        """
+        auth = Auth(auth_args)
+        documents = Document.get_data_frame(
+            ids=document_ids, all_results=True, auth_args=auth
+        ).to_dict("records")
+
+        missing_ids = set(document_ids) - set(d["id"] for d in documents)
+        if len(missing_ids) > 0:
+            raise ValueError(f"Documents not found: {sorted(missing_ids)}")
+
+        frames = pmap(
+            lambda document: Block.get_data_frame_for_document(
+                document, raw, auth
+            ),
+            documents,
+            threads=max(1, min(max_concurrency, len(documents))),
+        )
+
+        return {
+            document["id"]: frame for document, frame in zip(documents, frames)
+        }
+
+    @staticmethod
+    def get_data_frame_for_document(
+        document: dict, raw: bool = False, auth_args: Auth = Auth.shared()
+    ):
+        auth = Auth(auth_args)
+
         file_id = pipe(
             document.get("content", []),
             c.filter(
@@ -31,14 +74,11 @@ class Block:
 
         if file_id is None:
             raise ValueError(
-                f"No block file found for document: '{document_id}'"
+                f"No block file found for document: '{document.get('id')}'"
             )
 
-        files = Files(auth.session())
-        filename = files.download(file_id, "/tmp/")
-
-        frame = pd.read_json(filename, lines=True)
-        os.remove(filename)
+        files = auth.client(Files)
+        frame = Block.parse_lines(files.iter_lines(file_id))
 
         if raw or len(frame) == 0:
             return frame
@@ -57,41 +97,52 @@ class Block:
             .set_index("Id")
         )
 
+    @staticmethod
+    def parse_lines(lines: Iterable[Union[str, bytes]]) -> pd.DataFrame:
+        "Parse textract blocks from NDJSON lines (e.g. a streamed download)"
+        return pd.DataFrame(
+            [json.loads(line) for line in lines if line.strip()]
+        )
+
     @staticmethod
     def sort(frame: pd.DataFrame):
         """Sort a textract block frame by getting the proper order of the ids.
 
-        Starts with the pages and recursively gets the child ids for each descendent
-        so that the first three rows should (almost) always be PAGE -> LINE -> WORD
-        where all of the words of that line follow it.
+        Starts with the pages and walks the child ids of each descendent (depth
+        first) so that the first three rows should (almost) always be PAGE ->
+        LINE -> WORD where all of the words of that line follow it.
         """
-        return (
-            frame.loc[
-                Block.recursive_get_child_ids(
-                    frame,
-                    frame.sort_values("Page")
-                    .query("BlockType == 'PAGE'")
-                    .index,
-                )
-            ]
-            .reset_index()
-            .drop_duplicates(subset=["Id"])
-            .set_index("Id")
+        children = dict(
+            zip(
+                frame.index,
+                (
+                    get_in([0, "Ids"], relationships, [])
+                    for relationships in frame.Relationships
+                ),
+            )
         )
+        page_ids = frame.sort_values("Page").query("BlockType == 'PAGE'").index
+
+        return frame.loc[Block.get_ordered_ids(children, page_ids)]
 
     @staticmethod
-    @curry
-    def recursive_get_child_ids(frame: pd.DataFrame, ids: list):
-        return pipe(
-            ids,
-            c.mapcat(
-                lambda an_id: [
-                    an_id,
-                    *pipe(
-                        get_in([0, "Ids"], frame.loc[an_id].Relationships, []),
-                        Block.recursive_get_child_ids(frame),
-                    ),
-                ]
-            ),
-            list,
-        )
+    def get_ordered_ids(children: Dict[str, list], ids: Iterable[str]):
+        """Pre-order traversal of the block graph starting at the given ids
+
+        Each id is only included at its first occurrence.
+        """
+        ordered_ids = []
+        seen = set()
+        stack = list(reversed(list(ids)))
+
+        while len(stack) > 0:
+            an_id = stack.pop()
+
+            if an_id in seen or an_id not in children:
+                continue
+
+            seen.add(an_id)
+            ordered_ids.append(an_id)
+            stack.extend(reversed(children[an_id] or []))
+
+        return ordered_ids
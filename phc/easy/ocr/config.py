@@ -1,6 +1,5 @@
 import json
 
-from phc.base_client import BaseClient
 from phc.easy.auth import Auth
 from phc.easy.ocr.options.ocr_config_types import Config as OcrConfig
 
@@ -9,7 +8,7 @@ class Config:
     @staticmethod
     def create(config: OcrConfig, auth_args: Auth = Auth.shared()):
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        client = auth.client()
 
         return client._api_call(
             "ocr/config",
@@ -22,7 +21,7 @@ class Config:
     @staticmethod
     def get(auth_args: Auth = Auth.shared()):
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        client = auth.client()
 
         return client._api_call(
             f"ocr/config/{auth.project_id}", http_verb="GET"
@@ -1,4 +1,3 @@
-from phc.base_client import BaseClient
 from phc.easy.auth import Auth
 from phc.easy.document_reference import DocumentReference
 from phc.easy.query import Query
@@ -23,7 +22,7 @@ class Document(DocumentReference):
     @staticmethod
     def delete(id: str, auth_args: Auth = Auth.shared()):
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        client = auth.client()
 
         return client._api_call(
             f"ocr/fhir/projects/{auth.project_id}/documentReferences/{id}",
@@ -1,5 +1,6 @@
+from typing import Any, List, Optional
+
 import pandas as pd
-from toolz import partial, pipe
 from phc.base_client import BaseClient
 from phc.easy.auth import Auth
 from phc.easy.document_reference import DocumentReference
@@ -54,232 +55,220 @@ class Suggestion(DocumentReference):
         return results
 
 
-def frame_for_type(df: pd.DataFrame, type: str):
-    return expand_json_and_merge(
-        df[[c for c in df.columns if c == type or c not in SUGGESTION_TYPES]],
-        type,
-    )
+# How each suggestion type is flattened (in order):
+#   ("array", column, nested_json_keys) - one row per item of the array column
+#   ("nested_array", column, nested_json_keys) - one row per item of each array
+#   ("json", column) - flatten the dict column into prefixed columns
+SUGGESTION_TYPE_STEPS = {
+    "observation": (
+        {"observation_observationCode": "observation_code"},
+        [
+            ("array", "observation_date", ["dataSource"]),
+            ("array", "observation_value", ["dataSource"]),
+            ("array", "observation_code", ["dataSource", "value"]),
+        ],
+    ),
+    "condition": (
+        {"condition_conditionCode": "condition_code"},
+        [
+            ("array", "condition_code", ["dataSource", "value"]),
+            ("array", "condition_onsetDate", ["dataSource"]),
+            ("array", "condition_abatementDate", ["dataSource"]),
+            ("nested_array", "condition_bodySite", ["dataSource"]),
+            ("json", "bodySite_value"),
+        ],
+    ),
+    "procedure": (
+        {"procedure_procedureCode": "procedure_code"},
+        [
+            ("array", "procedure_date", ["dataSource"]),
+            ("array", "procedure_endDate", ["dataSource"]),
+            ("array", "procedure_value", ["dataSource"]),
+            ("array", "procedure_code", ["dataSource", "value"]),
+            ("nested_array", "procedure_bodySite", ["dataSource"]),
+            ("json", "bodySite_value"),
+        ],
+    ),
+    "medicationAdministration": (
+        {"medicationAdministration_medicationCode": "medication_code"},
+        [
+            ("array", "medicationAdministration_date", ["dataSource"]),
+            ("array", "medicationAdministration_endDate", ["dataSource"]),
+            ("array", "medicationAdministration_status", ["dataSource"]),
+            ("array", "medicationAdministration_dosage", ["dataSource"]),
+            ("json", "dosage_value"),
+            ("array", "medication_code", ["dataSource", "value"]),
+        ],
+    ),
+}
 
 
 def expand_suggestion_df(frame: pd.DataFrame):
-    return (
-        expand_array_column(frame, key="suggestions")
-        .pipe(
-            lambda df: pd.concat(
-                [
-                    expand_observations(frame_for_type(df, "observation")),
-                    expand_conditions(frame_for_type(df, "condition")),
-                    expand_procedures(frame_for_type(df, "procedure")),
-                    expand_medication_administrations(
-                        frame_for_type(df, "medicationAdministration")
-                    ),
-                ]
-            )
-        )
-        .reset_index(drop=True)
-    )
+    return flatten_suggestions(frame.to_dict("records"))
 
 
-def expand_medication_administrations(frame: pd.DataFrame):
-    return pipe(
-        frame.rename(
-            columns={
-                "medicationAdministration_medicationCode": "medication_code"
-            }
-        ),
-        partial(
-            expand_generic, two_level_column="medicationAdministration_date"
-        ),
-        partial(
-            expand_generic, two_level_column="medicationAdministration_endDate"
-        ),
-        partial(
-            expand_generic, two_level_column="medicationAdministration_status"
-        ),
-        partial(
-            expand_generic, two_level_column="medicationAdministration_dosage"
-        ),
-        partial(expand_json_and_merge, key="dosage_value"),
-        partial(
-            expand_generic,
-            two_level_column="medication_code",
-            nested_json_columns=["dataSource", "value"],
-        ),
-        preview_source_text_columns,
-    ).pipe(lambda df: df.assign(type="medicationAdministration"))
-
-
-def expand_procedures(frame: pd.DataFrame):
-    return pipe(
-        frame.rename(columns={"procedure_procedureCode": "procedure_code"}),
-        partial(expand_generic, two_level_column="procedure_date"),
-        partial(expand_generic, two_level_column="procedure_endDate"),
-        partial(expand_generic, two_level_column="procedure_value"),
-        partial(
-            expand_generic,
-            two_level_column="procedure_code",
-            nested_json_columns=["dataSource", "value"],
-        ),
-        partial(
-            expand_generic,
-            two_level_column="procedure_bodySite",
-            expand_array=expand_nested_array_column,
-        ),
-        partial(expand_json_and_merge, key="bodySite_value"),
-        preview_source_text_columns,
-    ).pipe(lambda df: df.assign(type="procedure"))
-
-
-def expand_observations(frame: pd.DataFrame):
-    return pipe(
-        frame.rename(
-            columns={"observation_observationCode": "observation_code"}
-        ),
-        partial(expand_generic, two_level_column="observation_date"),
-        partial(expand_generic, two_level_column="observation_value"),
-        partial(
-            expand_generic,
-            two_level_column="observation_code",
-            nested_json_columns=["dataSource", "value"],
-        ),
-        preview_source_text_columns,
-    ).pipe(lambda df: df.assign(type="observation"))
-
-
-def expand_conditions(frame: pd.DataFrame):
-    return pipe(
-        frame.rename(columns={"condition_conditionCode": "condition_code"}),
-        partial(
-            expand_generic,
-            two_level_column="condition_code",
-            nested_json_columns=["dataSource", "value"],
-        ),
-        partial(expand_generic, two_level_column="condition_onsetDate"),
-        partial(expand_generic, two_level_column="condition_abatementDate"),
-        partial(
-            expand_generic,
-            two_level_column="condition_bodySite",
-            expand_array=expand_nested_array_column,
-        ),
-        partial(expand_json_and_merge, key="bodySite_value"),
-        preview_source_text_columns,
-    ).pipe(lambda df: df.assign(type="condition"))
-
-
-def preview_source_text_columns(frame: pd.DataFrame):
-    columns = [c for c in frame.columns if c.endswith("sourceText")]
-
-    if len(columns) == 0:
-        return frame
-
-    def get_text(value: any):
-        if isinstance(value, dict):
-            return value["text"]
-        elif isinstance(value, list):
-            return " ".join([w["word"] for w in value])
-        else:
-            return None
+def flatten_suggestions(records: List[dict]) -> pd.DataFrame:
+    """Flatten suggestion records into one frame in a single pass
 
-    return pd.concat(
+    Every suggestion has at least one row per type and array attributes are
+    crossed with each other. Rows are built as dicts so no intermediate frames
+    are needed.
+    """
+    bases = [
+        (base, suggestion)
+        for record in records
+        for base, suggestion in suggestion_bases(record)
+    ]
+
+    rows_by_type = [
         [
-            frame.drop(columns, axis=1),
-            *[frame[c].apply(get_text) for c in columns],
-        ],
-        axis=1,
+            {**base, **row, "type": type}
+            for base, suggestion in bases
+            for row in flatten_suggestion_type(type, suggestion.get(type))
+        ]
+        for type in SUGGESTION_TYPES
+    ]
+
+    # Same column order as concatenating a frame for each type
+    columns = list(
+        dict.fromkeys(
+            column for rows in rows_by_type for column in type_columns(rows)
+        )
     )
 
-
-def expand_nested_array_column(df: pd.DataFrame, key: str, lprefix=""):
-    if key not in df.columns:
-        return df
-
-    main = df.drop([key], axis=1)
-
-    expanded = pd.concat(
-        df.apply(
-            lambda x: (
-                pd.concat(
-                    [
-                        pd.DataFrame(
-                            [{"index": x.name, "_item": i, **v} for v in array]
-                        )
-                        for i, array in enumerate(x[key])
-                    ]
-                )
-                # pd.concat does not like an empty array so we avoid that situation
-                if x[key] != []
-                else pd.DataFrame()
-            ),
-            axis=1,
-        ).values
-    ).add_prefix(lprefix)
-
-    if len(expanded) == 0:
-        return main
-
-    return main.join(expanded.set_index(lprefix + "index")).reset_index(
-        drop=True
+    return pd.DataFrame(
+        [row for rows in rows_by_type for row in rows], columns=columns
     )
 
 
-def expand_array_column(df: pd.DataFrame, key: str, lprefix=""):
-    if key not in df.columns:
-        return df
-
-    main = df.drop([key], axis=1)
-
-    expanded = pd.concat(
-        df.apply(
-            lambda x: pd.DataFrame([{"index": x.name, **s} for s in x[key]]),
-            axis=1,
-        ).values
-    ).add_prefix(lprefix)
-
-    if len(expanded) == 0:
-        return main
-
-    return main.join(
-        expanded.rename(
-            columns={"comprehendResults": f"{key}_comprehendResults"}
-        ).set_index(lprefix + "index")
-    ).reset_index(drop=True)
-
-
-def expand_generic(
-    frame: pd.DataFrame,
-    two_level_column: str,
-    use_prefix=False,
-    nested_json_columns=["dataSource"],
-    expand_array=expand_array_column,
-):
-    prefix, column = two_level_column.split("_")
-    prefix = prefix + "_" if use_prefix else ""
-
-    if two_level_column not in frame.columns:
-        return frame
-
-    return pipe(
-        frame,
-        partial(
-            expand_array, key=two_level_column, lprefix=prefix + column + "_"
-        ),
-        *[
-            partial(expand_json_and_merge, key=prefix + column + "_" + c)
-            for c in nested_json_columns
-        ],
-    )
+def type_columns(rows: List[dict]) -> List[str]:
+    columns = list(dict.fromkeys(key for row in rows for key in row.keys()))
+    source_text_columns = [c for c in columns if c.endswith("sourceText")]
+
+    return [
+        *[c for c in columns if c not in source_text_columns and c != "type"],
+        *source_text_columns,
+        "type",
+    ]
+
+
+def suggestion_bases(record: dict):
+    "Split a record into the shared columns and suggestion of each row"
+    base = {k: v for k, v in record.items() if k != "suggestions"}
+    suggestions = record.get("suggestions")
+
+    if not isinstance(suggestions, list) or len(suggestions) == 0:
+        return [(base, {})]
+
+    return [
+        (
+            {
+                **base,
+                **{
+                    (
+                        "suggestions_comprehendResults"
+                        if k == "comprehendResults"
+                        else k
+                    ): v
+                    for k, v in suggestion.items()
+                    if k not in SUGGESTION_TYPES
+                },
+            },
+            suggestion,
+        )
+        for suggestion in suggestions
+    ]
+
+
+def flatten_suggestion_type(type: str, value: Optional[dict]) -> List[dict]:
+    renames, steps = SUGGESTION_TYPE_STEPS[type]
+    row = {
+        renames.get(k, k): v for k, v in flatten_dict(value, f"{type}_").items()
+    }
+    rows = [row]
 
+    for step in steps:
+        kind, column = step[0], step[1]
 
-def expand_json_and_merge(df: pd.DataFrame, key: str):
-    if key not in df.columns:
-        return df
+        if kind == "json":
+            rows = [flatten_key(r, column) for r in rows]
+            continue
 
-    series = df[key].fillna(df[key].apply(lambda _: dict()))
+        if column not in row:
+            continue
+
+        items = array_items(
+            rows[0].get(column), column.split("_")[1], kind, step[2]
+        )
+        rows = [
+            {**{k: v for k, v in r.items() if k != column}, **item}
+            for r in rows
+            for item in (items or [{}])
+        ]
+
+    return [
+        {
+            k: source_text(v) if k.endswith("sourceText") else v
+            for k, v in r.items()
+        }
+        for r in rows
+    ]
+
+
+def array_items(
+    value, attribute: str, kind: str, nested_json_keys: List[str]
+) -> List[dict]:
+    "Rows (prefixed with the attribute name) for each item of an array column"
+    if not isinstance(value, list):
+        return []
+
+    prefix = f"{attribute}_"
+
+    if kind == "nested_array":
+        items = [
+            {f"{prefix}_item": i, **{prefix + k: v for k, v in item.items()}}
+            for i, array in enumerate(value)
+            for item in array
+        ]
+    else:
+        items = [{prefix + k: v for k, v in item.items()} for item in value]
+
+    for key in nested_json_keys:
+        items = [flatten_key(item, prefix + key) for item in items]
+
+    return items
+
+
+def flatten_key(row: dict, key: str) -> dict:
+    "Replace a dict value with prefixed columns for each of its (nested) keys"
+    if key not in row or not (isinstance(row[key], dict) or row[key] is None):
+        return row
+
+    return {
+        **{k: v for k, v in row.items() if k != key},
+        **flatten_dict(row[key], f"{key}_"),
+    }
+
+
+def flatten_dict(value: Optional[dict], prefix: str = "") -> dict:
+    "Flatten nested dicts like pd.json_normalize (joined with '.')"
+    if not isinstance(value, dict):
+        return {}
+
+    flattened = {}
+    for k, v in value.items():
+        if isinstance(v, dict) and len(v) > 0:
+            flattened.update(flatten_dict(v, f"{prefix}{k}."))
+        else:
+            flattened[f"{prefix}{k}"] = v
 
-    main = df.drop([key], axis=1)
-    expanded = pd.json_normalize(series)
+    return flattened
 
-    if list(expanded.columns) == [key]:
-        return main
 
-    return pd.concat([main, expanded.add_prefix(f"{key}_")], axis=1)
+def source_text(value: Any):
+    if isinstance(value, dict):
+        return value["text"]
+    elif isinstance(value, list):
+        return " ".join([w["word"] for w in value])
+    else:
+        return None
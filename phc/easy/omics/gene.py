@@ -1,13 +1,12 @@
 import pandas as pd
 from phc.easy.frame import Frame
-from phc.base_client import BaseClient
 from phc.easy.auth import Auth
 
 
 class Gene:
     def get_data_frame(search: str = "", auth_args: Auth = Auth.shared()):
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        client = auth.client()
 
         response = client._api_call(
             "knowledge/genes",
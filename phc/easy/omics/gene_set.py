@@ -1,12 +1,11 @@
 import pandas as pd
-from phc.base_client import BaseClient
 from phc.easy.auth import Auth
 
 
 class GeneSet:
     def get_data_frame(auth_args: Auth = Auth.shared()):
         auth = Auth(auth_args)
-        client = BaseClient(auth.session())
+        client = auth.client()
 
         response = client._api_call(
             "knowledge/gene-sets",
@@ -51,34 +51,52 @@ class GenomicTest(PagingApiItem):
                 Frame.codeable_like_column_expander("sourceFile"),
             ],
         }
-        df = Frame.expand(data_frame, **args)
-
-        if "sets" in df.columns:
-            df = (
-                pd.concat(
-                    data_frame.apply(
-                        lambda x: pd.DataFrame(
-                            [{"index": x.name, **s} for s in x.sets]
-                        ),
-                        axis=1,
-                    ).values
-                )
-                .join(df.drop(["sets"], axis=1), on="index", rsuffix=".test")
-                .drop(["index"], axis=1)
-                .reset_index(drop=True)
-            )
 
         test_type = params.get("type", None)
 
-        if test_type and len(df) > 0:
+        if "sets" not in data_frame.columns:
+            df = Frame.expand(data_frame, **args)
+
+            if test_type and len(df) > 0 and "setType" in df.columns:
+                return df[df.setType == test_type].reset_index(drop=True)
+
+            return df
+
+        # One row per set (pointing to its test) without building a frame
+        # for each test
+        data_frame = data_frame.reset_index(drop=True)
+        sets = data_frame.sets.explode().dropna()
+
+        if test_type:
             # TODO: Remove when API fixed
 
             # NOTE: The API does not filter the returned sets because it is a
-            # nested structure. Since it's not a boatload of information, we opt
-            # to filter client-side for now.
-            return df[df.setType == test_type].reset_index(drop=True)
-
-        return df
+            # nested structure. Since it's not a boatload of information, we
+            # opt to filter client-side (before expanding the tests).
+            sets = sets[sets.str.get("setType") == test_type]
+
+        if len(sets) == 0:
+            return pd.DataFrame()
+
+        if test_type:
+            # Only tests with a matching set are expanded (Frame.expand
+            # doesn't keep the index so tests are renumbered)
+            test_index = sets.index.unique()
+            tests = Frame.expand(
+                data_frame.loc[test_index].reset_index(drop=True), **args
+            )
+            positions = test_index.get_indexer(sets.index)
+        else:
+            # Expand every test so the columns are the same as for the page
+            tests = Frame.expand(data_frame, **args)
+            positions = sets.index
+
+        return (
+            pd.json_normalize(sets.tolist(), max_level=0)
+            .set_index(positions)
+            .join(tests.drop(["sets"], axis=1), rsuffix=".test")
+            .reset_index(drop=True)
+        )
 
     @classmethod
     def get_data_frame(
@@ -1,19 +1,230 @@
+import hashlib
 import inspect
-from typing import Optional
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
 
+import numpy as np
 import pandas as pd
-from funcy import memoize
 from phc.easy.abstract.paging_api_item import PagingApiItem, PagingApiOptions
 from phc.easy.auth import Auth
 from phc.easy.util import without_keys
+from phc.easy.util.api_cache import DIR
 from phc.errors import ApiError
 from pmap import pmap
 
 SEARCH_COLUMNS = ["name", "description", "id"]
 
+# Refresh the persisted catalog once it's older than this many seconds
+CATALOG_MAX_AGE = 60 * 60
 
-def join_strings(row):
-    return " ".join([value for value in row if type(value) == str]).lower()
+# The number of accounts whose projects are requested at once
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Catalogs already loaded by this process (by filename)
+_catalogs: Dict[str, "ProjectCatalog"] = {}
+_catalogs_lock = threading.Lock()
+
+
+class ProjectCatalog:
+    """The projects of every account available to a user
+
+    Persisted next to the API cache (and kept in memory) so that finding a
+    project doesn't list the projects of every account again until the catalog
+    is older than `max_age`. Searches use a lowercase index of the name,
+    description, and id of each project that is built once per catalog.
+    """
+
+    def __init__(
+        self,
+        projects: pd.DataFrame,
+        built_at: Optional[float] = None,
+        filename: Optional[str] = None,
+    ):
+        self.projects = projects.reset_index(drop=True)
+        self.built_at = built_at or time.time()
+        self.filename = filename
+        self._build_search_index()
+
+    @staticmethod
+    def filename_for_auth(auth: Auth, account: Optional[str] = None) -> str:
+        "The catalog of a user (in an environment) for one or all accounts"
+        session = auth.session()
+        claims = session._get_decoded_token()
+        user = claims.get("sub") or claims.get("cognito:username") or auth.token
+
+        unique_hash = hashlib.sha256(
+            f"{session.api_url}:{user}".encode("utf-8")
+        ).hexdigest()[0:8]
+
+        return str(
+            Path(DIR)
+            .expanduser()
+            .joinpath(f"project_catalog_{account or 'all'}_{unique_hash}.json")
+        )
+
+    @staticmethod
+    def load(
+        auth_args: Auth = Auth.shared(),
+        account: Optional[str] = None,
+        refresh: bool = False,
+        max_age: Optional[float] = CATALOG_MAX_AGE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        """Load the catalog from memory or disk (listing the projects again when
+        missing or stale)
+
+        Attributes
+        ----------
+        auth_args : Auth, dict
+            Additional arguments for authentication
+
+        account : str
+            Only list the projects of this account (uses a fresh catalog of
+            all accounts when there is one)
+
+        refresh : bool = False
+            List the projects again even if the catalog is fresh
+
+        max_age : float
+            List the projects again if the catalog is older than this many
+            seconds (None to never expire)
+
+        max_concurrency : int
+            The number of accounts whose projects are listed at once
+        """
+        auth = Auth(auth_args)
+
+        if not refresh and account:
+            catalog = ProjectCatalog._cached(
+                ProjectCatalog.filename_for_auth(auth), max_age
+            )
+            if catalog is not None and account in catalog.accounts:
+                return catalog.for_account(account)
+
+        filename = ProjectCatalog.filename_for_auth(auth, account)
+        catalog = None if refresh else ProjectCatalog._cached(filename, max_age)
+
+        if catalog is None:
+            catalog = ProjectCatalog(
+                Project._list_projects(
+                    auth, account=account, max_concurrency=max_concurrency
+                ),
+                filename=filename,
+            )
+            catalog.write()
+
+            with _catalogs_lock:
+                _catalogs[filename] = catalog
+
+        return catalog
+
+    @staticmethod
+    def _cached(filename: str, max_age: Optional[float]):
+        "The catalog in memory or on disk (or None if missing or stale)"
+        with _catalogs_lock:
+            catalog = _catalogs.get(filename)
+
+        if catalog is None and Path(filename).exists():
+            try:
+                catalog = ProjectCatalog.read(filename)
+            except (ValueError, KeyError):
+                # Ignore a corrupt catalog (e.g. from an interrupted write)
+                return None
+
+            with _catalogs_lock:
+                _catalogs[filename] = catalog
+
+        if catalog is None or catalog.is_stale(max_age):
+            return None
+
+        return catalog
+
+    @staticmethod
+    def clear_cache():
+        "Forget the catalogs loaded by this process (the files are kept)"
+        with _catalogs_lock:
+            _catalogs.clear()
+
+    @staticmethod
+    def read(filename: str):
+        with open(filename, "r") as file:
+            data = json.load(file)
+
+        return ProjectCatalog(
+            pd.DataFrame(data["projects"]),
+            built_at=data["built_at"],
+            filename=filename,
+        )
+
+    def write(self):
+        if self.filename is None:
+            return
+
+        Path(self.filename).parent.mkdir(parents=True, exist_ok=True)
+
+        # Replace the file at once so other processes never read part of it
+        temp_filename = f"{self.filename}.{threading.get_ident()}.tmp"
+        with open(temp_filename, "w") as file:
+            json.dump(
+                {
+                    "built_at": self.built_at,
+                    "projects": self.projects.replace({np.nan: None}).to_dict(
+                        "records"
+                    ),
+                },
+                file,
+            )
+
+        Path(temp_filename).replace(self.filename)
+
+    def is_stale(self, max_age: Optional[float]) -> bool:
+        return max_age is not None and time.time() - self.built_at > max_age
+
+    @property
+    def accounts(self) -> set:
+        if "account" not in self.projects.columns:
+            return set()
+
+        return set(self.projects.account)
+
+    def for_account(self, account: str):
+        "Returns an in-memory catalog of the projects of one account"
+        return ProjectCatalog(
+            self.projects[self.projects.account == account],
+            built_at=self.built_at,
+        )
+
+    def search(self, search: str) -> pd.DataFrame:
+        "Find projects whose id, name, or description contain the search"
+        row = self._rows_by_id.get(search)
+        if row is not None:
+            return self.projects.iloc[[row]]
+
+        if len(self.projects) == 0:
+            return self.projects
+
+        mask = np.char.find(self._haystack, search.lower()) >= 0
+        return self.projects[mask]
+
+    def _build_search_index(self):
+        columns = self.projects.reindex(columns=SEARCH_COLUMNS)
+        strings = [
+            columns[column].where(columns[column].map(type) == str, "")
+            for column in SEARCH_COLUMNS
+        ]
+
+        # Each column is concatenated at once instead of joining each row
+        text = strings[0]
+        for values in strings[1:]:
+            text = text + " " + values
+
+        self._haystack = np.array(text.str.lower().tolist(), dtype=str)
+        self._rows_by_id = {
+            value: row for row, value in enumerate(strings[-1]) if value
+        }
 
 
 class ProjectListOptions(PagingApiOptions):
@@ -30,7 +241,6 @@ class Project(PagingApiItem):
         return ProjectListOptions
 
     @classmethod
-    @memoize
     def get_data_frame(
         cls,
         name: Optional[str] = None,
@@ -40,29 +250,70 @@ class Project(PagingApiItem):
         log: bool = False,
         show_progress: bool = False,
         account: Optional[str] = None,
+        refresh: bool = False,
+        max_age: Optional[float] = CATALOG_MAX_AGE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     ):
         """Execute a request for projects
 
+        Projects of every account (or the given account) are read from the
+        persisted `ProjectCatalog` unless filtered by name or pages.
+
         ## Parameters
 
         Query: `phc.easy.projects.ProjectListOptions`
 
         Execution: `phc.easy.query.Query.execute_paging_api`
+
+        Catalog: `phc.easy.projects.ProjectCatalog.load`
         """
+        auth = Auth(auth_args)
 
+        if name is None and max_pages is None:
+            return ProjectCatalog.load(
+                auth,
+                account=account,
+                refresh=refresh,
+                max_age=max_age,
+                max_concurrency=max_concurrency,
+            ).projects
+
+        get_data_frame_args = without_keys(
+            cls._get_current_args(inspect.currentframe(), locals()),
+            [
+                "auth_args",
+                "account",
+                "refresh",
+                "max_age",
+                "max_concurrency",
+            ],
+        )
+
+        return cls._list_projects(
+            auth,
+            account=account,
+            max_concurrency=max_concurrency,
+            **get_data_frame_args,
+        )
+
+    @classmethod
+    def _list_projects(
+        cls,
+        auth: Auth,
+        account: Optional[str] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        page_size: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        show_progress: bool = False,
+        **get_data_frame_args,
+    ) -> pd.DataFrame:
+        "List the projects of an account (or every account concurrently)"
         if page_size is None:
             # Projects do not have much data so use a higher page size
             page_size = 100
 
         get_data_frame = super().get_data_frame
 
-        auth = Auth(auth_args)
-
-        get_data_frame_args = without_keys(
-            cls._get_current_args(inspect.currentframe(), locals()),
-            ["auth_args", "account", "show_progress"],
-        )
-
         def get_projects_for_account(account: dict):
             try:
                 df = get_data_frame(
@@ -70,6 +321,8 @@ class Project(PagingApiItem):
                     all_results=max_pages is None,
                     auth_args=auth.customized({"account": account["id"]}),
                     show_progress=show_progress,
+                    page_size=page_size,
+                    max_pages=max_pages,
                     **get_data_frame_args,
                 )
                 df["account"] = account["id"]
@@ -85,8 +338,19 @@ class Project(PagingApiItem):
         if account:
             return get_projects_for_account({"id": account})
 
+        accounts = auth.accounts()
+
+        if len(accounts) == 0:
+            return pd.DataFrame()
+
         return pd.concat(
-            list(pmap(get_projects_for_account, auth.accounts()))
+            list(
+                pmap(
+                    get_projects_for_account,
+                    accounts,
+                    threads=max(1, min(max_concurrency, len(accounts))),
+                )
+            )
         ).reset_index(drop=True)
 
     @staticmethod
@@ -94,6 +358,7 @@ class Project(PagingApiItem):
         search: str,
         account: Optional[str] = None,
         auth_args: Auth = Auth.shared(),
+        refresh: bool = False,
     ):
         """Search for a project using given criteria and return results as a data frame
 
@@ -104,14 +369,31 @@ class Project(PagingApiItem):
 
         auth_args : Any
             The authenication to use for the account and project (defaults to shared)
+
+        refresh : bool = False
+            List the projects again instead of using the catalog (a cached
+            catalog is refreshed automatically when nothing matches)
         """
-        projects = Project.get_data_frame(auth_args=auth_args, account=account)
-        text = projects[SEARCH_COLUMNS].agg(join_strings, axis=1)
-        return projects[text.str.contains(search.lower())]
+        started_at = time.time()
+        catalog = ProjectCatalog.load(
+            auth_args, account=account, refresh=refresh
+        )
+        matches = catalog.search(search)
+
+        if len(matches) == 0 and catalog.built_at < started_at:
+            # The project may have been created after the catalog was built
+            matches = ProjectCatalog.load(
+                auth_args, account=account, refresh=True
+            ).search(search)
+
+        return matches
 
     @staticmethod
     def set_current(
-        search: str, account: Optional[str] = None, auth: Auth = Auth.shared()
+        search: str,
+        account: Optional[str] = None,
+        auth: Auth = Auth.shared(),
+        refresh: bool = False,
     ):
         """Search for a project using given criteria, set it to the authentication
         object, and return the matching projects as a data frame
@@ -123,8 +405,13 @@ class Project(PagingApiItem):
 
         auth : Auth
             The authenication to update for the account and project (defaults to shared)
+
+        refresh : bool = False
+            List the projects again instead of using the catalog
         """
-        matches = Project.find(search, account=account, auth_args=auth)
+        matches = Project.find(
+            search, account=account, auth_args=auth, refresh=refresh
+        )
 
         if len(matches) > 1:
             print("Multiple projects found. Try a more specific search")
@@ -1,28 +1,61 @@
 import json
 import math
-from typing import Any, Callable, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import pandas as pd
-from phc.base_client import BaseClient
 from phc.easy.auth import Auth
-from phc.easy.query.api_paging import clean_params, recursive_paging_api_call
+from phc.easy.query.api_paging import (
+    clean_params,
+    iter_paging_api_pages,
+    recursive_paging_api_call,
+)
+from phc.easy.query.code_index import CodeIndex
+from phc.easy.query.composite_aggregation import (
+    DEFAULT_MAX_CONCURRENCY,
+    execute_composite_aggregations_concurrently,
+)
+from phc.easy.query.count_planner import (
+    DEFAULT_TERMS_THRESHOLD,
+    execute_count_buckets_by_fields,
+    execute_counts_by_fields,
+)
 from phc.easy.query.fhir_aggregation import FhirAggregation
 from phc.easy.query.fhir_dsl import (
     DEFAULT_SCROLL_SIZE,
     MAX_RESULT_SIZE,
     execute_single_fhir_dsl,
+    iter_fhir_dsl_pages,
     recursive_execute_fhir_dsl,
     tqdm,
     with_progress,
 )
 from phc.easy.query.fhir_dsl_query import build_queries
-from phc.easy.query.ga4gh import recursive_execute_ga4gh
+from phc.easy.query.ga4gh import (
+    execute_ga4gh_frame,
+    iter_ga4gh_frames,
+    iter_ga4gh_pages,
+)
 from phc.easy.query.url import merge_pattern
 from phc.easy.util import _has_tqdm, extract_codes
 from phc.easy.util.api_cache import FHIR_DSL, APICache
+from phc.easy.util.categorical import concat_frames
 from phc.services import Fhir
+from phc.util.es_sql_frame import datarows_to_frame, schema_dtypes
+from phc.util.shard_writer import ShardWriter
 from toolz import identity
 
+DEFAULT_SHARD_ROWS = 100_000
+
 
 class Query:
     @staticmethod
@@ -54,7 +87,7 @@ class Query:
             raise ValueError("Count is not support for aggregation queries.")
 
         auth = Auth(auth_args)
-        fhir = Fhir(auth.session())
+        fhir = auth.client(Fhir)
 
         response = fhir.execute_es(
             auth.project_id, build_queries(query, page_size=1)[0], scroll="true"
@@ -186,6 +219,236 @@ class Query:
 
         return result_set
 
+    @staticmethod
+    def iter_fhir_dsl(
+        query: dict,
+        all_results: bool = True,
+        auth_args: Auth = Auth.shared(),
+        max_pages: Union[int, None] = None,
+        log: bool = False,
+        **query_kwargs,
+    ) -> Iterator[List[dict]]:
+        """Lazily execute a FHIR query with the DSL, yielding the `_source` of
+        each page of records as it arrives
+
+        The next page is only requested once the previous one has been
+        consumed, so memory usage is bounded by the page size.
+
+        Attributes
+        ----------
+        query : dict
+            The FHIR query to run (is a superset of elasticsearch)
+
+        all_results : bool = True
+            Scroll through all pages of data (otherwise only the first page)
+
+        auth_args : Auth, dict
+            Additional arguments for authentication
+
+        max_pages : int
+            The number of pages to retrieve (useful if working with tons of records)
+
+        log : bool = False
+            Whether to log the elasticsearch query sent to the server
+
+        query_kwargs : dict
+            Arguments to pass to build_queries such as patient_id, patient_ids,
+            and patient_key. (See phc.easy.query.fhir_dsl_query.build_queries)
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({ 'account': '<your-account-name>' })
+        >>> phc.Project.set_current('My Project Name')
+        >>> for records in phc.Query.iter_fhir_dsl({
+          "type": "select",
+          "columns": "*",
+          "from": [{"table": "patient"}],
+        }):
+        >>>     print(len(records))
+        """
+        queries = build_queries(query, **query_kwargs)
+
+        if log:
+            print(json.dumps(queries, indent=4))
+
+        if FhirAggregation.is_aggregation_query(queries[0]):
+            raise ValueError("Cannot iterate over aggregation query results")
+
+        for one_query in queries:
+            if all_results:
+                one_query = {
+                    "limit": [
+                        {"type": "number", "value": 0},
+                        {"type": "number", "value": DEFAULT_SCROLL_SIZE},
+                    ],
+                    **one_query,
+                }
+
+            progress = tqdm(total=MAX_RESULT_SIZE) if _has_tqdm else None
+
+            try:
+                for hits in iter_fhir_dsl_pages(
+                    one_query,
+                    scroll=all_results,
+                    progress=progress,
+                    auth_args=auth_args,
+                    max_pages=max_pages,
+                ):
+                    yield [h["_source"] for h in hits]
+            finally:
+                if progress is not None:
+                    progress.close()
+
+    @staticmethod
+    def export_fhir_dsl(
+        query: dict,
+        dest: str,
+        format: str = "parquet",
+        shard_rows: int = DEFAULT_SHARD_ROWS,
+        transform: Callable[[pd.DataFrame], pd.DataFrame] = identity,
+        auth_args: Auth = Auth.shared(),
+        max_pages: Union[int, None] = None,
+        log: bool = False,
+        **query_kwargs,
+    ):
+        """Stream all results of a FHIR DSL query into rotating Parquet or
+        NDJSON shard files without materializing the full data frame
+
+        A `manifest.json` listing every shard and its row count is written to
+        `dest` once all pages have been retrieved.
+
+        Attributes
+        ----------
+        query : dict
+            The FHIR query to run (is a superset of elasticsearch)
+
+        dest : str
+            The directory to write the shards and manifest into
+
+        format : "parquet" | "ndjson"
+            The file format of each shard
+
+        shard_rows : int
+            The number of rows written to each shard before rotating
+
+        transform : Callable[[pd.DataFrame], pd.DataFrame]
+            Applied to each page of results before it is written
+
+        auth_args : Auth, dict
+            Additional arguments for authentication
+
+        max_pages : int
+            The number of pages to retrieve (useful if working with tons of records)
+
+        log : bool = False
+            Whether to log the elasticsearch query sent to the server
+
+        query_kwargs : dict
+            Arguments to pass to build_queries such as patient_id, patient_ids,
+            and patient_key. (See phc.easy.query.fhir_dsl_query.build_queries)
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({ 'account': '<your-account-name>' })
+        >>> phc.Project.set_current('My Project Name')
+        >>> phc.Query.export_fhir_dsl({
+          "type": "select",
+          "columns": "*",
+          "from": [
+              {"table": "observation"}
+          ],
+        }, "./observations", format="ndjson")
+        """
+        writer = ShardWriter(dest, format=format, shard_rows=shard_rows)
+
+        for records in Query.iter_fhir_dsl(
+            query,
+            all_results=True,
+            auth_args=auth_args,
+            max_pages=max_pages,
+            log=log,
+            **query_kwargs,
+        ):
+            writer.write(transform(pd.DataFrame(records)))
+
+        manifest = writer.close()
+        print(f"Exported {manifest['total_rows']} results to \"{dest}\"")
+
+        return manifest
+
+    @staticmethod
+    def iter_es_sql(
+        statement: str,
+        params: List[dict] = [],
+        subject_id: str = "",
+        fetch_size: int = 1000,
+        auth_args: Auth = Auth.shared(),
+    ) -> Iterator[pd.DataFrame]:
+        """Lazily execute an OpenSearch SQL statement, yielding a typed frame
+        for each page of rows
+
+        The `schema` of the first page is mapped to pandas dtypes once and each
+        page of `datarows` is converted column by column. The cursor is followed
+        until all rows are returned.
+
+        Attributes
+        ----------
+        statement : str
+            The prepared OpenSearch SQL statement
+
+        params : List[dict]
+            The parameters for the SQL statement
+            (e.g. [{"type": "string", "value": "male"}])
+
+        subject_id : str
+            Restrict the query to a given patient
+
+        fetch_size : int
+            The number of rows per page
+
+        auth_args : Auth, dict
+            Additional arguments for authentication
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({ 'account': '<your-account-name>' })
+        >>> phc.Project.set_current('My Project Name')
+        >>> for frame in phc.Query.iter_es_sql(
+            "SELECT id, gender FROM patient WHERE gender = ?",
+            params=[{"type": "string", "value": "female"}]
+        ):
+        >>>     print(len(frame))
+        """
+        auth = Auth(auth_args)
+        fhir = auth.client(Fhir)
+        dtypes = None
+
+        for response in fhir.iter_es_sql(
+            auth.project_id,
+            statement,
+            params=params,
+            subject_id=subject_id,
+            fetch_size=fetch_size,
+        ):
+            if dtypes is None:
+                dtypes = schema_dtypes(response.get("schema", []))
+
+            yield datarows_to_frame(response.get("datarows", []), dtypes)
+
+    @staticmethod
+    def execute_es_sql(statement: str, **kwargs) -> pd.DataFrame:
+        """Execute an OpenSearch SQL statement and return all rows as one typed
+        frame
+
+        See arguments for :func:`~phc.easy.query.Query.iter_es_sql`
+        """
+        return pd.concat(
+            list(Query.iter_es_sql(statement, **kwargs)), ignore_index=True
+        )
+
     @staticmethod
     def execute_paging_api(
         path: str,
@@ -326,6 +589,79 @@ class Query:
 
         return transform(df)
 
+    @staticmethod
+    def iter_paging_api(
+        path: str,
+        params: dict = {},
+        http_verb: str = "GET",
+        all_results: bool = True,
+        auth_args: Auth = Auth.shared(),
+        max_pages: Optional[int] = None,
+        page_size: Optional[int] = None,
+        log: bool = False,
+        show_progress: bool = True,
+        progress: Optional[tqdm] = None,
+        item_key: str = "items",
+        try_count: bool = True,
+        response_to_items: Optional[Callable[[Union[list, dict]], list]] = None,
+    ) -> Iterator[List[dict]]:
+        """Lazily execute an API query that pages through results, yielding
+        each page of items as it arrives
+
+        See `phc.easy.query.Query.execute_paging_api` for the attributes.
+        Results are never cached since they are not retained.
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({ 'account': '<your-account-name>' })
+        >>> phc.Project.set_current('My Project Name')
+        >>> for items in phc.Query.iter_paging_api(
+                "genomics/projects/{project_id}/tests"
+            ):
+        >>>     print(len(items))
+        """
+        auth = Auth(auth_args)
+
+        params = clean_params(params)
+
+        if "project_id" in path:
+            path = path.replace("{project_id}", auth.project_id)
+
+        path, params = merge_pattern(path, params)
+
+        if all_results and page_size is None:
+            page_size = 100
+
+        if log:
+            print(
+                json.dumps(
+                    {"path": path, "method": http_verb, "params": params},
+                    indent=4,
+                )
+            )
+
+        if show_progress and progress is None and _has_tqdm:
+            progress = tqdm()
+
+        try:
+            yield from iter_paging_api_pages(
+                path,
+                params=params,
+                http_verb=http_verb,
+                scroll=all_results or (max_pages is not None),
+                progress=progress if show_progress else None,
+                auth_args=auth_args,
+                max_pages=max_pages,
+                page_size=page_size,
+                item_key=item_key,
+                response_to_items=response_to_items,
+                try_count=try_count,
+            )
+        finally:
+            if progress is not None:
+                progress.close()
+
     @staticmethod
     def execute_fhir_dsl_with_options(
         query: dict,
@@ -400,7 +736,7 @@ class Query:
             frame = (
                 batch_frame
                 if len(frame) == 0
-                else pd.concat([frame, batch_frame]).reset_index(drop=True)
+                else concat_frames([frame, batch_frame])
             )
 
         if raw:
@@ -414,6 +750,9 @@ class Query:
         code_fields: List[str],
         display_query: Optional[str] = None,
         sample_size: Optional[int] = None,
+        use_index: bool = False,
+        refresh_index: bool = False,
+        index_max_age: Optional[float] = None,
         **kwargs,
     ):
         """Find FHIR codes with a display for a given table
@@ -434,6 +773,21 @@ class Query:
             Override the search size for finding codes (may miss codes on later
             records)
 
+        use_index : bool = False
+            Find displays in a locally cached index of all code displays in the
+            project instead of aggregating on the server (built on first use).
+            The system and code of the matches are then extracted from their
+            records as without the index. The index covers every record in the
+            table so filters such as patient_id are not allowed. Each word of
+            display_query must prefix a word of the display.
+
+        refresh_index : bool = False
+            Recount the codes of records updated since the index was last built
+            (replacing their counts)
+
+        index_max_age : Optional[float]
+            Refresh the index automatically if it's older than this many seconds
+
         kwargs : dict
             Arguments to pass to `phc.easy.query.Query.execute_composite_aggregations`
 
@@ -451,6 +805,52 @@ class Query:
         if len(code_fields) == 0:
             raise ValueError("No code columns specified.")
 
+        if use_index:
+            unsupported_keys = set(kwargs.keys()) - {"auth_args"}
+            if len(unsupported_keys) > 0:
+                raise ValueError(
+                    f"Cannot filter the code index by {sorted(unsupported_keys)}"
+                )
+
+            index = CodeIndex.load(
+                table_name,
+                code_fields,
+                refresh=refresh_index,
+                max_age=index_max_age,
+                **kwargs,
+            )
+            agg_result = index.search(display_query or "")
+
+            if display_query is None or len(agg_result) == 0:
+                return agg_result
+
+            displays = set(agg_result.display)
+
+            # Get the system and code of the displays found in the index
+            return Query._extract_codes_with_counts(
+                table_name,
+                agg_result,
+                where_query={
+                    "bool": {
+                        "should": [
+                            {
+                                "terms": {
+                                    f"{field}.display.keyword": list(
+                                        group.display.unique()
+                                    )
+                                }
+                            }
+                            for field, group in agg_result.groupby("field")
+                        ],
+                        "minimum_should_match": 1,
+                    }
+                },
+                code_fields=code_fields,
+                sample_size=sample_size,
+                displays=displays,
+                auth_args=kwargs.get("auth_args", Auth.shared()),
+            )
+
         def agg_composite_to_frame(prefix: str, data: dict):
             frame = pd.json_normalize(data["buckets"])
             frame.columns = frame.columns.str.lstrip("key.")
@@ -527,6 +927,37 @@ class Query:
         if display_query is None or len(agg_result) == 0:
             return agg_result
 
+        return Query._extract_codes_with_counts(
+            table_name,
+            agg_result,
+            where_query={
+                "multi_match": {
+                    "query": display_query,
+                    "fields": [
+                        f"{key}.display" for key in agg_result.field.unique()
+                    ],
+                }
+            },
+            code_fields=code_fields,
+            sample_size=sample_size,
+            display_query=display_query,
+            log=kwargs.get("log", False),
+        )
+
+    @staticmethod
+    def _extract_codes_with_counts(
+        table_name: str,
+        agg_result: pd.DataFrame,
+        where_query: dict,
+        code_fields: List[str],
+        sample_size: Optional[int] = None,
+        display_query: str = "",
+        displays: Optional[Set[str]] = None,
+        log: bool = False,
+        auth_args: Auth = Auth.shared(),
+    ):
+        """Get the system and code of the displays in agg_result (with their
+        counts) from the records matching the where query"""
         min_count = sample_size or agg_result.doc_count.sum()
         filtered_code_fields = agg_result.field.unique()
 
@@ -548,27 +979,19 @@ class Query:
                     }
                     for key in filtered_code_fields
                 ],
-                "where": {
-                    "type": "elasticsearch",
-                    "query": {
-                        "multi_match": {
-                            "query": display_query,
-                            "fields": [
-                                f"{key}.display" for key in filtered_code_fields
-                            ],
-                        }
-                    },
-                },
+                "where": {"type": "elasticsearch", "query": where_query},
             },
             page_size=int(min_count % 9000),
             max_pages=int(math.ceil(min_count / 9000)),
-            log=kwargs.get("log", False),
+            log=log,
+            auth_args=auth_args,
         )
 
         codes = extract_codes(
             map(lambda d: d["_source"], code_results),
             display_query,
             code_fields,
+            displays=displays,
         )
 
         if len(codes) == 0:
@@ -605,6 +1028,8 @@ class Query:
         log: bool = False,
         auth_args: Auth = Auth.shared(),
         max_pages: Union[int, None] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        callback: Optional[Callable[[str, List[dict]], None]] = None,
         **query_kwargs,
     ):
         """Count records by multiple fields
@@ -660,7 +1085,17 @@ class Query:
             Whether to log the elasticsearch query sent to the server
 
         max_pages : int
-            The number of pages to retrieve (useful if working with tons of records)
+            The number of pages to retrieve per key (useful if working with
+            tons of records)
+
+        max_concurrency : int
+            The number of keys paged at the same time. Each key is paged
+            independently so that keys with few buckets finish early.
+
+        callback : Callable[[str, List[dict]], None] (optional)
+            Invoked with the key and buckets of every page as it arrives
+            (possibly from multiple threads). When passed, buckets are not
+            retained and the returned bucket lists are empty.
 
         query_kwargs : dict
             Arguments to pass to build_queries such as patient_id, patient_ids,
@@ -688,15 +1123,17 @@ class Query:
 
         return with_progress(
             tqdm,
-            lambda progress: Query._recursive_execute_composite_aggregations(
+            lambda progress: execute_composite_aggregations_concurrently(
                 table_name=table_name,
                 key_sources_pairs=key_sources_pairs,
+                max_concurrency=max_concurrency,
                 batch_size=batch_size,
                 progress=progress,
                 log=log,
                 auth_args=auth_args,
                 query_overrides=query_overrides,
                 max_pages=max_pages,
+                callback=callback,
                 **query_kwargs,
             ),
         )
@@ -709,6 +1146,7 @@ class Query:
         query_overrides: dict = {},
         log: bool = False,
         auth_args: Auth = Auth.shared(),
+        max_pages: Optional[int] = None,
         **query_kwargs,
     ):
         """Count records by a given field
@@ -734,7 +1172,7 @@ class Query:
                     "columns": [{
                         "type": "elasticsearch",
                         "aggregations": {
-                            "results": {
+                            "gender": {
                                 "composite": {
                                     "sources": [{
                                         "value": {
@@ -743,7 +1181,7 @@ class Query:
                                             }
                                         }
                                     }],
-                                    "size": 100,
+                                    "size": 1000,
                                 }
                             }
                         },
@@ -758,6 +1196,9 @@ class Query:
         log : bool = False
             Whether to log the elasticsearch query sent to the server
 
+        max_pages : int
+            The maximum number of composite aggregation pages to request
+
         query_kwargs : dict
             Arguments to pass to build_queries such as patient_id, patient_ids,
             and patient_key. (See phc.easy.query.fhir_dsl_query.build_queries)
@@ -772,139 +1213,214 @@ class Query:
             field="gender"
         )
         """
-        data = Query.execute_composite_aggregations(
+        buckets = execute_count_buckets_by_fields(
             table_name=table_name,
-            key_sources_pairs=[
-                (
-                    "results",
-                    [{"value": {"terms": {"field": f"{field}.keyword"}}}],
-                )
-            ],
+            fields=[field],
+            probe=False,
             batch_size=batch_size,
+            query_overrides=query_overrides,
             log=log,
             auth_args=auth_args,
-            query_overrides=query_overrides,
+            max_pages=max_pages,
             **query_kwargs,
-        )
+        )[field]
 
         return pd.DataFrame(
-            [
-                {field: r["key"]["value"], "doc_count": r["doc_count"]}
-                for r in data["results"]["buckets"]
-            ]
+            [{field: b["key"], "doc_count": b["doc_count"]} for b in buckets]
         )
 
     @staticmethod
-    def execute_ga4gh(
-        query: dict, all_results: bool = False, auth_args: dict = Auth.shared()
-    ) -> pd.DataFrame:
-        auth = Auth(auth_args)
-        client = BaseClient(auth.session())
-        path = query["path"]
-        http_verb = query.get("http_verb", "POST")
-        results_key = query["results_key"]
-        params = {
-            **{"datasetIds": [auth.project_id]},
-            **{
-                k: v for k, v in query.items() if k not in ["path", "http_verb"]
-            },
-        }
-
-        return recursive_execute_ga4gh(
-            auth=auth,
-            client=client,
-            path=path,
-            http_verb=http_verb,
-            results_key=results_key,
-            params=params,
-            scroll=all_results,
-        )
-
-    @staticmethod
-    def _recursive_execute_composite_aggregations(
+    def get_counts_by_fields(
         table_name: str,
-        key_sources_pairs: List[Tuple[str, List[dict]]],
-        batch_size: int = 100,
-        progress: Union[tqdm, None] = None,
+        fields: List[str],
+        terms_threshold: int = DEFAULT_TERMS_THRESHOLD,
+        batch_size: int = 1000,
         query_overrides: dict = {},
         log: bool = False,
         auth_args: Auth = Auth.shared(),
-        max_pages: Union[int, None] = None,
-        _current_page: int = 1,
-        _prev_results: dict = {},
-        _after_keys: dict = {},
+        max_pages: Optional[int] = None,
         **query_kwargs,
-    ):
-        aggregation = Query.execute_fhir_dsl(
-            {
-                "type": "select",
-                "columns": [
-                    {
-                        "type": "elasticsearch",
-                        "aggregations": {
-                            key: {
-                                "composite": {
-                                    "sources": sources,
-                                    "size": batch_size,
-                                    **(
-                                        {"after": _after_keys[key]}
-                                        if key in _after_keys
-                                        else {}
-                                    ),
-                                }
-                            }
-                            for key, sources in key_sources_pairs
-                            if (len(_after_keys) == 0) or (key in _after_keys)
-                        },
-                    }
-                ],
-                "from": [{"table": table_name}],
-                **query_overrides,
-            },
-            auth_args=auth_args,
-            log=log,
-            **query_kwargs,
-        )
+    ) -> Dict[str, pd.DataFrame]:
+        """Count records by several fields at once
 
-        current_results = aggregation.data
-        results = FhirAggregation.reduce_composite_results(
-            _prev_results, current_results
-        )
+        The cardinality of every field is estimated in a single request. Fields
+        with few values are then counted together with terms aggregations in
+        one more request while the rest are paged with composite aggregations
+        (concurrently). Each frame has a categorical value column (sorted by
+        value) and `int64` counts.
 
-        if (progress is not None) and (_current_page == 1) and max_pages:
-            progress.reset(max_pages)
+        Attributes
+        ----------
+        table_name : str
+            The FHIR Search Service table to retrieve from
 
-        if progress is not None:
-            # Update by count or pages (if max_pages specified)
-            progress.update(
-                1
-                if max_pages
-                else FhirAggregation.count_composite_results(current_results)
-            )
+        fields : List[str]
+            The field names to count the values of (e.g. ["gender", "active"])
 
-        after_keys = FhirAggregation.find_composite_after_keys(
-            current_results, batch_size
-        )
+        terms_threshold : int
+            The estimated number of distinct values under which a field is
+            counted with a terms aggregation
 
-        if len(after_keys) == 0 or (
-            (max_pages is not None) and (_current_page >= max_pages)
-        ):
-            print(
-                f"Retrieved {FhirAggregation.count_composite_results(results)} results"
-            )
-            return results
+        batch_size : int
+            The size of each composite aggregation page
+
+        query_overrides : dict
+            Parts of the FSS query to override
+
+        log : bool = False
+            Whether to log the elasticsearch query sent to the server
+
+        auth_args : Auth, dict
+            Additional arguments for authentication
 
-        return Query._recursive_execute_composite_aggregations(
+        max_pages : int
+            The maximum number of composite aggregation pages to request for
+            each field
+
+        query_kwargs : dict
+            Arguments to pass to build_queries such as patient_id, patient_ids,
+            and patient_key. (See phc.easy.query.fhir_dsl_query.build_queries)
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({ 'account': '<your-account-name>' })
+        >>> phc.Project.set_current('My Project Name')
+        >>> counts = phc.Query.get_counts_by_fields(
+            table_name="patient",
+            fields=["gender", "address.state"]
+        )
+        >>> counts["gender"]
+        """
+        return execute_counts_by_fields(
             table_name=table_name,
-            key_sources_pairs=key_sources_pairs,
+            fields=fields,
+            terms_threshold=terms_threshold,
             batch_size=batch_size,
-            progress=progress,
             query_overrides=query_overrides,
             log=log,
             auth_args=auth_args,
             max_pages=max_pages,
-            _current_page=_current_page + 1,
-            _prev_results=results,
-            _after_keys=after_keys,
             **query_kwargs,
         )
+
+    @staticmethod
+    def _ga4gh_request(query: dict, auth: Auth):
+        "The path, http verb, results key, and params of a ga4gh query"
+        params = {
+            **{"datasetIds": [auth.project_id]},
+            **{
+                k: v for k, v in query.items() if k not in ["path", "http_verb"]
+            },
+        }
+
+        return (
+            query["path"],
+            query.get("http_verb", "POST"),
+            query["results_key"],
+            params,
+        )
+
+    @staticmethod
+    def iter_ga4gh(
+        query: dict,
+        all_results: bool = True,
+        auth_args: dict = Auth.shared(),
+        page_size: Optional[int] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        prefetch: bool = True,
+    ) -> Iterator[pd.DataFrame]:
+        """Lazily execute a ga4gh search, yielding a frame for each page of
+        results as it arrives
+
+        See `phc.easy.query.Query.execute_ga4gh` for the attributes.
+
+        Examples
+        --------
+        >>> import phc.easy as phc
+        >>> phc.Auth.set({ 'account': '<your-account-name>' })
+        >>> phc.Project.set_current('My Project Name')
+        >>> for frame in phc.Query.iter_ga4gh({
+                "path": "variants/search",
+                "results_key": "variants",
+                "variantSetIds": ["<variant-set-id>"]
+            }):
+        >>>     print(len(frame))
+        """
+        auth = Auth(auth_args)
+        path, http_verb, results_key, params = Query._ga4gh_request(query, auth)
+
+        return iter_ga4gh_frames(
+            auth.client(),
+            path,
+            http_verb,
+            results_key,
+            params,
+            scroll=all_results,
+            page_size=page_size,
+            prefetch=prefetch,
+            max_concurrency=max_concurrency,
+        )
+
+    @staticmethod
+    def execute_ga4gh(
+        query: dict,
+        all_results: bool = False,
+        auth_args: dict = Auth.shared(),
+        page_size: Optional[int] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        prefetch: bool = True,
+        raw: bool = True,
+    ) -> Union[List[dict], pd.DataFrame]:
+        """Execute a ga4gh search
+
+        Attributes
+        ----------
+        query : dict
+            The search with its `path`, `results_key`, optional `http_verb`
+            (default: POST), and the params of the request
+
+        all_results : bool = False
+            Retrieve a sample of results (one page) or every page
+
+        auth_args : Auth, dict
+            Additional arguments for authentication
+
+        page_size : int
+            The number of results per page (defaults to `pageSize` of the
+            query, then 1000 when retrieving all results and 50 otherwise)
+
+        max_concurrency : int
+            The number of variant sets (or datasets) that are paged at once
+            when the query has several of them
+
+        prefetch : bool = True
+            Request the next page while the current one is processed
+
+        raw : bool = True
+            Return the list of results instead of a frame built page by page
+        """
+        auth = Auth(auth_args)
+        path, http_verb, results_key, params = Query._ga4gh_request(query, auth)
+
+        args = dict(
+            client=auth.client(),
+            path=path,
+            http_verb=http_verb,
+            results_key=results_key,
+            params=params,
+            scroll=all_results,
+            page_size=page_size,
+            prefetch=prefetch,
+            max_concurrency=max_concurrency,
+        )
+
+        if not raw:
+            return execute_ga4gh_frame(**args)
+
+        results = [
+            result for page in iter_ga4gh_pages(**args) for result in page
+        ]
+
+        print(f"Retrieved {len(results)} results")
+        return results
@@ -1,9 +1,8 @@
-import json
-from typing import Any, Callable, List, Optional, Union
+from typing import Any, Callable, Iterator, List, Optional, Union
 from urllib.parse import parse_qs, quote, urlparse
 
 from funcy import nth
-from phc.base_client import BaseClient
+from phc.base_client import next_page_token as get_next_page_token
 from phc.easy.auth import Auth
 from phc.easy.util import tqdm
 
@@ -18,25 +17,6 @@ def clean_params(params: dict):
     }
 
 
-def get_next_page_token(data: dict):
-    if "links" in data:
-        # If links is present, the only 100% accurate way to get the next token is by
-        # parsing the next URL
-        return parse_next_page_token_from_url(
-            data.get("links", {}).get("next", "")
-        )
-
-    next_page_token = data.get("nextPageToken")
-    if next_page_token and isinstance(next_page_token, dict):
-        # URL encode next page token since it's sometimes a dictionary
-        return json.dumps(next_page_token)
-
-    if next_page_token and isinstance(next_page_token, str):
-        return next_page_token
-
-    return None
-
-
 def parse_next_page_token_from_url(next_url: str):
     "Parse next url and retrieve nextPageToken (or None)"
     return nth(0, parse_qs(urlparse(next_url).query).get("nextPageToken", []))
@@ -62,7 +42,7 @@ def recursive_paging_api_call(
     _count: Optional[Union[float, int]] = None,
 ):
     auth = Auth(auth_args)
-    client = BaseClient(auth.session())
+    client = auth.client()
 
     if _next_page_token:
         params = {**params, "nextPageToken": _next_page_token}
@@ -162,3 +142,69 @@ def recursive_paging_api_call(
         _next_page_token=next_page_token,
         _count=_count,
     )
+
+
+def iter_paging_api_pages(
+    path: str,
+    params: dict = {},
+    http_verb: str = "GET",
+    scroll: bool = False,
+    progress: Optional[tqdm] = None,
+    auth_args: Optional[Auth] = Auth.shared(),
+    max_pages: Optional[int] = None,
+    page_size: Optional[int] = None,
+    item_key: str = "items",
+    response_to_items: Optional[Callable[[Union[list, dict]], list]] = None,
+    try_count: bool = True,
+) -> Iterator[List[dict]]:
+    """Yield each page of items from a paging API as it arrives
+
+    Unlike `recursive_paging_api_call`, previous pages are not retained and the
+    next page is only requested when the consumer asks for it.
+    """
+    auth = Auth(auth_args)
+    client = auth.client()
+
+    if page_size:
+        params = {**params, "pageSize": page_size}
+
+    if scroll is False:
+        max_pages = 1
+
+    if response_to_items is None:
+
+        def response_to_items(data):
+            return data.get(item_key, [])
+
+    if try_count and progress is not None:
+        count = client._api_call(
+            path,
+            http_verb=http_verb,
+            params={**params, "include": "count", "pageSize": 1},
+        ).get("count")
+
+        # Count appears to only go up to 999
+        if count and count != MAX_RESULT_SIZE:
+            progress.reset(count)
+
+    current_page = 1
+
+    while True:
+        response = client._api_call(path, http_verb=http_verb, params=params)
+        current_results = response_to_items(response.data)
+
+        if progress is not None:
+            progress.update(len(current_results))
+
+        if len(current_results) > 0:
+            yield current_results
+
+        next_page_token = get_next_page_token(response.data)
+
+        if (next_page_token is None) or (
+            (max_pages is not None) and (current_page >= max_pages)
+        ):
+            return
+
+        params = {**params, "nextPageToken": next_page_token}
+        current_page += 1
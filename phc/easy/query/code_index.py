@@ -0,0 +1,327 @@
+import json
+import re
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from phc.easy.auth import Auth
+from phc.easy.query.composite_aggregation import (
+    execute_composite_aggregations_concurrently,
+)
+from phc.easy.util.api_cache import DIR
+
+CODE_COLUMNS = ["field", "display", "doc_count"]
+TOKEN_REGEX = re.compile(r"[^\W_]+")
+
+# Indexes persisted in an older format are rebuilt
+INDEX_VERSION = 2
+
+
+def code_sources(field: str):
+    """Composite sources for the display of a code field
+
+    NOTE: The system, code, and display of a coding are indexed as separate
+    multi-valued fields, so aggregating them together would pair the system of
+    one coding with the code of another.
+    """
+    return [{"display": {"terms": {"field": f"{field}.display.keyword"}}}]
+
+
+def tokenize(value: str) -> List[str]:
+    return TOKEN_REGEX.findall(value.lower())
+
+
+class CodeIndex:
+    """Local, searchable index of the codes (display, doc_count)
+    found in the code fields of a FSS table
+
+    Built once through composite aggregations, persisted next to the API cache,
+    and refreshed incrementally so that lookups do not need a network round
+    trip.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        codes: pd.DataFrame,
+        built_at: Optional[float] = None,
+        filename: Optional[str] = None,
+    ):
+        self.table_name = table_name
+        self.codes = codes.reindex(columns=CODE_COLUMNS).reset_index(drop=True)
+        self.built_at = built_at or time.time()
+        self.filename = filename
+        self._build_search_index()
+
+    @staticmethod
+    def filename_for_table(project_id: str, table_name: str) -> str:
+        return str(
+            Path(DIR)
+            .expanduser()
+            .joinpath(f"code_index_{project_id}_{table_name}.json")
+        )
+
+    @staticmethod
+    def load(
+        table_name: str,
+        code_fields: List[str],
+        auth_args: Auth = Auth.shared(),
+        refresh: bool = False,
+        max_age: Optional[float] = None,
+        rebuild: bool = False,
+    ):
+        """Load the code index for a table (building or updating it as needed)
+
+        Attributes
+        ----------
+        table_name : str
+            The FHIR Search Service table to index
+
+        code_fields : List[str]
+            The fields of this table that contain a display.
+            Only fields missing from a persisted index are aggregated.
+
+        auth_args : Auth, dict
+            Additional arguments for authentication
+
+        refresh : bool = False
+            Recount the codes of records updated since the last build
+
+        max_age : float
+            Refresh automatically if the index is older than this many seconds
+
+        rebuild : bool = False
+            Discard the persisted index and aggregate all fields again
+        """
+        auth = Auth(auth_args)
+        filename = CodeIndex.filename_for_table(auth.project_id, table_name)
+
+        index = (
+            None
+            if rebuild or not Path(filename).exists()
+            else CodeIndex.read(filename)
+        )
+
+        if index is None:
+            index = CodeIndex(
+                table_name,
+                pd.DataFrame(columns=CODE_COLUMNS),
+                filename=filename,
+            )
+
+        missing_fields = [
+            f for f in code_fields if f not in set(index.codes.field)
+        ]
+        is_stale = max_age is not None and (
+            time.time() - index.built_at > max_age
+        )
+
+        if (refresh or is_stale) and len(index.codes) > 0:
+            index.refresh(auth_args=auth)
+
+        if len(missing_fields) > 0:
+            index.add_fields(missing_fields, auth_args=auth)
+
+        if index.codes.field.isin(code_fields).all():
+            return index
+
+        return index.subset(code_fields)
+
+    @staticmethod
+    def read(filename: str) -> Optional["CodeIndex"]:
+        "Read a persisted index (or None if it's in an older format)"
+        with open(filename, "r") as file:
+            data = json.load(file)
+
+        if data.get("version") != INDEX_VERSION:
+            return None
+
+        return CodeIndex(
+            data["table_name"],
+            pd.DataFrame(data["codes"], columns=CODE_COLUMNS),
+            built_at=data["built_at"],
+            filename=filename,
+        )
+
+    def write(self):
+        if self.filename is None:
+            return
+
+        Path(self.filename).parent.mkdir(parents=True, exist_ok=True)
+
+        with open(self.filename, "w") as file:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "table_name": self.table_name,
+                    "built_at": self.built_at,
+                    "codes": self.codes.replace({np.nan: None}).to_dict(
+                        "records"
+                    ),
+                },
+                file,
+            )
+
+    def subset(self, code_fields: List[str]):
+        "Return an in-memory index restricted to the given fields"
+        return CodeIndex(
+            self.table_name,
+            self.codes[self.codes.field.isin(code_fields)],
+            built_at=self.built_at,
+        )
+
+    def add_fields(self, code_fields: List[str], auth_args: Auth):
+        "Aggregate the codes of new fields and add them to the index"
+        self._merge(self._aggregate(code_fields, auth_args=auth_args))
+        self.write()
+
+    def refresh(self, auth_args: Auth):
+        """Recount the codes of records updated since the index was last built
+
+        Codes found in the updated records (including new codes) are counted
+        again across the whole table and their counts are replaced. Codes that
+        were only removed from records keep their previous count, so use
+        `CodeIndex.load(..., rebuild=True)` for exact counts.
+        """
+        since = datetime.fromtimestamp(self.built_at, tz=timezone.utc)
+        started_at = time.time()
+
+        updated = self._aggregate(
+            list(self.codes.field.unique()),
+            auth_args=auth_args,
+            query_overrides={
+                "where": {
+                    "type": "elasticsearch",
+                    "query": {
+                        "range": {
+                            "meta.lastUpdated": {"gte": since.isoformat()}
+                        }
+                    },
+                }
+            },
+        )
+
+        if len(updated) > 0:
+            self._merge(self._count(updated, auth_args=auth_args))
+
+        self.built_at = started_at
+        self.write()
+
+    def search(self, query: str, substring: bool = False) -> pd.DataFrame:
+        """Find codes by display
+
+        By default each word of the query must prefix a word of the code (e.g.
+        "hem a1" matches "Hemoglobin A1c"). Pass substring=True to match the
+        query anywhere instead.
+        """
+        if substring:
+            mask = np.char.find(self._haystack, query.lower()) >= 0
+            return self._sorted(self.codes[mask])
+
+        rows = None
+        for token in tokenize(query):
+            matches = self._rows_with_prefix(token)
+            rows = matches if rows is None else rows & matches
+
+        if rows is None:
+            return self._sorted(self.codes)
+
+        return self._sorted(self.codes.loc[sorted(rows)])
+
+    def _rows_with_prefix(self, prefix: str) -> set:
+        start = bisect_left(self._tokens, prefix)
+        rows = set()
+
+        for position in range(start, len(self._tokens)):
+            if not self._tokens[position].startswith(prefix):
+                break
+
+            rows.add(self._token_rows[position])
+
+        return rows
+
+    def _build_search_index(self):
+        text = self.codes.display.fillna("").astype(str)
+        self._haystack = np.array(text.str.lower().tolist(), dtype=str)
+
+        pairs = sorted(
+            (token, row)
+            for row, value in enumerate(self._haystack)
+            for token in set(tokenize(value))
+        )
+        self._tokens = [token for token, _ in pairs]
+        self._token_rows = [row for _, row in pairs]
+
+    def _aggregate(self, code_fields: List[str], auth_args: Auth, **kwargs):
+        results = execute_composite_aggregations_concurrently(
+            table_name=self.table_name,
+            key_sources_pairs=[
+                (field, code_sources(field)) for field in code_fields
+            ],
+            batch_size=1000,
+            auth_args=auth_args,
+            **kwargs,
+        )
+
+        return pd.DataFrame(
+            [
+                {
+                    "field": field,
+                    **bucket["key"],
+                    "doc_count": bucket["doc_count"],
+                }
+                for field, value in results.items()
+                for bucket in value["buckets"]
+            ],
+            columns=CODE_COLUMNS,
+        )
+
+    def _count(self, codes: pd.DataFrame, auth_args: Auth):
+        "Count the given codes across the whole table"
+        # Every record with one of the codes matches, so the counts of those
+        # codes are complete (the other codes of these records are ignored)
+        counts = self._aggregate(
+            list(codes.field.unique()),
+            auth_args=auth_args,
+            query_overrides={
+                "where": {
+                    "type": "elasticsearch",
+                    "query": {
+                        "bool": {
+                            "should": [
+                                {
+                                    "terms": {
+                                        f"{field}.display.keyword": list(
+                                            group.display.unique()
+                                        )
+                                    }
+                                }
+                                for field, group in codes.groupby("field")
+                            ],
+                            "minimum_should_match": 1,
+                        }
+                    },
+                }
+            },
+        )
+
+        return counts.merge(codes[CODE_COLUMNS[:-1]], on=CODE_COLUMNS[:-1])
+
+    def _merge(self, codes: pd.DataFrame):
+        "Add codes to the index (replacing the counts of existing codes)"
+        self.codes = (
+            pd.concat([self.codes, codes], ignore_index=True)
+            .drop_duplicates(CODE_COLUMNS[:-1], keep="last")
+            .reset_index(drop=True)
+        )
+        self._build_search_index()
+
+    @staticmethod
+    def _sorted(frame: pd.DataFrame):
+        return frame.sort_values("doc_count", ascending=False).reset_index(
+            drop=True
+        )
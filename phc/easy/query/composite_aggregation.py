@@ -0,0 +1,156 @@
+import json
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from phc.easy.auth import Auth
+from phc.easy.query.fhir_aggregation import FhirAggregation
+from phc.easy.query.fhir_dsl import execute_single_fhir_dsl
+from phc.easy.query.fhir_dsl_query import build_queries
+from phc.easy.util import tqdm
+from pmap import pmap
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+def composite_aggregation_query(
+    table_name: str,
+    key: str,
+    sources: List[dict],
+    batch_size: int,
+    after_key: Optional[dict] = None,
+    query_overrides: dict = {},
+):
+    return {
+        "type": "select",
+        "columns": [
+            {
+                "type": "elasticsearch",
+                "aggregations": {
+                    key: {
+                        "composite": {
+                            "sources": sources,
+                            "size": batch_size,
+                            **({"after": after_key} if after_key else {}),
+                        }
+                    }
+                },
+            }
+        ],
+        "from": [{"table": table_name}],
+        **query_overrides,
+    }
+
+
+def page_composite_aggregation(
+    table_name: str,
+    key: str,
+    sources: List[dict],
+    batch_size: int = 100,
+    progress: Union[tqdm, None] = None,
+    query_overrides: dict = {},
+    log: bool = False,
+    auth_args: Auth = Auth.shared(),
+    max_pages: Union[int, None] = None,
+    callback: Optional[Callable[[str, List[dict]], None]] = None,
+    **query_kwargs,
+) -> List[dict]:
+    """Page through a single composite aggregation key until exhausted
+
+    Buckets from each page are appended to one list (or handed to the callback
+    instead of being retained when one is given).
+    """
+    buckets = []
+    after_key = None
+    current_page = 1
+
+    while True:
+        queries = build_queries(
+            composite_aggregation_query(
+                table_name,
+                key,
+                sources,
+                batch_size,
+                after_key=after_key,
+                query_overrides=query_overrides,
+            ),
+            **query_kwargs,
+        )
+
+        if len(queries) > 1:
+            raise ValueError(
+                "Cannot combine multiple aggregation query results"
+            )
+
+        if log and current_page == 1:
+            print(json.dumps(queries, indent=4))
+
+        response = execute_single_fhir_dsl(queries[0], auth_args=auth_args)
+        result = response.data.get("aggregations", {}).get(key, {})
+        page_buckets = result.get("buckets", [])
+
+        if callback is not None:
+            callback(key, page_buckets)
+        else:
+            buckets.extend(page_buckets)
+
+        if progress is not None:
+            # Update by count or pages (if max_pages specified)
+            progress.update(1 if max_pages else len(page_buckets))
+
+        after_key = FhirAggregation.find_composite_after_keys(
+            {key: result}, batch_size
+        ).get(key)
+
+        if after_key is None or (
+            (max_pages is not None) and (current_page >= max_pages)
+        ):
+            return buckets
+
+        current_page += 1
+
+
+def execute_composite_aggregations_concurrently(
+    table_name: str,
+    key_sources_pairs: List[Tuple[str, List[dict]]],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    progress: Union[tqdm, None] = None,
+    max_pages: Union[int, None] = None,
+    **page_kwargs,
+) -> Dict[str, dict]:
+    """Page each composite aggregation key independently (and concurrently)
+
+    Returns the same shape as an aggregation response with all buckets for
+    each key (e.g. `{"meta.tag": {"buckets": [...]}}`).
+    """
+    if (progress is not None) and max_pages:
+        progress.reset(max_pages * len(key_sources_pairs))
+
+    def page_key(pair: Tuple[str, List[dict]]):
+        key, sources = pair
+        return (
+            key,
+            page_composite_aggregation(
+                table_name,
+                key,
+                sources,
+                progress=progress,
+                max_pages=max_pages,
+                **page_kwargs,
+            ),
+        )
+
+    if len(key_sources_pairs) == 1 or max_concurrency <= 1:
+        pairs = map(page_key, key_sources_pairs)
+    else:
+        pairs = pmap(
+            page_key,
+            key_sources_pairs,
+            threads=min(max_concurrency, len(key_sources_pairs)),
+        )
+
+    results = {key: {"buckets": buckets} for key, buckets in pairs}
+
+    if page_kwargs.get("callback") is None:
+        count = FhirAggregation.count_composite_results(results)
+        print(f"Retrieved {count} results")
+
+    return results
@@ -0,0 +1,199 @@
+import json
+from typing import Dict, List, Optional
+
+import pandas as pd
+from phc.easy.auth import Auth
+from phc.easy.query.composite_aggregation import (
+    DEFAULT_MAX_CONCURRENCY,
+    execute_composite_aggregations_concurrently,
+)
+from phc.easy.query.fhir_dsl import execute_single_fhir_dsl
+from phc.easy.query.fhir_dsl_query import build_queries
+
+# Fields with (estimated) fewer distinct values than this are counted with a
+# single terms aggregation instead of paging a composite aggregation
+DEFAULT_TERMS_THRESHOLD = 1000
+
+TERMS = "terms"
+COMPOSITE = "composite"
+
+
+def aggregation_query(
+    table_name: str, aggregations: dict, query_overrides: dict = {}
+):
+    return {
+        "type": "select",
+        "columns": [{"type": "elasticsearch", "aggregations": aggregations}],
+        "from": [{"table": table_name}],
+        **query_overrides,
+    }
+
+
+def execute_aggregations(
+    table_name: str,
+    aggregations: dict,
+    query_overrides: dict = {},
+    log: bool = False,
+    auth_args: Auth = Auth.shared(),
+    **query_kwargs,
+) -> dict:
+    "Run several aggregations in one request and return the results by key"
+    queries = build_queries(
+        aggregation_query(table_name, aggregations, query_overrides),
+        **query_kwargs,
+    )
+
+    if len(queries) > 1:
+        raise ValueError("Cannot combine multiple aggregation query results")
+
+    if log:
+        print(json.dumps(queries, indent=4))
+
+    response = execute_single_fhir_dsl(queries[0], auth_args=auth_args)
+
+    return response.data.get("aggregations", {})
+
+
+def probe_cardinality(
+    table_name: str, fields: List[str], **kwargs
+) -> Dict[str, int]:
+    "Estimate the number of distinct values of each field (in one request)"
+    results = execute_aggregations(
+        table_name,
+        {
+            field: {"cardinality": {"field": f"{field}.keyword"}}
+            for field in fields
+        },
+        **kwargs,
+    )
+
+    return {field: results[field]["value"] for field in fields}
+
+
+def plan_count_aggregations(
+    cardinalities: Dict[str, int],
+    terms_threshold: int = DEFAULT_TERMS_THRESHOLD,
+) -> Dict[str, str]:
+    "Choose a terms or composite aggregation for each field"
+    return {
+        field: TERMS if cardinality <= terms_threshold else COMPOSITE
+        for field, cardinality in cardinalities.items()
+    }
+
+
+def count_frame(field: str, buckets: List[dict]) -> pd.DataFrame:
+    "Convert value buckets to a frame with categorical values and int counts"
+    frame = pd.DataFrame(
+        {
+            field: [b["key"] for b in buckets],
+            "doc_count": [b["doc_count"] for b in buckets],
+        }
+    )
+
+    return (
+        frame.astype({field: "category", "doc_count": "int64"})
+        .sort_values(field)
+        .reset_index(drop=True)
+    )
+
+
+def execute_count_buckets_by_fields(
+    table_name: str,
+    fields: List[str],
+    probe: bool = True,
+    terms_threshold: int = DEFAULT_TERMS_THRESHOLD,
+    batch_size: int = 1000,
+    max_pages: Optional[int] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    query_overrides: dict = {},
+    log: bool = False,
+    auth_args: Auth = Auth.shared(),
+    **query_kwargs,
+) -> Dict[str, List[dict]]:
+    """Count records by each field with as few requests as possible
+
+    1. (If probe) estimate the cardinality of every field in one request
+    2. Count all low-cardinality fields with terms aggregations in one request
+    3. Page composite aggregations (concurrently) for the remaining fields and
+       any field whose terms aggregation turned out to be incomplete
+
+    Without a probe every field is paged with composite aggregations since a
+    terms request would be wasted on fields with many values.
+
+    Returns the buckets (`{"key": ..., "doc_count": ...}`) of each field in
+    the order returned by the server.
+    """
+    request_kwargs = dict(
+        query_overrides=query_overrides,
+        log=log,
+        auth_args=auth_args,
+        **query_kwargs,
+    )
+
+    if probe:
+        plan = plan_count_aggregations(
+            probe_cardinality(table_name, fields, **request_kwargs),
+            terms_threshold,
+        )
+    else:
+        plan = {field: COMPOSITE for field in fields}
+
+    buckets_by_field = {}
+    terms_fields = [f for f in fields if plan[f] == TERMS]
+
+    if len(terms_fields) > 0:
+        results = execute_aggregations(
+            table_name,
+            {
+                field: {
+                    "terms": {
+                        "field": f"{field}.keyword",
+                        "size": terms_threshold,
+                    }
+                }
+                for field in terms_fields
+            },
+            **request_kwargs,
+        )
+
+        for field in terms_fields:
+            # The cardinality estimate is approximate so confirm that no
+            # values were left out before accepting the terms result
+            if results[field].get("sum_other_doc_count", 0) == 0:
+                buckets_by_field[field] = results[field]["buckets"]
+
+    composite_fields = [f for f in fields if f not in buckets_by_field]
+
+    if len(composite_fields) > 0:
+        results = execute_composite_aggregations_concurrently(
+            table_name=table_name,
+            key_sources_pairs=[
+                (field, [{"value": {"terms": {"field": f"{field}.keyword"}}}])
+                for field in composite_fields
+            ],
+            batch_size=batch_size,
+            max_pages=max_pages,
+            max_concurrency=max_concurrency,
+            **request_kwargs,
+        )
+
+        for field in composite_fields:
+            buckets_by_field[field] = [
+                {"key": b["key"]["value"], "doc_count": b["doc_count"]}
+                for b in results[field]["buckets"]
+            ]
+
+    return {field: buckets_by_field[field] for field in fields}
+
+
+def execute_counts_by_fields(
+    table_name: str, fields: List[str], **kwargs
+) -> Dict[str, pd.DataFrame]:
+    """Count records by each field (see `execute_count_buckets_by_fields`) as
+    frames with categorical values sorted by value"""
+    return {
+        field: count_frame(field, buckets)
+        for field, buckets in execute_count_buckets_by_fields(
+            table_name, fields, **kwargs
+        ).items()
+    }
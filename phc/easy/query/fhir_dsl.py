@@ -1,4 +1,4 @@
-from typing import Any, Callable, List, Union
+from typing import Any, Callable, Iterator, List, Union
 from lenses import lens
 
 import math
@@ -35,7 +35,7 @@ def execute_single_fhir_dsl(
     _retry_time: int = 1,
 ):
     auth = Auth(auth_args)
-    fhir = Fhir(auth.session())
+    fhir = auth.client(Fhir)
 
     try:
         return fhir.dsl(auth.project_id, query, scroll_id)
@@ -143,3 +143,50 @@ def recursive_execute_fhir_dsl(
         _scroll_id=_scroll_id,
         _prev_hits=results,
     )
+
+
+def iter_fhir_dsl_pages(
+    query: dict,
+    scroll: bool = False,
+    progress: Union[None, tqdm] = None,
+    auth_args: Auth = Auth.shared(),
+    max_pages: Union[int, None] = None,
+) -> Iterator[List[dict]]:
+    """Yield each page of hits for a FSS query as it arrives
+
+    Unlike `recursive_execute_fhir_dsl`, previous pages are not retained so
+    that arbitrarily large result sets can be consumed in constant memory. The
+    next page is only requested when the consumer asks for it.
+    """
+    will_scroll = query_allows_scrolling(query) and scroll
+    scroll_id = "true"
+    current_page = 1
+
+    while True:
+        response = execute_single_fhir_dsl(
+            query,
+            scroll_id=scroll_id if will_scroll else "",
+            retry_backoff=will_scroll,
+            auth_args=auth_args,
+        )
+
+        current_results = response.data.get("hits").get("hits")
+
+        if current_page == 1 and progress:
+            progress.reset(response.data["hits"]["total"]["value"])
+
+        if progress is not None:
+            progress.update(len(current_results))
+
+        if len(current_results) > 0:
+            yield current_results
+
+        if (
+            (len(current_results) == 0)
+            or (will_scroll is False)
+            or ((max_pages is not None) and (current_page >= max_pages))
+        ):
+            return
+
+        scroll_id = response.data.get("_scroll_id", "")
+        current_page += 1
@@ -1,13 +1,15 @@
 from functools import partial, reduce
-from typing import Callable, List, Optional, Union
+from itertools import accumulate, repeat
+from typing import Callable, Iterator, List, Optional, Union
 
-from funcy import chunks
 from lenses import lens
 from phc.easy.query.util import flat_map_pipe
 from phc.easy.util import add_prefixes
-from toolz import compose, curry, identity, pipe
+from toolz import compose, curry, identity
 
 DEFAULT_MAX_TERMS = 30_000
+# Keeps request bodies well under the API limits when terms are long
+DEFAULT_MAX_TERMS_BYTES = 4_000_000
 
 MAX_RESULT_SIZE = 10000
 DEFAULT_SCROLL_SIZE = int(MAX_RESULT_SIZE * 0.9)
@@ -17,13 +19,11 @@ FHIR_WHERE_TYPE = FHIR_WHERE.Get("type", "")
 FHIR_SIMPLE_QUERY = FHIR_WHERE.Get("query", {})
 FHIR_BOOL_QUERY = FHIR_SIMPLE_QUERY.Get("bool", {})
 FHIR_BOOL_MUST_QUERY = FHIR_BOOL_QUERY.Get("must", [])
-FHIR_LIMIT = lens.Get(
-    "limit",
-    [
-        {"type": "number", "value": 0},
-        {"type": "number", "value": DEFAULT_SCROLL_SIZE},
-    ],
-)[1]["value"]
+FHIR_LIMIT_DEFAULT = [
+    {"type": "number", "value": 0},
+    {"type": "number", "value": DEFAULT_SCROLL_SIZE},
+]
+FHIR_LIMIT = lens.Get("limit", FHIR_LIMIT_DEFAULT)[1]["value"]
 
 
 def get_limit(query: dict):
@@ -39,39 +39,126 @@ def and_query_clause_terms(second_query_clause, first_query_clause):
     return {"bool": {"must": [first_query_clause, second_query_clause]}}
 
 
+def _set_where_query(query: dict, where_query: dict, where_type: str):
+    """Replace the where clause query without copying the rest of the query
+
+    Only the dictionaries along the path are copied (the other clauses,
+    e.g. large terms lists, are shared with the original query). Keys keep
+    their order so that serialized queries (and their cache names) don't
+    change.
+    """
+    where = query.get("where", {})
+
+    return {
+        **query,
+        "where": {**where, "query": where_query, "type": where_type},
+    }
+
+
 def and_query_clause(query: dict, query_clause: dict):
     "Append a term/terms clause to an existing FSS query"
-    if FHIR_WHERE.get()(query) == {}:
-        return pipe(
-            query,
-            FHIR_SIMPLE_QUERY.set(query_clause),
-            FHIR_WHERE_TYPE.set("elasticsearch"),
-        )
+    where = query.get("where", {})
 
-    if FHIR_WHERE_TYPE.get()(query) != "elasticsearch":
+    if where == {}:
+        return _set_where_query(query, query_clause, "elasticsearch")
+
+    where_type = where.get("type", "")
+    if where_type != "elasticsearch":
         raise ValueError(
             "Could not add clause to query that is not elasticsearch",
             query_clause,
             query,
         )
 
-    query_keys = list(FHIR_SIMPLE_QUERY.get()(query).keys())
-    bool_keys = FHIR_BOOL_QUERY.get()(query).keys()
+    simple_query = where.get("query", {})
+    bool_query = simple_query.get("bool", {})
+    query_keys = list(simple_query.keys())
+    bool_keys = bool_query.keys()
     if (len(query_keys) == 1 and (query_keys[0] in ["term", "terms"])) or (
         "should" in bool_keys
     ):
-        return FHIR_SIMPLE_QUERY.modify(and_query_clause_terms(query_clause))(
-            query
+        return _set_where_query(
+            query,
+            and_query_clause_terms(query_clause, simple_query),
+            where_type,
         )
 
     if len(bool_keys) == 1 and "must" in bool_keys:
-        return FHIR_BOOL_MUST_QUERY.modify(lambda must: [*must, query_clause])(
-            query
+        return _set_where_query(
+            query,
+            {
+                **simple_query,
+                "bool": {
+                    **bool_query,
+                    "must": [*bool_query["must"], query_clause],
+                },
+            },
+            where_type,
         )
 
     raise ValueError("Could not add clause to query", query_clause, query)
 
 
+def unique(values: list) -> list:
+    "Remove duplicate values (keeping the first of each)"
+    return list(dict.fromkeys(values))
+
+
+def terms_sizes(values: list) -> Iterator[int]:
+    "Approximate bytes of each value in a serialized terms list"
+    # Quotes and the separator (e.g. `"value", `)
+    return (
+        len(value.encode() if isinstance(value, str) else str(value)) + 4
+        for value in values
+    )
+
+
+def terms_size(values: list) -> int:
+    "Approximate bytes of a serialized terms list"
+    try:
+        joined = "".join(values)
+    except TypeError:
+        # Not all strings
+        return sum(terms_sizes(values))
+
+    # Checking for ASCII is constant time (and avoids encoding)
+    size = len(joined) if joined.isascii() else len(joined.encode())
+    return size + 4 * len(values)
+
+
+def chunk_terms(
+    values: list,
+    max_terms: int = DEFAULT_MAX_TERMS,
+    max_bytes: int = DEFAULT_MAX_TERMS_BYTES,
+) -> List[list]:
+    """Split values into chunks of at most max_terms values and (unless a
+    single value is larger) max_bytes bytes"""
+    value_batches = []
+
+    for start in range(0, len(values), max_terms):
+        value_batch = values[start : start + max_terms]
+
+        if terms_size(value_batch) <= max_bytes:
+            value_batches.append(value_batch)
+            continue
+
+        # Split where the running size of the current chunk is too large
+        first = 0
+        offset = 0
+        previous = 0
+        for index, size in enumerate(accumulate(terms_sizes(value_batch))):
+            if size - offset > max_bytes and index > first:
+                value_batches.append(value_batch[first:index])
+                first = index
+                offset = previous
+
+            previous = size
+
+        value_batches.append(value_batch[first:])
+
+    return value_batches
+
+
 def _ids_adder(
     id: Union[str, None] = None,
     ids: List[str] = [],
@@ -99,15 +186,26 @@ def foreign_ids_adder(
 
     return terms_adder(
         {
-            f"{foreign_key}.keyword": [
-                *add_prefixes(foreign_ids, foreign_id_prefixes),
-                *foreign_ids,
-            ]
+            f"{foreign_key}.keyword": _with_prefixes(
+                foreign_ids, foreign_id_prefixes
+            )
         },
         max_terms=max_terms,
     )
 
 
+def _with_prefixes(ids: List[str], prefixes: List[str]) -> List[str]:
+    """The ids with each prefix and then the ids themselves (skipping the
+    duplicates of ids that already have a prefix)"""
+    if len(prefixes) == 1 and not any(
+        map(str.startswith, ids, repeat(prefixes[0]))
+    ):
+        # No prefixed id can be the same as an unprefixed one
+        return [*map(prefixes[0].__add__, ids), *ids]
+
+    return unique([*add_prefixes(ids, prefixes), *ids])
+
+
 def _term_or_terms_adder(
     term: Optional[dict], terms: List[dict], max_terms: int = DEFAULT_MAX_TERMS
 ):
@@ -144,7 +242,11 @@ def term_adder(term: Optional[dict]):
     return partial(and_query_clause, query_clause={"term": term})
 
 
-def terms_adder(terms: Optional[dict], max_terms: int = DEFAULT_MAX_TERMS):
+def terms_adder(
+    terms: Optional[dict],
+    max_terms: int = DEFAULT_MAX_TERMS,
+    max_bytes: int = DEFAULT_MAX_TERMS_BYTES,
+):
     if terms is None:
         return identity
 
@@ -154,8 +256,9 @@ def terms_adder(terms: Optional[dict], max_terms: int = DEFAULT_MAX_TERMS):
         )
 
     key = list(terms.keys())[0]
-    # NOTE: Must convert chunks from generator so that function can be run multiple times
-    value_batches = list(chunks(max_terms, list(terms.values())[0]))
+    value_batches = chunk_terms(
+        list(terms.values())[0], max_terms=max_terms, max_bytes=max_bytes
+    )
 
     def _adder(query):
         return [
@@ -193,7 +296,12 @@ def _limit_adder(page_size: Union[int, None]):
     if page_size is None:
         return identity
 
-    return FHIR_LIMIT.set(page_size)
+    def _adder(query: dict):
+        # Only the limit is copied (instead of the whole query)
+        limit = query.get("limit", FHIR_LIMIT_DEFAULT)
+        return {**query, "limit": [limit[0], {**limit[1], "value": page_size}]}
+
+    return _adder
 
 
 def build_queries(
@@ -1,9 +1,161 @@
-from typing import List, Union
-from phc.easy.auth import Auth
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Union
+
+import pandas as pd
 from phc.base_client import BaseClient
+from phc.base_client import next_page_token as get_next_page_token
+from phc.easy.auth import Auth
+from phc.easy.query.composite_aggregation import DEFAULT_MAX_CONCURRENCY
+from phc.easy.util.categorical import concat_frames
 
+# Page size of a sample of results (scroll=False)
 PAGE_SIZE = 50
 
+# Page size when retrieving all results
+SCROLL_PAGE_SIZE = 1000
+
+# List parameters whose values can be searched separately (the results of a
+# search are the union of the results for each value)
+PARTITION_KEYS = ["variantSetIds", "datasetIds"]
+
+
+def partition_params(params: dict) -> List[dict]:
+    "Split the params into one search per variant set (or dataset)"
+    for key in PARTITION_KEYS:
+        values = params.get(key)
+
+        if isinstance(values, list) and len(values) > 1:
+            return [{**params, key: [value]} for value in values]
+
+    return [params]
+
+
+def _iter_partition_pages(
+    client: BaseClient,
+    path: str,
+    http_verb: str,
+    results_key: str,
+    params: dict,
+    scroll: bool,
+    prefetch: bool,
+) -> Iterator[List[dict]]:
+    def get_page(token: Optional[str]):
+        return client._ga4gh_call(
+            path, http_verb=http_verb, json={**params, "pageToken": token}
+        )
+
+    def get_token(response):
+        results = response.data.get(results_key) or []
+
+        # The server may cap the page size, so only an empty page (or a
+        # missing token) ends the search
+        if scroll is False or len(results) == 0:
+            return None
+
+        return get_next_page_token(response.data)
+
+    if not prefetch:
+        token = params.get("pageToken")
+        while True:
+            response = get_page(token)
+            yield response.data.get(results_key) or []
+
+            token = get_token(response)
+            if token is None:
+                return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(get_page, params.get("pageToken"))
+
+        while future is not None:
+            response = future.result()
+            token = get_token(response)
+            future = (
+                executor.submit(get_page, token) if token is not None else None
+            )
+
+            yield response.data.get(results_key) or []
+
+
+def iter_ga4gh_pages(
+    client: BaseClient,
+    path: str,
+    http_verb: str,
+    results_key: str,
+    params: dict,
+    scroll: bool = False,
+    page_size: Optional[int] = None,
+    prefetch: bool = True,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Iterator[List[dict]]:
+    """Yield each page of results of a ga4gh search as it arrives
+
+    The next page is requested while the current one is consumed. When
+    scrolling, searches over several variant sets (or datasets) are split into
+    one search per id that are paged concurrently, so pages arrive in no
+    particular order.
+    """
+    params = {
+        **params,
+        "pageSize": page_size
+        or params.get("pageSize")
+        or (SCROLL_PAGE_SIZE if scroll else PAGE_SIZE),
+    }
+
+    # Pages are fetched with a synchronous copy of the client so that each
+    # thread gets its own event loop
+    client = client._thread_client()
+
+    def make_iter(partition: dict):
+        return lambda: _iter_partition_pages(
+            client,
+            path,
+            http_verb,
+            results_key,
+            partition,
+            scroll=scroll,
+            prefetch=prefetch,
+        )
+
+    # A page token only applies to the search that returned it
+    partitions = (
+        partition_params(params)
+        if scroll and params.get("pageToken") is None
+        else [params]
+    )
+
+    if len(partitions) == 1:
+        yield from make_iter(partitions[0])()
+        return
+
+    yield from BaseClient._merge_iters(
+        [make_iter(partition) for partition in partitions],
+        max_concurrency=max_concurrency,
+        buffer_size=max_concurrency * 2,
+    )
+
+
+def iter_ga4gh_frames(*args, **kwargs) -> Iterator[pd.DataFrame]:
+    """Yield a frame for each page of results of a ga4gh search
+
+    See arguments for :func:`~phc.easy.query.ga4gh.iter_ga4gh_pages`
+    """
+    for results in iter_ga4gh_pages(*args, **kwargs):
+        if len(results) > 0:
+            yield pd.DataFrame(results)
+
+
+def execute_ga4gh_frame(*args, **kwargs) -> pd.DataFrame:
+    "Build a frame of the results of a ga4gh search page by page"
+    frames = list(iter_ga4gh_frames(*args, **kwargs))
+
+    print(f"Retrieved {sum(len(frame) for frame in frames)} results")
+
+    if len(frames) == 0:
+        return pd.DataFrame()
+
+    return concat_frames(frames)
+
 
 def recursive_execute_ga4gh(
     auth: Auth,
@@ -16,29 +168,27 @@ def recursive_execute_ga4gh(
     next_page_token: Union[str, None] = None,
     _prev_results: List[dict] = [],
 ):
-    page_size = params.get("pageSize", PAGE_SIZE)
-
-    response = client._ga4gh_call(
-        path, http_verb=http_verb, json={**params, "pageToken": next_page_token}
-    )
+    """Retrieve the results of a ga4gh search as a list
 
-    current_results = response.data[results_key]
-    results = [*_prev_results, *current_results]
+    Pages are now retrieved iteratively (see `iter_ga4gh_pages`), and the
+    arguments to resume from a page token are kept for compatibility.
+    """
+    results = list(_prev_results)
 
-    is_last_batch = len(current_results) < page_size or scroll is False
+    if next_page_token is not None:
+        params = {**params, "pageToken": next_page_token}
 
-    if is_last_batch:
-        print(f"Retrieved {len(results)} results")
-        return results
-
-    return recursive_execute_ga4gh(
-        auth=auth,
-        client=client,
-        path=path,
-        http_verb=http_verb,
-        results_key=results_key,
-        params=params,
+    for page in iter_ga4gh_pages(
+        client,
+        path,
+        http_verb,
+        results_key,
+        params,
         scroll=scroll,
-        next_page_token=response.data["nextPageToken"],
-        _prev_results=results,
-    )
+        # Keep the previous default page size
+        page_size=params.get("pageSize", PAGE_SIZE),
+    ):
+        results.extend(page)
+
+    print(f"Retrieved {len(results)} results")
+    return results
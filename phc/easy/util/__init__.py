@@ -1,8 +1,7 @@
 import math
 from functools import reduce, wraps
-from typing import Callable, List, Optional, Union
+from typing import Callable, List, Optional, Set, Union
 
-import pandas as pd
 from funcy import lmapcat
 from toolz import groupby
 
@@ -122,6 +121,8 @@ class Hashabledict(dict):
 
 def get_values_at_codeable_paths(value: dict, keys: List[str]):
     """Extract values from FHIR records based on keys (useful for extracting codes)"""
+    # Imported on first use to keep `import phc.easy` fast
+    import pandas as pd
 
     def _get_value_at_codeable_path(
         value: Union[list, dict], components: List[str], key: str
@@ -150,10 +151,15 @@ def get_values_at_codeable_paths(value: dict, keys: List[str]):
     return lmapcat(lambda key: get_value_at_codeable_path(value, key), keys)
 
 
-def extract_codes(results: list, display: str, code_fields: List[str]):
+def extract_codes(
+    results: list,
+    display: str,
+    code_fields: List[str],
+    displays: Optional[Set[str]] = None,
+):
     """Extract code values from a list of dictionaries based on the code keys.
     Requires a display value to filter results preemptively (instead of
-    filtering afterwards)
+    filtering afterwards) or a set of exact `displays` to keep
     """
 
     codes = set()
@@ -161,14 +167,19 @@ def extract_codes(results: list, display: str, code_fields: List[str]):
     for row in results:
         row_codes = get_values_at_codeable_paths(row, code_fields)
         for code in row_codes:
-            if (
-                isinstance(code, dict)
-                # Poor man's way to filter only matching codes (since Elasticsearch
-                # returns records which will include other codes)
-                and display.lower() in code.get("display", "").lower()
-            ):
+            if not isinstance(code, dict):
+                continue
+
+            # Poor man's way to filter only matching codes (since Elasticsearch
+            # returns records which will include other codes)
+            if displays is not None:
+                if code.get("display") in displays:
+                    codes.add(code)
+            elif display.lower() in code.get("display", "").lower():
                 codes.add(code)
 
+    import pandas as pd
+
     return pd.DataFrame(list(codes))
 
 
@@ -3,13 +3,15 @@ import json
 import re
 import os
 from pathlib import Path
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
 import numpy as np
 import pandas as pd
-from phc.easy.query.fhir_aggregation import FhirAggregation
 from phc.util.csv_writer import CSVWriter
 
+if TYPE_CHECKING:
+    from phc.easy.query.fhir_aggregation import FhirAggregation
+
 TABLE_REGEX = r"^[^F]+FROM (\w+)"
 DIR = "~/Downloads/phc/api-cache"
 DATE_FORMAT_REGEX = (
@@ -23,6 +25,9 @@ class APICache:
     @staticmethod
     def filename_for_query(query: dict, namespace: Optional[str] = None):
         "Descriptive filename with hash of query for easy retrieval"
+        # Imported here since phc.easy.query imports this module
+        from phc.easy.query.fhir_aggregation import FhirAggregation
+
         is_aggregation = FhirAggregation.is_aggregation_query(query)
 
         agg_description = "agg" if is_aggregation else ""
@@ -81,6 +86,8 @@ class APICache:
         )
         print(f'[CACHE] Loading from "{filename}"')
 
+        from phc.easy.query.fhir_aggregation import FhirAggregation
+
         if FhirAggregation.is_aggregation_query(query):
             with open(filename, "r") as f:
                 return FhirAggregation(json.load(f))
@@ -126,7 +133,7 @@ class APICache:
 
     @staticmethod
     def write_agg(
-        query: dict, agg: FhirAggregation, namespace: Optional[str] = None
+        query: dict, agg: "FhirAggregation", namespace: Optional[str] = None
     ):
         folder = Path(DIR).expanduser()
         folder.mkdir(parents=True, exist_ok=True)
@@ -141,7 +148,13 @@ class APICache:
 
     @staticmethod
     def read_csv(filename: str) -> pd.DataFrame:
-        df = pd.read_csv(filename)
+        # Categorical columns are parsed directly into categories
+        categories = (
+            CSVWriter.read_categories(filename)
+            if isinstance(filename, str)
+            else []
+        )
+        df = pd.read_csv(filename, dtype={c: "category" for c in categories})
         min_count = max(min(int(len(df) / 3), 5), 1)
 
         # Columns are considered dates if enough examples of that format are found
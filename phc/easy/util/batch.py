@@ -1,8 +1,9 @@
 import pandas as pd
 from functools import reduce, partial
-from typing import List, Any, Callable, TypeVar
+from typing import Any, Callable, Iterator, List, Optional, TypeVar
 from funcy import chunks, identity
 from phc.easy.util import tqdm
+from phc.easy.util.categorical import concat_frames
 
 
 def chunk(n: int, seq: list):
@@ -32,6 +33,36 @@ def batch_get_frame(
 
         return frames
 
-    return pd.concat(map_chunks(chunked_ids), ignore_index=True).reset_index(
-        drop=True
-    )
+    return concat_frames(map_chunks(chunked_ids)).reset_index(drop=True)
+
+
+def iter_frames(
+    pages: Iterator[List[dict]],
+    chunk_rows: Optional[int] = None,
+    transform: Callable[[pd.DataFrame], pd.DataFrame] = identity,
+) -> Iterator[pd.DataFrame]:
+    """Convert pages of records into transformed data frames as they arrive
+
+    Each page becomes its own frame unless chunk_rows is given, in which case
+    records are regrouped so that every frame (except the last) has exactly
+    chunk_rows rows.
+    """
+    if chunk_rows is None:
+        for page in pages:
+            yield transform(pd.DataFrame(page))
+        return
+
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be a positive integer")
+
+    buffer = []
+
+    for page in pages:
+        buffer.extend(page)
+
+        while len(buffer) >= chunk_rows:
+            yield transform(pd.DataFrame(buffer[:chunk_rows]))
+            buffer = buffer[chunk_rows:]
+
+    if len(buffer) > 0:
+        yield transform(pd.DataFrame(buffer))
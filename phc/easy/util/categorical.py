@@ -0,0 +1,128 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Encode columns whose unique values are at most this fraction of the rows
+DEFAULT_MAX_RATIO = 0.5
+
+# Values that can be dictionary encoded
+ENCODABLE_INFERRED_TYPES = ["string", "empty"]
+
+
+class CategoricalEncoder:
+    """Dictionary-encodes repetitive string columns (e.g. codes, systems,
+    references, and genes) of each batch as categoricals
+
+    The categories of each column are shared across batches (new values are
+    appended) so that every batch has the same codes for the same value and
+    `concat_frames` can combine them without falling back to objects. Once a
+    column is encoded, it is encoded in every later batch.
+
+    Attributes
+    ----------
+    max_ratio : float
+        Encode a column when its unique values are at most this fraction of
+        the rows of the batch
+    """
+
+    def __init__(self, max_ratio: float = DEFAULT_MAX_RATIO):
+        self.max_ratio = max_ratio
+        self.vocabulary: Dict[str, pd.Index] = {}
+
+    def _encode_series(self, column: str, series: pd.Series):
+        "The series as a categorical with the shared categories (or None)"
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, values = series.cat.codes.to_numpy(), series.cat.categories
+        elif series.dtype == object or column in self.vocabulary:
+            # One pass over the values for both the codes and unique values
+            try:
+                codes, values = pd.factorize(series)
+            except TypeError:
+                # Nested values (e.g. lists) can't be encoded
+                return None
+        else:
+            return None
+
+        vocabulary = self.vocabulary.get(column)
+
+        if vocabulary is None and (
+            len(series) < 2
+            or len(values) > len(series) * self.max_ratio
+            or pd.api.types.infer_dtype(values) not in ENCODABLE_INFERRED_TYPES
+        ):
+            return None
+
+        values = pd.Index(values)
+        if vocabulary is None:
+            vocabulary = values
+        else:
+            vocabulary = vocabulary.append(values[~values.isin(vocabulary)])
+
+        self.vocabulary[column] = vocabulary
+
+        # Map the codes of this batch to the shared codes (keeping -1 as NaN)
+        mapping = np.append(vocabulary.get_indexer(values), -1)
+        return pd.Series(
+            pd.Categorical.from_codes(
+                mapping[codes], dtype=pd.CategoricalDtype(vocabulary)
+            ),
+            index=series.index,
+            name=series.name,
+        )
+
+    def encode(self, frame: pd.DataFrame) -> pd.DataFrame:
+        "Encode the repetitive columns of a batch with the shared categories"
+        encoded = {}
+
+        for column in frame.columns[~frame.columns.duplicated()]:
+            series = self._encode_series(column, frame[column])
+
+            if series is not None:
+                encoded[column] = series
+
+        if len(encoded) == 0:
+            return frame
+
+        return frame.assign(**encoded)
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate frames while keeping categorical columns categorical
+
+    `pd.concat` only keeps a categorical column when every frame has the same
+    categories, so the categories of each column are combined first (in order
+    of appearance, which keeps the codes of `CategoricalEncoder` batches).
+    """
+    categories: Dict[str, List[pd.Index]] = {}
+
+    for frame in frames:
+        for column in frame.columns[~frame.columns.duplicated()]:
+            if isinstance(frame[column].dtype, pd.CategoricalDtype):
+                categories.setdefault(column, []).append(
+                    frame[column].cat.categories
+                )
+
+    dtypes = {
+        column: pd.CategoricalDtype(values[0].append(values[1:]).unique())
+        for column, values in categories.items()
+    }
+
+    combined = pd.concat(
+        [
+            frame.astype(
+                {k: v for k, v in dtypes.items() if k in frame.columns}
+            )
+            for frame in frames
+        ],
+        ignore_index=True,
+    )
+
+    # Columns missing from some frames are combined as objects
+    mismatched = {
+        k: v
+        for k, v in dtypes.items()
+        if k in combined.columns and combined[k].dtype != v
+    }
+
+    return combined.astype(mismatched) if len(mismatched) > 0 else combined
@@ -0,0 +1,181 @@
+import re
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+TZ_REGEX = re.compile(r"[-+]\d{2}:?\d{2}Z?$")
+
+# A FHIR date (year, year-month, date, or dateTime) and its offset
+FORMAT_REGEX = re.compile(
+    r"^(\d{4}(?:-\d{2}(?:-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,9})?)?)?)?)?)"
+    r"(Z|[-+]\d{2}:?\d{2})?$"
+)
+
+# Timestamps (in nanoseconds) are limited to these years
+MIN_YEAR = 1678
+MAX_YEAR = 2261
+
+# Longest value parsed without pandas: 2020-01-01T00:00:00.000000000+00:00
+MAX_LENGTH = 35
+
+
+class ParsedDates(NamedTuple):
+    utc: pd.Series
+    local: pd.Series
+    tz: pd.Series
+
+
+def parse_fhir_dates(values: pd.Series) -> ParsedDates:
+    """Parse FHIR dates (year, year-month, date, or dateTime with an offset)
+    into the UTC time, the local time (as if it were UTC), and the offset in
+    hours
+
+    Values are grouped by length and each group that has a single FHIR format
+    is parsed once with that explicit format: the local time is parsed by
+    numpy's ISO 8601 parser and the offset is read from its fixed position.
+    Anything else (including out of range dates) falls back to
+    `pd.to_datetime`.
+    """
+    if not pd.api.types.is_object_dtype(values.dtype) or len(values) == 0:
+        return _parse_with_pandas(values)
+
+    is_present = values.notna().to_numpy()
+    if pd.api.types.infer_dtype(values, skipna=True) == "string":
+        is_string = is_present
+    else:
+        is_string = values.map(type).to_numpy() == str
+
+    strings = values.to_numpy()[is_string].astype(str)
+
+    utc = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    local = utc.copy()
+    tz = np.full(len(values), np.nan)
+    parsed = np.zeros(len(values), dtype=bool)
+
+    if 0 < strings.dtype.itemsize // 4 <= MAX_LENGTH:
+        codes = strings.view(np.int32).reshape(len(strings), -1)
+        lengths = (codes != 0).sum(axis=1)
+        positions = np.flatnonzero(is_string)
+
+        for length in np.unique(lengths):
+            rows = lengths == length
+            result = _parse_format(
+                codes[rows, :length] if len(lengths) > rows.sum() else codes
+            )
+
+            if result is not None:
+                group = positions[rows]
+                local[group], tz[group] = result
+                parsed[group] = True
+
+        offset = np.where(parsed, np.round(tz * 3600), 0).astype(
+            "timedelta64[s]"
+        )
+        utc = local - offset
+
+    remaining = is_present & ~parsed
+    if remaining.any():
+        fallback = _parse_with_pandas(values[remaining])
+        utc[remaining] = fallback.utc.dt.tz_localize(None).to_numpy()
+        local[remaining] = fallback.local.dt.tz_localize(None).to_numpy()
+        tz[remaining] = fallback.tz.to_numpy()
+
+    def to_series(array: np.ndarray):
+        return pd.Series(array, index=values.index).dt.tz_localize("UTC")
+
+    return ParsedDates(
+        utc=to_series(utc),
+        local=to_series(local),
+        tz=pd.Series(tz, index=values.index),
+    )
+
+
+def _parse_format(codes: np.ndarray):
+    """Parse the local time and offset of strings (as character codes) that
+    have the same length, or None if they don't share a FHIR format"""
+    first = "".join(map(chr, codes[0]))
+    match = FORMAT_REGEX.match(first)
+
+    # Offsets are only allowed after a time
+    if match is None or (match.group(2) and len(match.group(1)) < 16):
+        return None
+
+    width = len(match.group(1))
+    sign_column = width if len(first) - width >= 5 else None
+
+    # Every value has the separators of the first one and digits in its year
+    # and offset (numpy validates the rest of the local time)
+    separators = (codes[0] < ord("0")) | (codes[0] > ord("9"))
+    numbers = ~separators
+    numbers[4:width] = False
+
+    if sign_column is not None:
+        separators[sign_column] = False
+        signs = codes[:, sign_column]
+        if not ((signs == ord("+")) | (signs == ord("-"))).all():
+            return None
+
+    for column in np.flatnonzero(separators):
+        if not (codes[:, column] == codes[0, column]).all():
+            return None
+
+    for column in np.flatnonzero(numbers):
+        if not (
+            (codes[:, column] >= ord("0")) & (codes[:, column] <= ord("9"))
+        ).all():
+            return None
+
+    try:
+        local = np.ascontiguousarray(codes[:, :width]).view(f"U{width}")
+        local = local.ravel().astype("datetime64[ns]")
+    except ValueError:
+        # e.g. the 30th of February
+        return None
+
+    # Years outside of the range silently overflow
+    year = sum(
+        (codes[:, column] - ord("0")) * 10 ** (3 - column)
+        for column in range(4)
+    )
+    if year.min() < MIN_YEAR or year.max() > MAX_YEAR:
+        return None
+
+    if sign_column is None:
+        return local, np.zeros(len(codes))
+
+    digits = codes[:, sign_column + 1 :] - ord("0")
+    minutes = digits[:, -2] * 10 + digits[:, -1]
+    hours = digits[:, 0] * 10 + digits[:, 1]
+    if hours.max() > 23 or minutes.max() > 59:
+        return None
+
+    sign = np.where(codes[:, sign_column] == ord("-"), -1.0, 1.0)
+    return local, sign * (hours + minutes / 60)
+
+
+def _parse_with_pandas(values: pd.Series) -> ParsedDates:
+    try:
+        utc = pd.to_datetime(values, utc=True)
+
+        # Cleverness: Use regex to remove TZ and parse as utc=True to
+        # produce local datetime. The column name will have ".local" as
+        # suffix so it'll be clear what's happening.
+        localized = pd.to_datetime(values.str.replace(TZ_REGEX, ""), utc=True)
+    except pd.errors.OutOfBoundsDatetime as ex:
+        print(
+            "[WARNING]: OutOfBoundsDatetime encountered. Casting to NaT.",
+            ex,
+        )
+        utc = pd.to_datetime(values, utc=True, errors="coerce")
+        localized = pd.to_datetime(
+            values.str.replace(TZ_REGEX, ""),
+            utc=True,
+            errors="coerce",
+        )
+
+    return ParsedDates(
+        utc=utc,
+        local=localized,
+        tz=(localized - utc).dt.total_seconds() / 3600,
+    )
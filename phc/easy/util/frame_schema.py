@@ -0,0 +1,177 @@
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from phc.easy.util.categorical import concat_frames
+
+# Arrow backed strings are several times smaller (when pyarrow is installed)
+STRING_DTYPE = "string[pyarrow]" if find_spec("pyarrow") else "string"
+CATEGORY_DTYPE = "category"
+DATE_DTYPE = "datetime64[ns, UTC]"
+
+# Values that are strings (or missing) and can be stored as strings
+STRING_INFERRED_TYPES = ["string", "empty", "categorical"]
+
+
+class FrameSchema:
+    """The column dtypes of the expanded frames of an entity
+
+    Columns are matched by their exact name first and then by the first
+    matching pattern (e.g. `code.coding_*`) since expansion creates a column
+    for each code system. Columns that can't be cast (e.g. nested lists) are
+    left as is.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, str] = {},
+        patterns: List[Tuple[str, str]] = [],
+    ):
+        self.columns = dict(columns)
+        self.patterns = list(patterns)
+        self._dtypes: Dict[str, Optional[str]] = {}
+
+    def extend(
+        self,
+        columns: Dict[str, str] = {},
+        patterns: List[Tuple[str, str]] = [],
+    ) -> "FrameSchema":
+        "Returns a new schema with the added columns and patterns taking precedence"
+        return FrameSchema(
+            columns={**self.columns, **columns},
+            patterns=[*patterns, *self.patterns],
+        )
+
+    def dtype_for(self, column: str) -> Optional[str]:
+        "The dtype for a column name (or None when the schema doesn't have one)"
+        if column not in self._dtypes:
+            self._dtypes[column] = self.columns.get(column) or next(
+                (
+                    dtype
+                    for pattern, dtype in self.patterns
+                    if fnmatchcase(column, pattern)
+                ),
+                None,
+            )
+
+        return self._dtypes[column]
+
+    def cast(self, frame: pd.DataFrame) -> pd.DataFrame:
+        "Cast the columns of a frame to the schema dtypes"
+        casted = {}
+
+        for column in frame.columns.unique():
+            dtype = self.dtype_for(str(column))
+
+            if dtype is not None and str(frame[column].dtype) != dtype:
+                series = _cast_series(frame[column], dtype)
+                if series is not None:
+                    casted[column] = series
+
+        if len(casted) == 0:
+            return frame
+
+        return frame.assign(**casted)
+
+    def concat(self, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        "Cast and concatenate frames (keeping categorical columns categorical)"
+        return concat_frames([self.cast(frame) for frame in frames])
+
+
+def _cast_series(series: pd.Series, dtype: str) -> Optional[pd.Series]:
+    "Cast a series to a dtype (or None if the values don't fit)"
+    try:
+        if dtype.startswith("datetime64"):
+            return pd.to_datetime(series, utc=True, errors="coerce")
+
+        if dtype in [CATEGORY_DTYPE, STRING_DTYPE]:
+            if (
+                pd.api.types.infer_dtype(series, skipna=True)
+                not in STRING_INFERRED_TYPES
+            ):
+                return None
+
+            return series.astype(dtype)
+
+        return pd.to_numeric(series, errors="coerce").astype(dtype)
+    except (TypeError, ValueError):
+        return None
+
+
+# Elements shared by the DSTU3 resources
+BASE_SCHEMA = FrameSchema(
+    columns={
+        "id": STRING_DTYPE,
+        "resourceType": CATEGORY_DTYPE,
+        "status": CATEGORY_DTYPE,
+        "language": CATEGORY_DTYPE,
+        "gender": CATEGORY_DTYPE,
+    },
+    patterns=[
+        # Added by Frame.expand for each date column
+        ("*.tz", "float32"),
+        ("*.local", DATE_DTYPE),
+        ("*.reference", STRING_DTYPE),
+        ("*.display", STRING_DTYPE),
+        ("*.text", STRING_DTYPE),
+        # Quantities (e.g. valueQuantity.system__unitsofmeasure.org__value)
+        ("*Quantity.*__value", "float64"),
+        ("*Quantity.*__unit", CATEGORY_DTYPE),
+        ("*Quantity.*__code", CATEGORY_DTYPE),
+        ("*.system", CATEGORY_DTYPE),
+        ("*_system", CATEGORY_DTYPE),
+    ],
+)
+
+SCHEMAS: Dict[str, FrameSchema] = {
+    "observation": BASE_SCHEMA.extend(
+        columns={"valueString": STRING_DTYPE},
+        patterns=[
+            ("valueQuantity.*__comparator", CATEGORY_DTYPE),
+            ("interpretation.*", CATEGORY_DTYPE),
+        ],
+    ),
+    "condition": BASE_SCHEMA.extend(
+        columns={
+            "clinicalStatus": CATEGORY_DTYPE,
+            "verificationStatus": CATEGORY_DTYPE,
+        },
+        patterns=[("category.*", CATEGORY_DTYPE)],
+    ),
+    "patient": BASE_SCHEMA.extend(
+        columns={
+            "active": "boolean",
+            "deceasedBoolean": "boolean",
+            "maritalStatus": CATEGORY_DTYPE,
+        }
+    ),
+}
+
+
+def register_schema(table_name: str, schema: FrameSchema):
+    "Use a schema for the frames of an FSS table (replacing any existing one)"
+    SCHEMAS[table_name] = schema
+    _schema_for_codes.cache_clear()
+
+
+def get_schema(table_name: str, code_fields: List[str] = []) -> FrameSchema:
+    """The schema for an FSS table with categorical columns for its code fields
+    (e.g. `code.coding_system__loinc.org__code`)"""
+    return _schema_for_codes(table_name, tuple(code_fields))
+
+
+@lru_cache(maxsize=None)
+def _schema_for_codes(table_name: str, code_fields: Tuple[str, ...]):
+    return SCHEMAS.get(table_name, BASE_SCHEMA).extend(
+        patterns=[
+            # The date and quantity patterns still take precedence
+            *[
+                pattern
+                for pattern in BASE_SCHEMA.patterns
+                if pattern[1] != CATEGORY_DTYPE
+            ],
+            *[(f"{field}_*", CATEGORY_DTYPE) for field in code_fields],
+        ]
+    )
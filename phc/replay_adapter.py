@@ -0,0 +1,315 @@
+"""A Python module for replaying recorded API responses without a network."""
+
+import asyncio
+import json
+import os
+import random
+import threading
+from collections import defaultdict, deque
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from phc.adapter import Adapter
+
+
+def request_key(http_verb: str, api_url: str, params: Optional[dict] = None):
+    """The key that a request is matched by: the verb, path, and sorted query
+    parameters (the host is ignored so recordings work across environments)"""
+    url = urlparse(api_url)
+    query = parse_qsl(url.query) + [
+        (k, str(v)) for k, v in (params or {}).items() if v is not None
+    ]
+
+    path = url.path
+    if len(query) > 0:
+        path = f"{path}?{urlencode(sorted(query))}"
+
+    return f"{http_verb.upper()} {path}"
+
+
+def body_size(req_args: dict) -> int:
+    "Size in bytes of a request body (used to simulate bandwidth)"
+    if req_args.get("json") is not None:
+        return len(json.dumps(req_args["json"]))
+
+    data = req_args.get("data")
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if isinstance(data, str):
+        return len(data.encode())
+
+    return 0
+
+
+class RecordingAdapter(Adapter):
+    """Records every request and response sent through another adapter so
+    that they can be replayed with `ReplayAdapter`
+
+    Parameters
+    ----------
+    path : str
+        The cassette file to write with `save()`
+    adapter : Adapter, optional
+        The adapter that sends the requests, by default `Adapter()`
+
+    Examples
+    --------
+    >>> import phc
+    >>> from phc.replay_adapter import RecordingAdapter
+    >>> recorder = RecordingAdapter("./cassettes/patients.json")
+    >>> phc.easy.Auth.set({"adapter": recorder})
+    >>> phc.easy.Patient.get_data_frame()
+    >>> recorder.save()
+    """
+
+    def __init__(self, path: str, adapter: Optional[Adapter] = None):
+        super().__init__()
+        self.path = path
+        self.adapter = adapter or Adapter()
+        self.should_refresh = self.adapter.should_refresh
+        self.interactions: List[dict] = []
+
+    async def send(
+        self,
+        *,
+        http_verb: str,
+        api_url: str,
+        req_args: dict,
+        trust_env: bool,
+        timeout: int,
+    ):
+        res = await self.adapter.send(
+            http_verb=http_verb,
+            api_url=api_url,
+            req_args=req_args,
+            trust_env=trust_env,
+            timeout=timeout,
+        )
+
+        self.interactions.append(
+            {
+                "request": {
+                    "key": request_key(
+                        http_verb, api_url, req_args.get("params")
+                    ),
+                    "json": req_args.get("json"),
+                },
+                "response": {
+                    "status_code": res["status_code"],
+                    "headers": dict(res.get("headers") or {}),
+                    "data": res["data"],
+                },
+            }
+        )
+
+        return res
+
+    def save(self):
+        "Write the recorded interactions to the cassette file"
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self.path, "w") as f:
+            json.dump({"interactions": self.interactions}, f, indent=2)
+
+
+class ReplayAdapter(Adapter):
+    """Serves recorded responses instead of sending requests
+
+    Responses are matched by the verb, path, and query parameters of the
+    request and served in the order they were recorded (e.g. each page of a
+    scroll). Requests can be slowed down and failed on purpose to measure the
+    throughput of the SDK deterministically.
+
+    Parameters
+    ----------
+    cassettes : str | List[str], optional
+        Cassette files (see `RecordingAdapter`) or folders of them
+    latency : float | Callable[[str], float], optional
+        Seconds added to every request (or a function of the request key),
+        by default 0
+    bandwidth : float, optional
+        Bytes per second used to delay requests by their body and response
+        size, by default None (unlimited)
+    error_rate : float, optional
+        The fraction of requests that fail, by default 0
+    error_status : int, optional
+        The status code of a failed request or None to raise a
+        `ConnectionResetError` instead, by default 503
+    seed : int, optional
+        The seed that picks which requests fail (the same ones however the
+        requests are spread over threads), by default 0
+    repeat : bool, optional
+        Start over at the first response of a request after the last one is
+        served, by default False
+    accept_uploads : bool, optional
+        Respond 200 to PUT requests without a recording (e.g. presigned upload
+        URLs), by default True
+
+    Examples
+    --------
+    >>> import phc
+    >>> from phc.replay_adapter import ReplayAdapter
+    >>> adapter = ReplayAdapter("./cassettes/patients.json", latency=0.05)
+    >>> phc.easy.Auth.set({"adapter": adapter, "account": "demo", "project_id": "..."})
+    >>> phc.easy.Patient.get_data_frame()
+    >>> adapter.stats
+    """
+
+    def __init__(
+        self,
+        cassettes: Union[str, List[str], None] = None,
+        latency: Union[float, Callable[[str], float]] = 0,
+        bandwidth: Optional[float] = None,
+        error_rate: float = 0,
+        error_status: Optional[int] = 503,
+        seed: int = 0,
+        repeat: bool = False,
+        accept_uploads: bool = True,
+    ):
+        super().__init__()
+        self.should_refresh = False
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.repeat = repeat
+        self.accept_uploads = accept_uploads
+
+        self.seed = seed
+        self._recorded: Dict[str, List[dict]] = defaultdict(list)
+        self._pending: Dict[str, deque] = {}
+        self._attempts: Dict[str, int] = defaultdict(int)
+        # Requests are sent from many threads (e.g. pmap)
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+        }
+
+        if isinstance(cassettes, str):
+            cassettes = [cassettes]
+
+        for cassette in cassettes or []:
+            self.load(cassette)
+
+    def load(self, path: str):
+        "Add the interactions of a cassette file (or folder of them)"
+        if os.path.isdir(path):
+            for file_name in sorted(os.listdir(path)):
+                if file_name.endswith(".json"):
+                    self.load(os.path.join(path, file_name))
+            return
+
+        with open(path, "r") as f:
+            for interaction in json.load(f).get("interactions", []):
+                self._add_response(
+                    interaction["request"]["key"], interaction["response"]
+                )
+
+    def add(
+        self,
+        http_verb: str,
+        url: str,
+        data=None,
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        params: Optional[dict] = None,
+    ):
+        "Add a response for a request (e.g. the next page of a list)"
+        self._add_response(
+            request_key(http_verb, url, params),
+            {
+                "status_code": status_code,
+                "headers": headers or {},
+                "data": data,
+            },
+        )
+        return self
+
+    def _add_response(self, key: str, response: dict):
+        self._recorded[key].append(response)
+        self._pending.setdefault(key, deque()).append(response)
+
+    def _next_response(self, key: str, http_verb: str) -> dict:
+        pending = self._pending.get(key)
+
+        if not pending and self.repeat and len(self._recorded[key]) > 0:
+            pending = self._pending[key] = deque(self._recorded[key])
+
+        if pending:
+            return pending.popleft()
+
+        if http_verb.upper() == "PUT" and self.accept_uploads:
+            return {"status_code": 200, "headers": {}, "data": ""}
+
+        raise ValueError(f"No recorded response for '{key}'")
+
+    def _fails(self, key: str, attempt: int) -> bool:
+        # Seeded by the request itself (not a shared sequence) so the order in
+        # which threads send requests doesn't change which ones fail
+        return (
+            random.Random(f"{self.seed}:{key}:{attempt}").random()
+            < self.error_rate
+        )
+
+    async def send(
+        self,
+        *,
+        http_verb: str,
+        api_url: str,
+        req_args: dict,
+        trust_env: bool,
+        timeout: int,
+    ):
+        key = request_key(http_verb, api_url, req_args.get("params"))
+        sent = body_size(req_args)
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_sent"] += sent
+            attempt = self._attempts[key]
+            self._attempts[key] += 1
+
+        latency = self.latency(key) if callable(self.latency) else self.latency
+
+        if self.error_rate > 0 and self._fails(key, attempt):
+            with self._lock:
+                self.stats["errors"] += 1
+
+            await asyncio.sleep(latency)
+
+            if self.error_status is None:
+                raise ConnectionResetError(f"Injected error for '{key}'")
+
+            return {
+                "data": {"error": "Injected error"},
+                "headers": {},
+                "status_code": self.error_status,
+            }
+
+        with self._lock:
+            response = self._next_response(key, http_verb)
+
+        data = response.get("data")
+        received = len(
+            data.encode() if isinstance(data, str) else json.dumps(data)
+        )
+
+        with self._lock:
+            self.stats["bytes_received"] += received
+
+        if self.bandwidth:
+            latency += (sent + received) / self.bandwidth
+
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+        return {
+            "data": data,
+            "headers": response.get("headers") or {},
+            "status_code": response.get("status_code", 200),
+        }
@@ -2,19 +2,42 @@
 Contains services for accessing different parts of the PHC platform.
 """
 
-from phc.services.accounts import Accounts
-from phc.services.agents import Agents
-from phc.services.analytics import Analytics
-from phc.services.fhir import Fhir
-from phc.services.projects import Projects
-from phc.services.files import Files
-from phc.services.cohorts import Cohorts
-from phc.services.genomics import Genomics
-from phc.services.tools import Tools
-from phc.services.workflows import Workflows
-from phc.services.genomic_ingestions import GenomicIngestions, IngestionStep
-from phc.services.tasks import Tasks
-from phc.services.patient_ml import PatientML
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from phc.services.accounts import Accounts
+    from phc.services.agents import Agents
+    from phc.services.analytics import Analytics
+    from phc.services.fhir import Fhir
+    from phc.services.projects import Projects
+    from phc.services.files import Files
+    from phc.services.cohorts import Cohorts
+    from phc.services.genomics import Genomics
+    from phc.services.tools import Tools
+    from phc.services.workflows import Workflows
+    from phc.services.genomic_ingestions import GenomicIngestions, IngestionStep
+    from phc.services.tasks import Tasks
+    from phc.services.patient_ml import PatientML
+
+# Each name is imported from its module on first access so that importing
+# this package does not import every module (and their dependencies)
+_LAZY_IMPORTS = {
+    "Accounts": "phc.services.accounts",
+    "Agents": "phc.services.agents",
+    "Analytics": "phc.services.analytics",
+    "Fhir": "phc.services.fhir",
+    "Projects": "phc.services.projects",
+    "Files": "phc.services.files",
+    "Cohorts": "phc.services.cohorts",
+    "Genomics": "phc.services.genomics",
+    "Tools": "phc.services.tools",
+    "Workflows": "phc.services.workflows",
+    "GenomicIngestions": "phc.services.genomic_ingestions",
+    "IngestionStep": "phc.services.genomic_ingestions",
+    "Tasks": "phc.services.tasks",
+    "PatientML": "phc.services.patient_ml",
+}
 
 __all__ = [
     "Accounts",
@@ -47,3 +70,19 @@ __pdoc__ = {
     "tasks": False,
     "patient_ml": False,
 }
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'phc.services' has no attribute '{name}'")
+
+    value = getattr(importlib.import_module(module_name), name)
+
+    # Cache the value so this function is only called once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_LAZY_IMPORTS.keys()))
@@ -1,6 +1,6 @@
 """A Python Module for Cohorts"""
 
-from typing import Optional
+from typing import Iterator, Optional
 from phc.base_client import BaseClient
 from phc import ApiResponse
 from urllib.parse import urlencode
@@ -125,3 +125,38 @@ class Cohorts(BaseClient):
         return self._api_call(
             f"cohorts?{urlencode(query_dict)}", http_verb="GET"
         )
+
+    def iter_list(
+        self,
+        project_id: str,
+        page_size: int = 1000,
+        name: Optional[str] = None,
+        prefetch: bool = True,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every cohort in a project (across all pages)
+
+        Parameters
+        ----------
+        project_id: str
+            The project ID to search within
+        page_size : int, optional
+            The page size, by default 1000
+        name : str, optional
+            A cohort name filter, by default None
+        prefetch : bool, optional
+            Request the next page while the current one is consumed, by default True
+
+        Returns
+        -------
+        Iterator[dict]
+            The cohorts
+        """
+        return self._iter_list(
+            lambda client, token: client.get_list(
+                project_id,
+                page_size=page_size,
+                next_page_token=token,
+                name=name,
+            ),
+            prefetch=prefetch,
+        )
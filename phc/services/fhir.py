@@ -4,7 +4,7 @@ import warnings
 
 from phc.base_client import BaseClient
 from phc import ApiResponse
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional
 
 
 class Fhir(BaseClient):
@@ -135,6 +135,8 @@ class Fhir(BaseClient):
         statement: str,
         params: List[Dict] = [],
         subject_id="",
+        fetch_size: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> ApiResponse:
         """Executes an OpenSearch SQL against fhir-search-service
 
@@ -148,6 +150,12 @@ class Fhir(BaseClient):
             The parameters for the SQL statement
         subject_id : str, optional
             The subject ID
+        fetch_size : int, optional
+            The number of rows per page. When set, the response includes a
+            cursor if more rows are available.
+        cursor : str, optional
+            The cursor of a previous response to fetch the next page for
+            (statement and params are ignored)
 
         Returns
         -------
@@ -158,8 +166,74 @@ class Fhir(BaseClient):
         if subject_id is not None and subject_id != "":
             api_path = f"{api_path}/patients/{subject_id}"
 
+        if cursor is not None:
+            body = {"cursor": cursor}
+        else:
+            body = {"query": statement, "parameters": params}
+
+            if fetch_size is not None:
+                body["fetch_size"] = fetch_size
+
         return self._api_call(
             api_path=api_path,
             http_verb="POST",
-            json={"query": statement, "parameters": params},
+            json=body,
+        )
+
+    def iter_es_sql(
+        self,
+        project_id: str,
+        statement: str,
+        params: List[Dict] = [],
+        subject_id="",
+        fetch_size: int = 1000,
+    ) -> Iterator[ApiResponse]:
+        """Executes an OpenSearch SQL against fhir-search-service, following the
+        cursor until all rows have been returned
+
+        Only the first page includes the schema. The next page is requested
+        once the previous one has been consumed.
+
+        Parameters
+        ----------
+        project_id : str
+            The project ID
+        statement : str
+            The prepared OpenSearch SQL statement
+        params: List[Dict]
+            The parameters for the SQL statement
+        subject_id : str, optional
+            The subject ID
+        fetch_size : int
+            The number of rows per page
+
+        Returns
+        -------
+        Iterator[phc.ApiResponse]
+            The response of each page
+
+        Examples
+        --------
+        >>> from phc.services import Fhir
+        >>> fhir = Fhir(session)
+        >>> for page in fhir.iter_es_sql(project_id, "SELECT id FROM patient"):
+        >>>     print(len(page.get("datarows")))
+        """
+        response = self.es_sql(
+            project_id,
+            statement,
+            params=params,
+            subject_id=subject_id,
+            fetch_size=fetch_size,
         )
+
+        while True:
+            yield response
+
+            cursor = response.get("cursor")
+            if not cursor or len(response.get("datarows", [])) == 0:
+                return
+
+            response = self.es_sql(
+                project_id, statement, subject_id=subject_id, cursor=cursor
+            )
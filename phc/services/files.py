@@ -1,14 +1,28 @@
 """A Python Module for Files"""
 
+import itertools
 import os
 import math
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import (
+    AsyncIterable,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
 import backoff
 from phc.base_client import BaseClient
 from phc import ApiResponse
 from urllib.parse import urlencode
-from urllib.request import urlretrieve
+from urllib.request import urlopen, urlretrieve
 from phc.errors import ApiError, ClientError
+from phc.util.sync_manifest import MANIFEST_FILE_NAME, SyncManifest
 
 
 class FileArchiveError(ClientError):
@@ -32,13 +46,17 @@ class Files(BaseClient):
 
     _MULTIPART_MIN_SIZE = 5 * 1024 * 1024
     _MAX_PARTS = 10000
+    _READ_SIZE = 1024 * 1024
 
     def upload(
         self,
         project_id: str,
-        source: str,
+        source: Union[
+            str, bytes, BinaryIO, Iterable[bytes], AsyncIterable[bytes]
+        ],
         file_name: Optional[str] = None,
         overwrite: Optional[bool] = False,
+        part_size: Optional[int] = None,
     ) -> ApiResponse:
         """Upload a file.
 
@@ -46,12 +64,18 @@ class Files(BaseClient):
         ----------
         project_id : str
             The project ID
-        source : str
-            The path of the file to upload
+        source : str, bytes, file-like object, or (async) iterable of bytes
+            The path of the file to upload or the content to upload. Streams
+            (e.g. a gzip stream or the stdout of a process) are read one part
+            at a time so the whole content is never held in memory.
         file_name : str, optional
             The name of the file, If None will default to the actual base file name.
+            Required when the source is not a path or named file.
         overwrite : bool, optional
             True to overwrite an existing file of the same name, by default False
+        part_size : int, optional
+            The size of each part of a multipart upload (at least 5 MiB), by
+            default 5 MiB for streams and enough for the whole file for paths
 
         Returns
         -------
@@ -63,79 +87,173 @@ class Files(BaseClient):
         >>> from phc.services import Files
         >>> files = files(session)
         >>> files.upload(project_id="db3e09e9-1ecd-4976-aa5e-70ac7ada0cc3", source="./myfile.txt", overwrite=True)
+
+        >>> process = subprocess.Popen(["bcftools", "view", "-Oz", "in.vcf"], stdout=subprocess.PIPE)
+        >>> files.upload(project_id="db3e09e9-1ecd-4976-aa5e-70ac7ada0cc3", source=process.stdout, file_name="out.vcf.gz")
         """
-        file_size = os.path.getsize(source)
-        if file_size > self._MULTIPART_MIN_SIZE:
-            res = self._api_call(
-                "uploads",
-                json={
-                    "name": (
-                        file_name
-                        if file_name is not None
-                        else os.path.basename(source)
-                    ),
-                    "datasetId": project_id,
-                    "overwrite": overwrite,
-                },
+        if part_size is not None and part_size < self._MULTIPART_MIN_SIZE:
+            raise ValueError(
+                f"'part_size' must be at least {self._MULTIPART_MIN_SIZE} bytes"
+            )
+
+        if isinstance(source, str):
+            file_name = (
+                file_name if file_name is not None else os.path.basename(source)
             )
-            upload_id = res.get("uploadId")
-            part_size = max(
+            file_size = os.path.getsize(source)
+            if file_size <= self._MULTIPART_MIN_SIZE:
+                return self._upload_single(
+                    project_id, file_name, overwrite, source, file_size
+                )
+
+            part_size = part_size or max(
                 math.ceil(file_size / self._MAX_PARTS), self._MULTIPART_MIN_SIZE
             )
-            total_parts = math.ceil(file_size / part_size)
-            part = 1
-            while part <= total_parts:
-                start = (part - 1) * part_size
-                end = file_size if part == total_parts else start + part_size
-                f = open(source, "rb")
-                f.seek(start)
-                data = f.read(end - start)
-                f.close()
-                part_res = self._api_call(
-                    f"uploads/{upload_id}/parts/{part}", http_verb="GET"
+            with open(source, "rb") as f:
+                return self._upload_multipart(
+                    project_id,
+                    file_name,
+                    overwrite,
+                    self._iter_parts(self._iter_chunks(f), part_size),
                 )
-                self._api_call_impl(
-                    http_verb="PUT",
-                    url=part_res.get("uploadUrl"),
-                    api_path=None,
-                    upload_file=data,
-                    headers={
-                        "Content-Length": str(end - start),
-                        "Authorization": None,
-                        "LifeOmic-Account": None,
-                        "Content-Type": None,
-                    },
+
+        if file_name is None:
+            file_name = os.path.basename(str(getattr(source, "name", "")))
+        if not file_name:
+            raise ValueError(
+                "Must provide a value for 'file_name' when uploading a stream"
+            )
+
+        parts = self._iter_parts(
+            self._iter_chunks(source), part_size or self._MULTIPART_MIN_SIZE
+        )
+        first_part = next(parts)
+        second_part = next(parts, None)
+
+        if second_part is None:
+            return self._upload_single(
+                project_id, file_name, overwrite, first_part, len(first_part)
+            )
+
+        return self._upload_multipart(
+            project_id,
+            file_name,
+            overwrite,
+            itertools.chain([first_part, second_part], parts),
+        )
+
+    def _upload_single(
+        self,
+        project_id: str,
+        file_name: str,
+        overwrite: bool,
+        upload_file: Union[str, bytes],
+        file_size: int,
+    ) -> ApiResponse:
+        res = self._api_call(
+            "files",
+            json={
+                "name": file_name,
+                "datasetId": project_id,
+                "overwrite": overwrite,
+            },
+        )
+        self._api_call_impl(
+            http_verb="PUT",
+            url=res.get("uploadUrl"),
+            api_path=None,
+            upload_file=upload_file,
+            headers={
+                "Content-Length": str(file_size),
+                "Authorization": None,
+                "LifeOmic-Account": None,
+                "Content-Type": None,
+            },
+        )
+        return res
+
+    def _upload_multipart(
+        self,
+        project_id: str,
+        file_name: str,
+        overwrite: bool,
+        parts: Iterator[bytes],
+    ) -> ApiResponse:
+        res = self._api_call(
+            "uploads",
+            json={
+                "name": file_name,
+                "datasetId": project_id,
+                "overwrite": overwrite,
+            },
+        )
+        upload_id = res.get("uploadId")
+
+        for part, data in enumerate(parts, start=1):
+            if part > self._MAX_PARTS:
+                raise ValueError(
+                    f"Upload exceeds {self._MAX_PARTS} parts. Use a larger 'part_size'."
                 )
-                print(f"Upload {part}")
-                part += 1
-            self._api_call(f"uploads/{upload_id}", http_verb="DELETE")
-            return res
-        else:
-            res = self._api_call(
-                "files",
-                json={
-                    "name": (
-                        file_name
-                        if file_name is not None
-                        else os.path.basename(source)
-                    ),
-                    "datasetId": project_id,
-                    "overwrite": overwrite,
-                },
+
+            part_res = self._api_call(
+                f"uploads/{upload_id}/parts/{part}", http_verb="GET"
             )
             self._api_call_impl(
                 http_verb="PUT",
-                url=res.get("uploadUrl"),
+                url=part_res.get("uploadUrl"),
                 api_path=None,
-                upload_file=source,
+                upload_file=data,
                 headers={
-                    "Content-Length": str(file_size),
+                    "Content-Length": str(len(data)),
                     "Authorization": None,
                     "LifeOmic-Account": None,
                     "Content-Type": None,
                 },
             )
-            return res
+            print(f"Upload {part}")
+
+        self._api_call(f"uploads/{upload_id}", http_verb="DELETE")
+        return res
+
+    def _iter_chunks(self, source) -> Iterator[bytes]:
+        "Read bytes from a file-like object, bytes, or an (async) iterable"
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            yield bytes(source)
+        elif hasattr(source, "read"):
+            yield from iter(lambda: source.read(self._READ_SIZE), b"")
+        elif hasattr(source, "__aiter__"):
+            chunks = source.__aiter__()
+            while True:
+                try:
+                    yield self._event_loop.run_until_complete(
+                        chunks.__anext__()
+                    )
+                except StopAsyncIteration:
+                    return
+        else:
+            yield from source
+
+    @staticmethod
+    def _iter_parts(chunks: Iterable[bytes], part_size: int) -> Iterator[bytes]:
+        """Cut chunks of any size into parts of exactly part_size (except the
+        last) buffering at most one part"""
+        buffer = bytearray()
+        has_parts = False
+
+        for chunk in chunks:
+            if not isinstance(chunk, (bytes, bytearray, memoryview)):
+                raise ValueError(
+                    f"Upload streams must produce bytes, not {type(chunk).__name__}"
+                )
+
+            buffer += chunk
+            while len(buffer) >= part_size:
+                has_parts = True
+                yield bytes(buffer[:part_size])
+                del buffer[:part_size]
+
+        if len(buffer) > 0 or not has_parts:
+            yield bytes(buffer)
 
     @backoff.on_exception(
         backoff.expo, OSError, max_tries=6, jitter=backoff.full_jitter
@@ -156,8 +274,52 @@ class Files(BaseClient):
         >>> files = files(session)
         >>> files.download(file_id="db3e09e9-1ecd-4976-aa5e-70ac7ada0cc3", dest_dir="./mydata")
         """
+        res = self._get_with_download_url(file_id)
+
+        file_path = os.path.join(dest_dir, res.get("name"))
+        target_dir = os.path.dirname(file_path)
+        if not os.path.exists(target_dir):
+            os.makedirs(target_dir)
+
+        urlretrieve(res.get("downloadUrl"), file_path)
+        return file_path
+
+    @backoff.on_exception(
+        backoff.expo, OSError, max_tries=6, jitter=backoff.full_jitter
+    )
+    def _download_to(self, file_id: str, file_path: str) -> str:
+        res = self._get_with_download_url(file_id)
+
+        target_dir = os.path.dirname(file_path)
+        if target_dir and not os.path.exists(target_dir):
+            os.makedirs(target_dir, exist_ok=True)
+
+        urlretrieve(res.get("downloadUrl"), file_path)
+        return file_path
+
+    def iter_lines(self, file_id: str) -> Iterator[bytes]:
+        """Stream a file line by line without saving it to disk
+
+        Parameters
+        ----------
+        file_id : str
+            The file ID
+
+        Examples
+        --------
+        >>> from phc.services import Files
+        >>> files = Files(session)
+        >>> for line in files.iter_lines(file_id="db3e09e9-1ecd-4976-aa5e-70ac7ada0cc3"):
+        >>>     print(line)
+        """
+        res = self._get_with_download_url(file_id)
+
+        with urlopen(res.get("downloadUrl")) as response:
+            yield from response
+
+    def _get_with_download_url(self, file_id: str) -> ApiResponse:
         try:
-            res = self._api_call(
+            return self._api_call(
                 f"files/{file_id}?include=downloadUrl", http_verb="GET"
             )
         except ApiError as e:
@@ -166,13 +328,7 @@ class Files(BaseClient):
                     "This file is currently archived and is not available for download. Contact LifeOmic support to learn more."
                 ) from None
 
-        file_path = os.path.join(dest_dir, res.get("name"))
-        target_dir = os.path.dirname(file_path)
-        if not os.path.exists(target_dir):
-            os.makedirs(target_dir)
-
-        urlretrieve(res.get("downloadUrl"), file_path)
-        return file_path
+            raise e
 
     def get(self, file_id: str) -> ApiResponse:
         """Fetch a file by id
@@ -308,3 +464,340 @@ class Files(BaseClient):
             if e.response.status_code == 404:
                 return False
             raise e
+
+    def iter_list(
+        self,
+        project_id: str,
+        folder: Optional[str] = None,
+        page_size: int = 1000,
+        prefetch: bool = True,
+        prefixes: Optional[List[str]] = None,
+        max_concurrency: int = 8,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every file in a project (across all pages)
+
+        Parameters
+        ----------
+        project_id: str
+            The project ID
+        folder: str, optional
+            The folder prefix to look for files, by default None
+        page_size : int, optional
+            The page size, by default 1000
+        prefetch : bool, optional
+            Request the next page while the current one is consumed, by default True
+        prefixes : List[str], optional
+            List the files under each of these prefixes concurrently (instead
+            of folder). Files are yielded as they arrive from any prefix.
+        max_concurrency : int, optional
+            The number of prefixes listed at once, by default 8
+
+        Returns
+        -------
+        Iterator[dict]
+            The files
+
+        Examples
+        --------
+        >>> from phc.services import Files
+        >>> files = Files(session)
+        >>> for file in files.iter_list(project_id, folder="ocr-uploads"):
+        >>>     print(file["name"])
+        """
+
+        def list_prefix(prefix: Optional[str]):
+            return self._iter_list(
+                lambda client, token: client.get_list(
+                    project_id,
+                    folder=prefix,
+                    page_size=page_size,
+                    next_page_token=token,
+                ),
+                prefetch=prefetch,
+            )
+
+        if prefixes is None:
+            return list_prefix(folder)
+
+        return self._merge_iters(
+            [partial(list_prefix, prefix) for prefix in prefixes],
+            max_concurrency=max_concurrency,
+        )
+
+    def sync_up(
+        self,
+        project_id: str,
+        local_dir: str,
+        prefix: Optional[str] = None,
+        compare: str = "size",
+        max_concurrency: int = 8,
+        manifest_path: Optional[str] = None,
+    ) -> Dict[str, object]:
+        """Upload the files of a local folder that are missing or changed in
+        a project folder
+
+        Parameters
+        ----------
+        project_id : str
+            The project ID
+        local_dir : str
+            The local folder to upload (including sub-folders)
+        prefix : str, optional
+            The project folder to upload into, by default None (the root)
+        compare : str, optional
+            "size" to transfer files whose size differs or "checksum" to also
+            compare the MD5 recorded in the manifest, by default "size"
+        max_concurrency : int, optional
+            The number of files transferred at once, by default 8
+        manifest_path : str, optional
+            Where progress is recorded so an interrupted sync can resume, by
+            default `.phc-sync-manifest.json` in the local folder
+
+        Returns
+        -------
+        dict
+            The "transferred" and "skipped" relative paths and the "failed"
+            paths with their errors
+
+        Examples
+        --------
+        >>> from phc.services import Files
+        >>> files = Files(session)
+        >>> files.sync_up(project_id, "./output", prefix="runs/2021-02-24")
+        """
+        self._check_compare(compare)
+        manifest = SyncManifest(
+            manifest_path or os.path.join(local_dir, MANIFEST_FILE_NAME)
+        )
+        remote_dir = self._remote_dir(prefix)
+        remote_files = {
+            f.get("name"): f
+            for f in self.iter_list(project_id, folder=remote_dir or None)
+        }
+
+        def is_unchanged(name: str, local_path: str) -> bool:
+            remote = remote_files.get(remote_dir + name)
+            if remote is None:
+                return False
+
+            return self._is_unchanged(
+                manifest, compare, name, local_path, remote, check_id=False
+            )
+
+        def transfer(client: "Files", name: str, local_path: str):
+            stat = os.stat(local_path)
+            res = client.upload(
+                project_id,
+                local_path,
+                file_name=remote_dir + name,
+                overwrite=(remote_dir + name) in remote_files,
+            )
+            manifest.record(
+                name,
+                id=res.get("id"),
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                md5=(
+                    manifest.checksum(name, local_path)
+                    if compare == "checksum"
+                    else None
+                ),
+            )
+
+        # The manifest itself is never uploaded
+        manifest_files = {
+            os.path.abspath(manifest.path),
+            os.path.abspath(f"{manifest.path}.tmp"),
+        }
+        local_files = {
+            name: path
+            for name, path in self._walk_local(local_dir)
+            if os.path.abspath(path) not in manifest_files
+        }
+
+        return self._transfer_changed(
+            local_files, is_unchanged, transfer, max_concurrency
+        )
+
+    def sync_down(
+        self,
+        project_id: str,
+        prefix: Optional[str],
+        local_dir: str,
+        compare: str = "size",
+        max_concurrency: int = 8,
+        manifest_path: Optional[str] = None,
+    ) -> Dict[str, object]:
+        """Download the files of a project folder that are missing or changed
+        in a local folder
+
+        Parameters
+        ----------
+        project_id : str
+            The project ID
+        prefix : str, optional
+            The project folder to download (None for the whole project)
+        local_dir : str
+            The local folder to download into
+        compare : str, optional
+            "size" to transfer files whose size differs or "checksum" to also
+            compare the file id and MD5 recorded in the manifest, by default
+            "size"
+        max_concurrency : int, optional
+            The number of files transferred at once, by default 8
+        manifest_path : str, optional
+            Where progress is recorded so an interrupted sync can resume, by
+            default `.phc-sync-manifest.json` in the local folder
+
+        Returns
+        -------
+        dict
+            The "transferred" and "skipped" relative paths and the "failed"
+            paths with their errors
+
+        Examples
+        --------
+        >>> from phc.services import Files
+        >>> files = Files(session)
+        >>> files.sync_down(project_id, "runs/2021-02-24", "./output")
+        """
+        self._check_compare(compare)
+        os.makedirs(local_dir, exist_ok=True)
+        manifest = SyncManifest(
+            manifest_path or os.path.join(local_dir, MANIFEST_FILE_NAME)
+        )
+        remote_dir = self._remote_dir(prefix)
+        remote_files = {
+            f["name"][len(remote_dir) :]: f
+            for f in self.iter_list(project_id, folder=remote_dir or None)
+            # The listing prefix also matches sibling folders (e.g. "a" and "ab")
+            if f.get("name", "").startswith(remote_dir)
+        }
+
+        root = os.path.realpath(local_dir)
+
+        def local_path(name: str) -> str:
+            path = os.path.realpath(os.path.join(root, *name.split("/")))
+
+            # Names come from the server so never write outside of local_dir
+            if path == root or os.path.commonpath([root, path]) != root:
+                raise ValueError(f"'{name}' is outside of '{local_dir}'")
+
+            return path
+
+        unsafe = {}
+        for name in list(remote_files.keys()):
+            try:
+                local_path(name)
+            except ValueError as e:
+                unsafe[name] = e
+                del remote_files[name]
+
+        def is_unchanged(name: str, remote: dict) -> bool:
+            path = local_path(name)
+            if not os.path.exists(path):
+                return False
+
+            return self._is_unchanged(
+                manifest, compare, name, path, remote, check_id=True
+            )
+
+        def transfer(client: "Files", name: str, remote: dict):
+            path = client._download_to(remote["id"], local_path(name))
+            stat = os.stat(path)
+            manifest.record(
+                name,
+                id=remote["id"],
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                md5=(
+                    manifest.checksum(name, path)
+                    if compare == "checksum"
+                    else None
+                ),
+            )
+
+        result = self._transfer_changed(
+            remote_files, is_unchanged, transfer, max_concurrency
+        )
+        result["failed"].update(unsafe)
+
+        return result
+
+    @staticmethod
+    def _check_compare(compare: str):
+        if compare not in ("size", "checksum"):
+            raise ValueError(
+                f"Unknown compare '{compare}'. Must be 'size' or 'checksum'"
+            )
+
+    @staticmethod
+    def _remote_dir(prefix: Optional[str]) -> str:
+        prefix = (prefix or "").strip("/")
+        return f"{prefix}/" if prefix else ""
+
+    @staticmethod
+    def _walk_local(local_dir: str) -> Iterator[tuple]:
+        for root, _, file_names in os.walk(local_dir):
+            for file_name in sorted(file_names):
+                path = os.path.join(root, file_name)
+                name = os.path.relpath(path, local_dir).replace(os.sep, "/")
+                yield name, path
+
+    @staticmethod
+    def _is_unchanged(
+        manifest: SyncManifest,
+        compare: str,
+        name: str,
+        local_path: str,
+        remote: dict,
+        check_id: bool,
+    ) -> bool:
+        size = os.path.getsize(local_path)
+        if remote.get("size") is not None and int(remote["size"]) != size:
+            return False
+
+        if compare == "size" and remote.get("size") is not None:
+            return True
+
+        # Without a remote size (or when comparing checksums) a file is only
+        # unchanged if it matches the last recorded transfer
+        entry = manifest.get(name)
+        if entry is None or entry.get("size") != size:
+            return False
+
+        if check_id and entry.get("id") != remote.get("id"):
+            return False
+
+        if compare == "checksum":
+            return entry.get("md5") == manifest.checksum(name, local_path)
+
+        return True
+
+    def _transfer_changed(
+        self,
+        files: Dict[str, object],
+        is_unchanged: Callable[[str, object], bool],
+        transfer: Callable[["Files", str, object], None],
+        max_concurrency: int,
+    ) -> Dict[str, object]:
+        skipped, changed = [], []
+        for name, f in files.items():
+            (skipped if is_unchanged(name, f) else changed).append(name)
+
+        def run(name: str):
+            try:
+                transfer(self._thread_client(), name, files[name])
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_concurrency, len(changed)))
+        ) as executor:
+            errors = list(executor.map(run, changed))
+
+        return {
+            "transferred": [n for n, e in zip(changed, errors) if e is None],
+            "skipped": skipped,
+            "failed": {n: e for n, e in zip(changed, errors) if e is not None},
+        }
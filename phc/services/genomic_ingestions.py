@@ -3,7 +3,8 @@
 from enum import Enum
 from phc import ApiResponse
 from phc.base_client import BaseClient
-from typing import Optional, Dict, Union
+from phc.util.job_watcher import JobWatcher
+from typing import Dict, Iterator, List, Optional, Union
 
 
 class IngestionStep(str, Enum):
@@ -337,3 +338,73 @@ class GenomicIngestions(BaseClient):
                 },
             },
         )
+
+    def watch(
+        self, project_id: str, ingestion_ids: List[str], **kwargs
+    ) -> JobWatcher:
+        """Watch many ingestions until a test is (or is not) created or they fail
+
+        Ingestion states are refreshed through the list endpoint so that each
+        poll costs a page of requests instead of one request per ingestion.
+
+        Parameters
+        ----------
+        project_id: str
+            The project ID for the ingestions.
+        ingestion_ids: List[str]
+            The ingestion IDs to watch.
+        **kwargs
+            Poll options passed to `phc.util.job_watcher.JobWatcher`.
+
+        Returns
+        -------
+        phc.util.job_watcher.JobWatcher
+            Iterate over it to receive each ingestion as it finishes or call
+            `wait(on_complete=...)`.
+        """
+        return JobWatcher.for_genomic_ingestions(
+            self, project_id, ingestion_ids, **kwargs
+        )
+
+    def iter_list(
+        self,
+        project_id: str,
+        name: Optional[str] = None,
+        failed: Optional[bool] = None,
+        step: Optional[IngestionStep] = None,
+        page_size: int = 1000,
+        prefetch: bool = True,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every ingestion in a project (across all pages)
+
+        Parameters
+        ----------
+        project_id: str
+            The project ID for the ingestions.
+        name: str, optional
+            The name to filter ingestions by, by default None.
+        failed: bool, optional
+            The status of the ingestions to filter by, by default None.
+        step: IngestionStep, optional
+            The ingestion steps to filter by, by default None.
+        page_size: int, optional
+            The page size, by default 1000.
+        prefetch: bool, optional
+            Request the next page while the current one is consumed, by default True.
+
+        Returns
+        -------
+        Iterator[dict]
+            The ingestions.
+        """
+        return self._iter_list(
+            lambda client, token: client.list(
+                project_id,
+                name=name,
+                failed=failed,
+                step=step,
+                page_size=page_size,
+                next_page_token=token,
+            ),
+            prefetch=prefetch,
+        )
@@ -1,12 +1,21 @@
 """A Python Module for Genomics"""
 
 from enum import Enum
-from typing import Optional
+from typing import Iterator, Optional
 from phc.base_client import BaseClient
 from phc import ApiResponse
 from datetime import datetime
 import uuid
 
+# The key of the sets in each search response by set type path
+SET_RESULTS_KEYS = {
+    "variantsets": "variantSets",
+    "fusionsets": "fusionSets",
+    "rnaquantificationsets": "rnaQuantificationSets",
+    "readgroupsets": "readGroupSets",
+    "copynumbersets": "copyNumberSets",
+}
+
 
 class Genomics(BaseClient):
     """Provides acccess to PHC genomic resources
@@ -304,3 +313,51 @@ class Genomics(BaseClient):
             ).status_code
             == 204
         )
+
+    def iter_sets(
+        self,
+        set_type: SetType,
+        project_id: str,
+        sequence_id: Optional[str] = None,
+        patient_id: Optional[str] = None,
+        status: Optional[Status] = None,
+        page_size: int = 50,
+        prefetch: bool = True,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every genomic set (across all pages)
+
+        Parameters
+        ----------
+        set_type : SetType
+            The set type
+        project_id : str
+            The project ID
+        sequence_id : str, optional
+            List sets by sequence ID, by default None
+        patient_id : str, optional
+            List sets by patient ID, by default None
+        status : Status, optional
+            Filter sets by status, by default None
+        page_size : int, optional
+            The page size, by default 50
+        prefetch : bool, optional
+            Request the next page while the current one is consumed, by default True
+
+        Returns
+        -------
+        Iterator[dict]
+            The sets
+        """
+        return self._iter_list(
+            lambda client, token: client.list_sets(
+                set_type,
+                project_id,
+                sequence_id=sequence_id,
+                patient_id=patient_id,
+                status=status,
+                next_page_token=token,
+                page_size=page_size,
+            ),
+            items_key=SET_RESULTS_KEYS[set_type.value],
+            prefetch=prefetch,
+        )
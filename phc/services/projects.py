@@ -1,6 +1,6 @@
 """A Python Module for Projects"""
 
-from typing import Optional
+from typing import Iterator, Optional
 from phc.base_client import BaseClient
 from phc import ApiResponse
 from urllib.parse import urlencode
@@ -134,3 +134,32 @@ class Projects(BaseClient):
         return self._api_call(
             f"projects?{urlencode(query_dict)}", http_verb="GET"
         )
+
+    def iter_list(
+        self,
+        page_size: int = 1000,
+        name: Optional[str] = None,
+        prefetch: bool = True,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every project in an account (across all pages)
+
+        Parameters
+        ----------
+        page_size : int, optional
+            The page size, by default 1000
+        name : str, optional
+            A project name filter, by default None
+        prefetch : bool, optional
+            Request the next page while the current one is consumed, by default True
+
+        Returns
+        -------
+        Iterator[dict]
+            The projects
+        """
+        return self._iter_list(
+            lambda client, token: client.get_list(
+                page_size=page_size, next_page_token=token, name=name
+            ),
+            prefetch=prefetch,
+        )
@@ -2,7 +2,9 @@
 
 from phc import ApiResponse
 from phc.base_client import BaseClient
-from typing import Optional, Dict, Union
+from phc.util.job_watcher import JobWatcher
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Union
 from urllib.parse import urlencode
 
 
@@ -126,3 +128,94 @@ class Tasks(BaseClient):
             query_dict["view"] = "MINIMAL"
 
         return self._api_call(f"tasks?{urlencode(query_dict)}", http_verb="GET")
+
+    def watch(
+        self, project_id: str, task_ids: List[str], **kwargs
+    ) -> JobWatcher:
+        """Watch many tasks until they finish
+
+        Task states are refreshed through the (minimal) list endpoint so that
+        each poll costs a page of requests instead of one request per task.
+
+        Parameters
+        ----------
+        project_id: str
+            The project ID for the tasks.
+        task_ids: List[str]
+            The task IDs to watch.
+        **kwargs
+            Poll options passed to `phc.util.job_watcher.JobWatcher`.
+
+        Returns
+        -------
+        phc.util.job_watcher.JobWatcher
+            Iterate over it to receive each task as it finishes or call
+            `wait(on_complete=...)`.
+
+        Examples
+        --------
+        >>> from phc.services import Tasks
+        >>> tasks = Tasks(session)
+        >>> results = tasks.watch(project_id, task_ids).wait()
+        """
+        return JobWatcher.for_tasks(self, project_id, task_ids, **kwargs)
+
+    def iter_list(
+        self,
+        project_id: str,
+        prefix: Optional[str] = None,
+        state: Optional[str] = None,
+        minimal: Optional[bool] = None,
+        page_size: int = 1000,
+        prefetch: bool = True,
+        prefixes: Optional[List[str]] = None,
+        max_concurrency: int = 8,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every task in a project (across all pages)
+
+        Parameters
+        ----------
+        project_id: str
+            The project ID for the tasks.
+        prefix: str, optional
+            The prefix to filter tasks by, by default None.
+        state: str, optional
+            The state to filter tasks by, by default None.
+        minimal: bool, optional
+            Set to True to just get task state, by default None.
+        page_size: int, optional
+            The page size, by default 1000.
+        prefetch: bool, optional
+            Request the next page while the current one is consumed, by default True.
+        prefixes: List[str], optional
+            List the tasks with each of these prefixes concurrently (instead of prefix).
+        max_concurrency: int, optional
+            The number of prefixes listed at once, by default 8.
+
+        Returns
+        -------
+        Iterator[dict]
+            The tasks.
+        """
+
+        def list_prefix(name_prefix: Optional[str]):
+            return self._iter_list(
+                lambda client, token: client.list(
+                    project_id,
+                    prefix=name_prefix,
+                    state=state,
+                    minimal=minimal,
+                    page_size=page_size,
+                    next_page_token=token,
+                ),
+                items_key="tasks",
+                prefetch=prefetch,
+            )
+
+        if prefixes is None:
+            return list_prefix(prefix)
+
+        return self._merge_iters(
+            [partial(list_prefix, p) for p in prefixes],
+            max_concurrency=max_concurrency,
+        )
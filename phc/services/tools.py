@@ -4,7 +4,7 @@ import os
 import backoff
 from enum import Enum
 
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from phc.base_client import BaseClient
 from phc import ApiResponse
 from urllib.parse import urlencode
@@ -324,3 +324,60 @@ class Tools(BaseClient):
         return self._api_call(
             f"/v1/trs/v2/tools?{urlencode(query_dict)}", http_verb="GET"
         )
+
+    def iter_list(
+        self,
+        tool_class: Optional[ToolClass] = None,
+        organization: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        author: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        page_size: int = 1000,
+        prefetch: bool = True,
+    ) -> Iterator[dict]:
+        """Lazily iterate over every tool in the registry (across all pages)
+
+        Parameters
+        ----------
+        tool_class: str, optional
+            The class of the tool, by default None
+        organization: str, optional
+            The organization that owns the tool, by default None
+        tool_name: str, optional
+            The name of the tool, by default None
+        author: str, optional
+            The creator of the tool, by default None
+        labels: List[str], optional
+            A list of labels describing the tool, by default None
+        page_size: int, optional
+            The count of tools to return in a single request, by default 1000
+        prefetch : bool, optional
+            Request the next page while the current one is consumed, by default True
+
+        Returns
+        -------
+        Iterator[dict]
+            The tools
+        """
+
+        def get_next_page(response: ApiResponse, page_count: Optional[int]):
+            # A full page means there may be more tools
+            if len(response.data or []) < page_size:
+                return None
+
+            return (page_count or 0) + 1
+
+        return self._iter_list(
+            lambda client, page_count: client.get_list(
+                tool_class=tool_class,
+                organization=organization,
+                tool_name=tool_name,
+                author=author,
+                labels=labels,
+                page_size=page_size,
+                page_count=page_count or 0,
+            ),
+            items_key=None,
+            get_next_token=get_next_page,
+            prefetch=prefetch,
+        )
@@ -1,7 +1,8 @@
 """A Python Module for Workflows"""
 
-from typing import Optional
+from typing import Iterator, List, Optional
 from phc.base_client import BaseClient
+from phc.util.job_watcher import JobWatcher
 from phc import ApiResponse
 from urllib.parse import urlencode
 
@@ -164,3 +165,64 @@ class Workflows(BaseClient):
             json=describe_request,
             http_verb="POST",
         )
+
+    def watch(
+        self, project_id: str, workflow_ids: List[str], **kwargs
+    ) -> JobWatcher:
+        """Watch many workflow runs until they finish
+
+        Run states are refreshed through the list endpoint so that each poll
+        costs a page of requests instead of one request per run.
+
+        Parameters
+        ----------
+        project_id: str
+            The project ID
+        workflow_ids : List[str]
+            The workflow IDs to watch
+        **kwargs
+            Poll options passed to `phc.util.job_watcher.JobWatcher`
+
+        Returns
+        -------
+        phc.util.job_watcher.JobWatcher
+            Iterate over it to receive each run as it finishes or call
+            `wait(on_complete=...)`
+
+        Examples
+        --------
+        >>> from phc.services import Workflows
+        >>> workflows = Workflows(session)
+        >>> for run_id, run in workflows.watch(project_id, run_ids):
+        >>>     print(run_id, run["state"])
+        """
+        return JobWatcher.for_workflows(
+            self, project_id, workflow_ids, **kwargs
+        )
+
+    def iter_list(
+        self, project_id: str, page_size: int = 100, prefetch: bool = True
+    ) -> Iterator[dict]:
+        """Lazily iterate over every workflow run in a project (across all pages)
+
+        Parameters
+        ----------
+        project_id: str
+            The project ID
+        page_size : int, optional
+            The page size, by default 100
+        prefetch : bool, optional
+            Request the next page while the current one is consumed, by default True
+
+        Returns
+        -------
+        Iterator[dict]
+            The workflow runs
+        """
+        return self._iter_list(
+            lambda client, token: client.get_list(
+                project_id, page_size=page_size, next_page_token=token
+            ),
+            items_key="runs",
+            prefetch=prefetch,
+        )
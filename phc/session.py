@@ -75,11 +75,18 @@ class Session:
 
     def _get_decoded_token(self):
         if self.token:
-            return jwt.decode(
+            # Decoded once per token (it changes when the session is refreshed)
+            cached = getattr(self, "_decoded_token", None)
+            if cached is not None and cached[0] == self.token:
+                return cached[1]
+
+            decoded = jwt.decode(
                 self.token,
                 options={"verify_signature": False},
                 algorithms="RS256",
             )
+            self._decoded_token = (self.token, decoded)
+            return decoded
         return {}
 
     def is_expired(self) -> bool:
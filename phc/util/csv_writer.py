@@ -1,7 +1,13 @@
+import json
 import os
 import re
+from typing import List
+
 import pandas as pd
 
+# Lists the categorical columns since CSV files don't keep dtypes
+CATEGORIES_SUFFIX = ".categories.json"
+
 
 class CSVWriter:
     """Class for progressively writing batches of pandas data frames to a CSV
@@ -12,6 +18,16 @@ class CSVWriter:
         self.filename = filename
         self.bak_filename = filename + ".bak"
         self.batch_filename = filename + ".batch.bak"
+        self.categories_filename = filename + CATEGORIES_SUFFIX
+
+    @staticmethod
+    def read_categories(filename: str) -> List[str]:
+        "The columns of a CSV file that were written as categoricals"
+        try:
+            with open(filename + CATEGORIES_SUFFIX, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
 
     def write(self, frame: pd.DataFrame):
         """Write a data frame to an existing CSV file without loading the entire
@@ -23,6 +39,8 @@ class CSVWriter:
             re.sub(r"[\t\n]", "", c) for c in frame.columns.tolist()
         ]
 
+        self._write_categories(frame)
+
         if not os.path.exists(self.filename):
             frame.to_csv(
                 self.filename, date_format="%Y-%m-%dT%H:%M:%S%z", index=False
@@ -49,6 +67,29 @@ class CSVWriter:
 
         self._finalize()
 
+    def _write_categories(self, frame: pd.DataFrame):
+        previous = (
+            CSVWriter.read_categories(self.filename)
+            if os.path.exists(self.filename)
+            else []
+        )
+        categories = [
+            *previous,
+            *[
+                column
+                for column, dtype in frame.dtypes.items()
+                if isinstance(dtype, pd.CategoricalDtype)
+                and column not in previous
+            ],
+        ]
+
+        if len(categories) > 0:
+            with open(self.categories_filename, "w") as f:
+                json.dump(categories, f)
+        elif os.path.exists(self.categories_filename):
+            # Left over from a previous file
+            os.remove(self.categories_filename)
+
     def _columns(self):
         return pd.read_csv(self.filename, nrows=0).columns.tolist()
 
@@ -0,0 +1,70 @@
+from typing import Dict, List
+
+import pandas as pd
+
+# OpenSearch SQL schema types mapped to (nullable) pandas dtypes
+SQL_TYPE_DTYPES = {
+    "boolean": "boolean",
+    "byte": "Int64",
+    "short": "Int64",
+    "integer": "Int64",
+    "long": "Int64",
+    "half_float": "Float64",
+    "float": "Float64",
+    "scaled_float": "Float64",
+    "double": "Float64",
+    "keyword": "string",
+    "text": "string",
+    "string": "string",
+    "ip": "string",
+}
+
+DATETIME_SQL_TYPES = {"date", "time", "timestamp", "datetime"}
+
+
+def schema_dtypes(schema: List[dict]) -> Dict[str, str]:
+    """Map each column of an OpenSearch SQL schema to a pandas dtype
+
+    Unknown types (e.g. object, nested, geo_point) are left as "object" and
+    date types are marked as "datetime" since they are parsed separately.
+    """
+    return {
+        column["name"]: (
+            "datetime"
+            if column.get("type") in DATETIME_SQL_TYPES
+            else SQL_TYPE_DTYPES.get(column.get("type"), "object")
+        )
+        for column in schema
+    }
+
+
+def datarows_to_frame(
+    datarows: List[list], dtypes: Dict[str, str]
+) -> pd.DataFrame:
+    """Build a typed frame column by column from OpenSearch SQL datarows
+
+    Attributes
+    ----------
+    datarows : List[list]
+        The rows of values in schema order
+
+    dtypes : Dict[str, str]
+        The column names and dtypes (See `schema_dtypes`)
+    """
+    names = list(dtypes.keys())
+    columns = list(zip(*datarows)) if len(datarows) > 0 else [()] * len(names)
+
+    def to_series(name: str, values: tuple):
+        dtype = dtypes[name]
+
+        if dtype == "datetime":
+            return pd.to_datetime(
+                pd.Series(values, dtype="object"), utc=True, errors="coerce"
+            )
+
+        return pd.Series(values, dtype=dtype)
+
+    return pd.DataFrame(
+        {name: to_series(name, values) for name, values in zip(names, columns)},
+        columns=names,
+    )
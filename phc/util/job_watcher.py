@@ -0,0 +1,269 @@
+"""A Python Module for watching many long running jobs"""
+
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from phc.base_client import next_page_token
+
+TES_TERMINAL_STATES = {
+    "COMPLETE",
+    "EXECUTOR_ERROR",
+    "SYSTEM_ERROR",
+    "CANCELED",
+}
+
+INGESTION_TERMINAL_STEPS = {"TestCreated", "TestNotCreated"}
+
+
+class JobSource:
+    """Describes how to list, identify, and check the state of a kind of job
+
+    Parameters
+    ----------
+    list_page : Callable[[Optional[str]], phc.ApiResponse]
+        Fetch a page of jobs given the next page token (None for the first)
+    items_key : str
+        The key of the jobs in each page
+    get_id : Callable[[dict], str]
+        The id of a job
+    get_state : Callable[[dict], str]
+        The state of a job
+    is_done : Callable[[str], bool]
+        Whether a state is terminal
+    get_one : Callable[[str], dict], optional
+        Fetch a single job (used for jobs missing from the list)
+    """
+
+    def __init__(
+        self,
+        list_page: Callable,
+        items_key: str,
+        get_id: Callable[[dict], str],
+        get_state: Callable[[dict], str],
+        is_done: Callable[[str], bool],
+        get_one: Optional[Callable[[str], dict]] = None,
+    ):
+        self.list_page = list_page
+        self.items_key = items_key
+        self.get_id = get_id
+        self.get_state = get_state
+        self.is_done = is_done
+        self.get_one = get_one
+
+
+def ingestion_state(ingestion: dict) -> str:
+    status = ingestion.get("status")
+    status = status if isinstance(status, dict) else ingestion
+
+    if status.get("failed"):
+        return "Failed"
+
+    return status.get("step") or ""
+
+
+class JobWatcher:
+    """Tracks the state of many jobs with as few requests as possible
+
+    Each poll pages through the list endpoint (stopping once every pending job
+    has been seen) instead of fetching jobs one at a time. Jobs that are not in
+    the list at all are fetched on their own in later polls. The poll interval
+    grows while nothing changes and resets when a job finishes.
+
+    Parameters
+    ----------
+    source : JobSource
+        How to list and check the jobs (see `JobWatcher.for_tasks`, etc.)
+    ids : Iterable[str]
+        The ids of the jobs to watch
+    initial_interval : float
+        Seconds between the first polls
+    max_interval : float
+        The longest time between polls
+    backoff_factor : float
+        The growth of the interval for each poll without a finished job
+
+    Examples
+    --------
+    >>> from phc.services import Workflows
+    >>> workflows = Workflows(session)
+    >>> watcher = workflows.watch(project_id, run_ids)
+    >>> for run_id, run in watcher:
+    >>>     print(run_id, run["state"])
+    """
+
+    def __init__(
+        self,
+        source: JobSource,
+        ids: Iterable[str],
+        initial_interval: float = 5,
+        max_interval: float = 60,
+        backoff_factor: float = 1.5,
+    ):
+        self.source = source
+        self.pending = set(ids)
+        self.unlisted: Set[str] = set()
+        self.states: Dict[str, str] = {}
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+
+    def __iter__(self):
+        return self.watch()
+
+    def poll(self) -> List[Tuple[str, dict]]:
+        """Refresh the state of all pending jobs once
+
+        Returns the jobs that finished since the last poll.
+        """
+        found = {}
+        listed = self.pending - self.unlisted
+        token = None
+
+        while len(listed) > 0:
+            response = self.source.list_page(token)
+
+            for item in response.get(self.source.items_key, []) or []:
+                job_id = self.source.get_id(item)
+                if job_id in listed:
+                    found[job_id] = item
+
+            if len(found) == len(listed):
+                break
+
+            token = next_page_token(getattr(response, "data", response))
+            if token is None:
+                if self.source.get_one is not None:
+                    # Fetched one at a time from now on instead of paging
+                    # through the whole list history on every poll
+                    self.unlisted |= listed - set(found.keys())
+                break
+
+        if self.source.get_one is not None:
+            for job_id in self.pending - set(found.keys()):
+                found[job_id] = self.source.get_one(job_id)
+
+        finished = []
+        for job_id, item in found.items():
+            state = self.source.get_state(item)
+            self.states[job_id] = state
+
+            if self.source.is_done(state):
+                self.pending.discard(job_id)
+                finished.append((job_id, item))
+
+        return finished
+
+    def watch(
+        self, timeout: Optional[float] = None
+    ) -> Iterator[Tuple[str, dict]]:
+        "Yield each job (as an id and record pair) once it has finished"
+        interval = self.initial_interval
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while len(self.pending) > 0:
+            finished = self.poll()
+            yield from finished
+
+            if len(self.pending) == 0:
+                return
+
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"{len(self.pending)} jobs did not finish: "
+                    f"{sorted(self.pending)}"
+                )
+
+            interval = (
+                self.initial_interval
+                if len(finished) > 0
+                else min(interval * self.backoff_factor, self.max_interval)
+            )
+            time.sleep(interval)
+
+    def wait(
+        self,
+        on_complete: Optional[Callable[[str, dict], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, dict]:
+        "Block until every job has finished and return the final records"
+        results = {}
+
+        for job_id, item in self.watch(timeout=timeout):
+            results[job_id] = item
+
+            if on_complete is not None:
+                on_complete(job_id, item)
+
+        return results
+
+    @staticmethod
+    def for_tasks(tasks, project_id: str, ids: Iterable[str], **kwargs):
+        "Watch tasks (see `phc.services.Tasks`)"
+        return JobWatcher(
+            JobSource(
+                lambda token: tasks.list(
+                    project_id,
+                    minimal=True,
+                    page_size=1000,
+                    next_page_token=token,
+                ),
+                items_key="tasks",
+                get_id=lambda task: task.get("id"),
+                get_state=lambda task: task.get("state"),
+                is_done=lambda state: state in TES_TERMINAL_STATES,
+                get_one=lambda task_id: tasks.get(task_id).data,
+            ),
+            ids,
+            **kwargs,
+        )
+
+    @staticmethod
+    def for_workflows(workflows, project_id: str, ids: Iterable[str], **kwargs):
+        "Watch workflow runs (see `phc.services.Workflows`)"
+        return JobWatcher(
+            JobSource(
+                lambda token: workflows.get_list(
+                    project_id, page_size=1000, next_page_token=token
+                ),
+                items_key="runs",
+                # Run ids may be prefixed with the project id
+                get_id=lambda run: str(run.get("run_id", "")).split(":")[-1],
+                get_state=lambda run: run.get("state"),
+                is_done=lambda state: state in TES_TERMINAL_STATES,
+                get_one=lambda run_id: workflows.get(project_id, run_id).data,
+            ),
+            ids,
+            **kwargs,
+        )
+
+    @staticmethod
+    def for_genomic_ingestions(
+        ingestions, project_id: str, ids: Iterable[str], **kwargs
+    ):
+        "Watch genomic ingestions (see `phc.services.GenomicIngestions`)"
+        return JobWatcher(
+            JobSource(
+                lambda token: ingestions.list(
+                    project_id, page_size=1000, next_page_token=token
+                ),
+                items_key="items",
+                get_id=lambda ingestion: ingestion.get("id"),
+                get_state=ingestion_state,
+                is_done=lambda state: state == "Failed"
+                or state in INGESTION_TERMINAL_STEPS,
+                get_one=lambda ingestion_id: ingestions.get(
+                    ingestion_id, project_id
+                ).data,
+            ),
+            ids,
+            **kwargs,
+        )
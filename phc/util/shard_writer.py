@@ -0,0 +1,251 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+SHARD_FORMATS = ["parquet", "ndjson"]
+MANIFEST_FILENAME = "manifest.json"
+
+# Parquet dtypes of the inferred (pandas) types of object columns
+INFERRED_DTYPES = {
+    "boolean": "boolean",
+    "integer": "Int64",
+    "floating": "float64",
+    "mixed-integer-float": "float64",
+}
+
+
+def parquet_column(series: pd.Series):
+    """Convert a column to a dtype that Parquet can encode (nested values are
+    serialized as JSON) and return it with that dtype (or None if all values
+    are missing)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+
+    if series.isna().all():
+        return series, None
+
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series.astype("boolean"), "boolean"
+
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return series.astype("Int64"), "Int64"
+
+    if pd.api.types.is_float_dtype(series.dtype):
+        return series.astype("float64"), "float64"
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series, str(series.dtype)
+
+    if series.map(lambda v: isinstance(v, (dict, list))).any():
+        series = series.map(
+            lambda v: json.dumps(v) if isinstance(v, (dict, list)) else v
+        )
+
+    dtype = INFERRED_DTYPES.get(
+        pd.api.types.infer_dtype(series, skipna=True), "string"
+    )
+
+    return series.astype(dtype), dtype
+
+
+def merge_dtypes(left: Optional[str], right: Optional[str]) -> Optional[str]:
+    "The dtype that can hold the values of both dtypes"
+    if left is None or left == right:
+        return right if left is None else left
+
+    if right is None:
+        return left
+
+    if {left, right} == {"Int64", "float64"}:
+        return "float64"
+
+    return "string"
+
+
+class ShardWriter:
+    """Class for progressively writing batches of pandas data frames to a
+    directory of rotating Parquet or NDJSON shard files. A manifest describing
+    the shards is written when the writer is closed.
+
+    Only one shard worth of rows is held in memory at a time so that result
+    sets larger than RAM can be extracted.
+
+    Parquet shards share one schema: the union of the columns of every batch,
+    with nested values serialized as JSON and a dtype that holds the values
+    of every batch. Shards written before the schema changed are rewritten
+    when the writer is closed.
+    """
+
+    def __init__(
+        self, dest: str, format: str = "parquet", shard_rows: int = 100_000
+    ):
+        if format not in SHARD_FORMATS:
+            raise ValueError(
+                f"Unsupported format '{format}'. Expected one of {SHARD_FORMATS}"
+            )
+
+        if shard_rows < 1:
+            raise ValueError("shard_rows must be a positive integer")
+
+        self.dest = dest
+        self.format = format
+        self.shard_rows = shard_rows
+        self.shards: List[dict] = []
+        self.total_rows = 0
+        self.schema: Dict[str, Optional[str]] = {}
+
+        self._buffer: List[pd.DataFrame] = []
+        self._buffered_rows = 0
+        self._file = None
+        self._file_rows = 0
+        self._shard_schemas: Dict[str, Dict[str, str]] = {}
+
+        os.makedirs(dest, exist_ok=True)
+
+    def write(self, frame: pd.DataFrame):
+        "Write a batch, rotating to a new shard whenever shard_rows is reached"
+        if len(frame) == 0:
+            return
+
+        self.total_rows += len(frame)
+
+        if self.format == "ndjson":
+            self._write_ndjson(frame)
+        else:
+            self._write_parquet(self._update_schema(frame))
+
+    def close(self) -> dict:
+        "Flush the remaining rows and write the manifest (returned as a dict)"
+        if self.format == "ndjson":
+            self._close_ndjson_shard()
+        else:
+            if self._buffered_rows > 0:
+                self._flush_parquet(pd.concat(self._buffer, ignore_index=True))
+
+            self._rewrite_stale_parquet_shards()
+
+        manifest = self.manifest()
+
+        with open(os.path.join(self.dest, MANIFEST_FILENAME), "w") as file:
+            json.dump(manifest, file, indent=2)
+
+        return manifest
+
+    def manifest(self) -> dict:
+        return {
+            "format": self.format,
+            "shard_rows": self.shard_rows,
+            "total_rows": self.total_rows,
+            "shards": self.shards,
+            **(
+                {"schema": self._parquet_schema()}
+                if self.format == "parquet"
+                else {}
+            ),
+        }
+
+    def _next_shard_name(self):
+        extension = "parquet" if self.format == "parquet" else "ndjson"
+        return f"part-{len(self.shards):05d}.{extension}"
+
+    def _write_ndjson(self, frame: pd.DataFrame):
+        start = 0
+
+        while start < len(frame):
+            if self._file is None:
+                name = self._next_shard_name()
+                self.shards.append({"path": name, "rows": 0})
+                self._file = open(os.path.join(self.dest, name), "w")
+                self._file_rows = 0
+
+            end = start + (self.shard_rows - self._file_rows)
+            chunk = frame.iloc[start:end]
+
+            # Older pandas versions omit the trailing newline
+            lines = chunk.to_json(
+                orient="records", lines=True, date_format="iso"
+            )
+            self._file.write(lines.rstrip("\n") + "\n")
+            self._file_rows += len(chunk)
+            self.shards[-1]["rows"] = self._file_rows
+            start = end
+
+            if self._file_rows >= self.shard_rows:
+                self._close_ndjson_shard()
+
+    def _close_ndjson_shard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_parquet(self, frame: pd.DataFrame):
+        self._buffer.append(frame)
+        self._buffered_rows += len(frame)
+
+        if self._buffered_rows < self.shard_rows:
+            return
+
+        combined = pd.concat(self._buffer, ignore_index=True)
+
+        while len(combined) >= self.shard_rows:
+            self._flush_parquet(combined.iloc[: self.shard_rows])
+            combined = combined.iloc[self.shard_rows :].reset_index(drop=True)
+
+        self._buffer = [combined] if len(combined) > 0 else []
+        self._buffered_rows = len(combined)
+
+    def _update_schema(self, frame: pd.DataFrame) -> pd.DataFrame:
+        "Convert a batch for Parquet and add its columns to the schema"
+        # Parquet requires string column names
+        frame = frame.rename(columns=str)
+        columns = {}
+
+        for column in frame.columns.unique():
+            columns[column], dtype = parquet_column(frame[column])
+            self.schema[column] = merge_dtypes(self.schema.get(column), dtype)
+
+        return pd.DataFrame(columns, index=frame.index)
+
+    def _parquet_schema(self) -> Dict[str, str]:
+        # Columns without any values are written as strings
+        return {
+            column: dtype or "string" for column, dtype in self.schema.items()
+        }
+
+    def _conform(self, frame: pd.DataFrame) -> pd.DataFrame:
+        "Reindex and cast a frame to the current schema"
+        return pd.DataFrame(
+            {
+                column: (
+                    frame[column]
+                    if column in frame.columns
+                    else pd.Series(None, index=frame.index, dtype=object)
+                ).astype(dtype)
+                for column, dtype in self._parquet_schema().items()
+            },
+            index=frame.index,
+        )
+
+    def _flush_parquet(self, frame: pd.DataFrame):
+        name = self._next_shard_name()
+        self._write_parquet_shard(name, frame)
+        self.shards.append({"path": name, "rows": len(frame)})
+        self._buffer = []
+        self._buffered_rows = 0
+
+    def _write_parquet_shard(self, name: str, frame: pd.DataFrame):
+        self._conform(frame).reset_index(drop=True).to_parquet(
+            os.path.join(self.dest, name), index=False
+        )
+        self._shard_schemas[name] = self._parquet_schema()
+
+    def _rewrite_stale_parquet_shards(self):
+        "Rewrite (one at a time) the shards written with an older schema"
+        schema = self._parquet_schema()
+
+        for shard in self.shards:
+            if self._shard_schemas[shard["path"]] != schema:
+                path = os.path.join(self.dest, shard["path"])
+                self._write_parquet_shard(shard["path"], pd.read_parquet(path))
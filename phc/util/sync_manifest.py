@@ -0,0 +1,73 @@
+"""A Python Module for recording the progress of a folder sync"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+MANIFEST_FILE_NAME = ".phc-sync-manifest.json"
+
+
+def md5_checksum(path: str, chunk_size: int = 1024 * 1024) -> str:
+    "Hex MD5 of a local file (read in chunks)"
+    digest = hashlib.md5()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class SyncManifest:
+    """The files transferred by a sync, saved after every transfer so that an
+    interrupted sync can resume without re-transferring (or re-hashing) files
+
+    Entries are keyed by the path relative to the synced folder.
+
+    Parameters
+    ----------
+    path : str
+        The manifest file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.files = {}
+
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.files = json.load(f).get("files", {})
+
+    def get(self, name: str) -> Optional[dict]:
+        return self.files.get(name)
+
+    def record(self, name: str, **entry):
+        with self._lock:
+            self.files[name] = entry
+            self._save()
+
+    def checksum(self, name: str, local_path: str) -> str:
+        """MD5 of a local file, reusing the recorded checksum when the file
+        has not been modified since it was recorded"""
+        stat = os.stat(local_path)
+        entry = self.get(name) or {}
+
+        if (
+            entry.get("md5") is not None
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime") == stat.st_mtime
+        ):
+            return entry["md5"]
+
+        return md5_checksum(local_path)
+
+    def _save(self):
+        # Write then rename so an interrupted write never corrupts the manifest
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"files": self.files}, f, indent=2, sort_keys=True)
+
+        os.replace(tmp_path, self.path)
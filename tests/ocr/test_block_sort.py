@@ -276,3 +276,34 @@ sample = [
 def test_block_sort():
     expected = pd.DataFrame(sample).set_index("Id")
     pd.testing.assert_frame_equal(Block.sort(expected.sample(frac=1)), expected)
+
+
+def test_block_sort_deep_graph_without_recursion():
+    depth = 5000
+    frame = pd.DataFrame(
+        [
+            {
+                "Id": str(i),
+                "BlockType": "PAGE" if i == 0 else "LINE",
+                "Relationships": (
+                    [{"Type": "CHILD", "Ids": [str(i + 1)]}]
+                    if i + 1 < depth
+                    else None
+                ),
+                "Page": 1,
+            }
+            for i in range(depth)
+        ]
+    ).set_index("Id")
+
+    assert Block.sort(frame.sample(frac=1)).index.tolist() == [
+        str(i) for i in range(depth)
+    ]
+
+
+def test_block_parse_lines():
+    frame = Block.parse_lines(
+        [b'{"Id": "a", "BlockType": "PAGE"}\n', b"\n", b'{"Id": "b"}\n']
+    )
+
+    assert frame.Id.tolist() == ["a", "b"]
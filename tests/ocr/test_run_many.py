@@ -0,0 +1,31 @@
+from unittest import mock
+
+import pandas as pd
+
+from phc.easy.ocr import Ocr
+
+
+@mock.patch("phc.easy.ocr.sleep")
+@mock.patch("phc.easy.ocr.Document.get_data_frame")
+@mock.patch("phc.easy.ocr.Ocr.submit")
+@mock.patch("phc.easy.ocr.Auth")
+def test_run_many_polls_pending_ids_until_ready(
+    _Auth, submit, get_data_frame, sleep
+):
+    submit.side_effect = lambda file_id, **_: f"doc-{file_id}"
+    get_data_frame.side_effect = [
+        pd.DataFrame(),
+        pd.DataFrame([{"id": "doc-b"}]),
+        pd.DataFrame([{"id": "doc-a"}]),
+    ]
+
+    documents = list(Ocr.run_many(["a", "b"], initial_wait=1, max_wait=30))
+
+    assert [d["id"] for d in documents] == ["doc-b", "doc-a"]
+    assert sorted(get_data_frame.call_args_list[0].kwargs["ids"]) == [
+        "doc-a",
+        "doc-b",
+    ]
+    assert get_data_frame.call_args_list[2].kwargs["ids"] == ["doc-a"]
+    # Backs off while nothing is ready then resets once documents arrive
+    assert [c.args[0] for c in sleep.call_args_list] == [1, 2, 1]
@@ -0,0 +1,105 @@
+import pandas as pd
+from phc.easy.ocr.suggestion import expand_suggestion_df
+
+from .expand_suggestion import (
+    expand_array_column,
+    expand_conditions,
+    expand_medication_administrations,
+    expand_observations,
+    expand_procedures,
+    frame_for_type,
+)
+
+EMPTY_TYPES = {
+    "observation": {"observationCode": [], "date": [], "value": []},
+    "condition": {
+        "conditionCode": [],
+        "onsetDate": [],
+        "abatementDate": [],
+        "bodySite": [],
+    },
+    "procedure": {
+        "procedureCode": [],
+        "date": [],
+        "endDate": [],
+        "bodySite": [],
+    },
+    "medicationAdministration": {
+        "medicationCode": [],
+        "date": [],
+        "endDate": [],
+        "status": [],
+        "dosage": [],
+    },
+}
+
+
+def suggestion(id: str, **types):
+    return {
+        "id": id,
+        **{t: {**v, **types.get(t, {})} for t, v in EMPTY_TYPES.items()},
+    }
+
+
+sample = pd.DataFrame(
+    [
+        {
+            "suggestions": [
+                suggestion(
+                    "a",
+                    condition={
+                        "conditionCode": [
+                            {
+                                "value": {"code": "c1", "display": "Cond"},
+                                "dataSource": {"source": "comprehend"},
+                                "sourceText": {"text": "cond"},
+                            }
+                        ],
+                        "bodySite": [
+                            [
+                                {"value": {"code": "b1"}},
+                                {"value": {"code": "b2"}},
+                            ]
+                        ],
+                    },
+                    medicationAdministration={
+                        "status": [
+                            {"value": "unknown", "confidence": 0.9},
+                            {"value": "completed", "confidence": 0.8},
+                        ],
+                        "dosage": [{"value": {"id": "0", "route": "po"}}],
+                    },
+                ),
+                suggestion(
+                    "b",
+                    observation={
+                        "date": [
+                            {
+                                "value": "2021-02-21T12:00:00.000Z",
+                                "sourceText": [{"word": "last"}],
+                            }
+                        ]
+                    },
+                ),
+            ],
+            "anchorDate": "2021-02-24T12:58:32.058Z",
+            "version": 4,
+        }
+    ]
+)
+
+
+def test_flattened_suggestions_match_expansion_per_type():
+    expanded = expand_array_column(sample, key="suggestions")
+    expected = pd.concat(
+        [
+            expand_observations(frame_for_type(expanded, "observation")),
+            expand_conditions(frame_for_type(expanded, "condition")),
+            expand_procedures(frame_for_type(expanded, "procedure")),
+            expand_medication_administrations(
+                frame_for_type(expanded, "medicationAdministration")
+            ),
+        ]
+    ).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(expand_suggestion_df(sample), expected)
@@ -1,5 +1,5 @@
 import pandas as pd
-from phc.easy.ocr.suggestion import (expand_array_column,
+from .expand_suggestion import (expand_array_column,
                                      expand_medication_administrations,
                                      frame_for_type)
 
@@ -1,5 +1,5 @@
 import pandas as pd
-from phc.easy.ocr.suggestion import expand_json_and_merge, expand_observations
+from .expand_suggestion import expand_json_and_merge, expand_observations
 
 
 def as_frame(data: dict):
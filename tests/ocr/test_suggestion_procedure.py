@@ -1,5 +1,5 @@
 import pandas as pd
-from phc.easy.ocr.suggestion import (expand_array_column, expand_procedures,
+from .expand_suggestion import (expand_array_column, expand_procedures,
                                      frame_for_type)
 
 sample = expand_array_column(
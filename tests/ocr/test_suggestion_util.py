@@ -1,5 +1,5 @@
 import pandas as pd
-from phc.easy.ocr.suggestion import expand_nested_array_column
+from .expand_suggestion import expand_nested_array_column
 
 
 def test_expand_nested_array_column():
@@ -1,3 +1,9 @@
+from threading import Event, Thread
+
+import jwt
+
+import phc.easy.auth
+from phc.services import Fhir, Files
 from phc.easy.auth import Auth, _shared_auth
 
 
@@ -60,3 +66,55 @@ def test_creating_auth_from_another_auth_object():
 
     auth1 = Auth(auth)
     assert auth1.account == "demo"
+
+
+def test_session_and_clients_are_reused_per_credentials():
+    token = jwt.encode({"iss": "https://api.dev.lifeomic.com/v1"}, "secret")
+    auth = Auth({"token": token, "account": "my-account"})
+    session = auth.session()
+
+    assert Auth(auth).session() is session
+    assert auth.client(Fhir) is Auth(auth).client(Fhir)
+    assert auth.client(Fhir).session is session
+    assert auth.customized({"account": "other"}).session() is not session
+
+    clients = []
+    thread = Thread(target=lambda: clients.append(auth.client(Fhir)))
+    thread.start()
+    thread.join()
+
+    # Each thread gets its own client (with its own event loop)
+    assert clients[0] is not auth.client(Fhir)
+    assert clients[0].session is session
+
+    auth.update({"account": "updated-account"})
+    assert auth.session() is not session
+    assert auth.session().account == "updated-account"
+
+
+def test_clear_cache_forgets_the_clients_of_every_thread():
+    token = jwt.encode({"iss": "https://api.dev.lifeomic.com/v1"}, "secret")
+    auth = Auth({"token": token, "account": "my-account"})
+    created, cleared = Event(), Event()
+    cached = []
+
+    def use_clients():
+        fhir = auth.client(Fhir)
+        auth.client(Files)
+        created.set()
+
+        cleared.wait()
+        cached.append(auth.client(Fhir) is fhir)
+        cached.append(phc.easy.auth._clients.clients.values())
+
+    thread = Thread(target=use_clients)
+    thread.start()
+
+    created.wait()
+    Auth.clear_cache()
+    cleared.set()
+    thread.join()
+
+    assert cached[0] is False
+    # The other client of the thread was forgotten too
+    assert [type(c) for c in cached[1]] == [Fhir]
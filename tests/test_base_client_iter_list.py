@@ -0,0 +1,72 @@
+from unittest.mock import Mock
+
+from phc.services import Files, Tools
+
+
+def page(data):
+    return Mock(data=data)
+
+
+def test_iter_list_follows_next_links_while_prefetching():
+    files = Files(Mock())
+    files._api_call = Mock(
+        side_effect=[
+            page(
+                {
+                    "items": [{"id": "a"}, {"id": "b"}],
+                    "links": {
+                        "next": "https://api/v1/projects/p/files?nextPageToken=t2"
+                    },
+                }
+            ),
+            page({"items": [{"id": "c"}], "links": {"next": None}}),
+        ]
+    )
+
+    items = files.iter_list("p", folder="data", page_size=2)
+
+    assert files._api_call.call_count == 0
+    assert [i["id"] for i in items] == ["a", "b", "c"]
+    assert files._api_call.call_count == 2
+    assert "nextPageToken=t2" in files._api_call.call_args_list[1].args[0]
+
+
+def test_iter_list_without_prefetch_stops_early():
+    files = Files(Mock())
+    files._api_call = Mock(
+        return_value=page(
+            {"items": [{"id": "a"}], "links": {"next": "?nextPageToken=t"}}
+        )
+    )
+
+    items = files.iter_list("p", prefetch=False)
+
+    assert next(items)["id"] == "a"
+    assert files._api_call.call_count == 1
+
+
+def test_iter_list_fans_out_over_prefixes():
+    files = Files(Mock())
+
+    def list_prefix(path, **_):
+        prefix = path.split("prefix=")[-1]
+        return page({"items": [{"id": f"{prefix}-1"}, {"id": f"{prefix}-2"}]})
+
+    files._api_call = Mock(side_effect=list_prefix)
+
+    ids = set(i["id"] for i in files.iter_list("p", prefixes=["x", "y", "z"]))
+
+    assert ids == {"x-1", "x-2", "y-1", "y-2", "z-1", "z-2"}
+
+
+def test_iter_list_of_tools_pages_until_partial_page():
+    tools = Tools(Mock())
+    tools._api_call = Mock(
+        side_effect=[
+            page([{"id": "1"}, {"id": "2"}]),
+            page([{"id": "3"}]),
+        ]
+    )
+
+    assert [t["id"] for t in tools.iter_list(page_size=2)] == ["1", "2", "3"]
+    assert "offset=1" in tools._api_call.call_args_list[1].args[0]
@@ -0,0 +1,100 @@
+import os
+
+import pandas as pd
+from phc.easy.util.api_cache import APICache
+from phc.easy.util.categorical import CategoricalEncoder, concat_frames
+from phc.util.csv_writer import CSVWriter
+
+
+def batch(genes, ids):
+    return pd.DataFrame({"gene": genes, "id": ids})
+
+
+def test_encoding_repetitive_columns():
+    encoder = CategoricalEncoder()
+
+    frame = encoder.encode(
+        batch(["BRCA1", "BRCA1", "TP53", "TP53"], ["1", "2", "3", "4"])
+    )
+
+    assert frame["gene"].dtype == "category"
+    # Unique columns are left alone
+    assert frame["id"].dtype == object
+
+
+def test_categories_are_shared_across_batches():
+    encoder = CategoricalEncoder()
+
+    first = encoder.encode(
+        batch(["BRCA1", "BRCA1", "TP53", "TP53"], ["1", "2", "3", "4"])
+    )
+    second = encoder.encode(batch(["EGFR", "TP53", "EGFR"], ["4", "5", "6"]))
+
+    assert list(second["gene"].cat.categories) == ["BRCA1", "TP53", "EGFR"]
+    # Codes of earlier values don't change
+    assert first["gene"].cat.codes.tolist() == [0, 0, 1, 1]
+    assert second["gene"].cat.codes.tolist() == [2, 1, 2]
+
+    # Columns are encoded in later batches even when not repetitive
+    third = encoder.encode(batch(["KRAS", "NRAS"], ["7", "8"]))
+    assert third["gene"].dtype == "category"
+
+    combined = concat_frames([first, second, third])
+    assert combined["gene"].dtype == "category"
+    assert combined["gene"].tolist() == [
+        "BRCA1",
+        "BRCA1",
+        "TP53",
+        "TP53",
+        "EGFR",
+        "TP53",
+        "EGFR",
+        "KRAS",
+        "NRAS",
+    ]
+
+
+def test_non_string_columns_are_not_encoded():
+    encoder = CategoricalEncoder()
+
+    frame = encoder.encode(
+        pd.DataFrame({"count": [1, 1, 1], "nested": [[1], [1], [1]]})
+    )
+
+    assert frame["count"].dtype == "int64"
+    assert frame["nested"].dtype == object
+
+
+def test_concat_with_missing_columns():
+    first = pd.DataFrame({"gene": pd.Categorical(["TP53"])})
+    second = pd.DataFrame({"other": [1]})
+
+    combined = concat_frames([first, second])
+
+    assert combined["gene"].dtype == "category"
+    assert combined["gene"].isna().tolist() == [False, True]
+
+
+def test_categories_survive_csv_cache(tmp_path):
+    filename = str(tmp_path / "cache.csv")
+    encoder = CategoricalEncoder()
+    writer = CSVWriter(filename)
+
+    writer.write(encoder.encode(batch(["BRCA1", "BRCA1"], ["1", "2"])))
+    writer.write(encoder.encode(batch(["TP53", "TP53"], ["3", "4"])))
+
+    frame = APICache.read_csv(filename)
+
+    assert frame["gene"].dtype == "category"
+    assert frame["gene"].tolist() == ["BRCA1", "BRCA1", "TP53", "TP53"]
+    assert frame["id"].dtype == "int64"
+
+
+def test_stale_categories_are_removed(tmp_path):
+    filename = str(tmp_path / "cache.csv")
+
+    CSVWriter(filename).write(pd.DataFrame({"gene": pd.Categorical(["A"])}))
+    os.remove(filename)
+    CSVWriter(filename).write(pd.DataFrame({"gene": ["A"]}))
+
+    assert CSVWriter.read_categories(filename) == []
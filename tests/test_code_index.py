@@ -0,0 +1,206 @@
+import json
+from unittest import mock
+
+import pandas as pd
+
+from phc.easy.auth import Auth
+from phc.easy.query import Query
+from phc.easy.query.code_index import CodeIndex, code_sources
+
+
+def composite_response(key, buckets):
+    return mock.Mock(data={"aggregations": {key: {"buckets": buckets}}})
+
+
+def code_bucket(display, doc_count):
+    return {"key": {"display": display}, "doc_count": doc_count}
+
+
+def test_search_by_word_prefix_and_substring():
+    index = CodeIndex(
+        "observation",
+        pd.DataFrame(
+            [
+                {
+                    "field": "code.coding",
+                    "display": "Hemoglobin A1c",
+                    "doc_count": 2,
+                },
+                {
+                    "field": "code.coding",
+                    "display": "Hemoglobin",
+                    "doc_count": 5,
+                },
+                {
+                    "field": "code.coding",
+                    "display": "Glucose",
+                    "doc_count": 1,
+                },
+            ]
+        ),
+    )
+
+    assert index.search("hem").display.tolist() == [
+        "Hemoglobin",
+        "Hemoglobin A1c",
+    ]
+    assert index.search("hem a1").display.tolist() == ["Hemoglobin A1c"]
+    assert index.search("lucose").display.tolist() == []
+    assert index.search("lucose", substring=True).display.tolist() == [
+        "Glucose"
+    ]
+
+
+def test_codings_are_not_combined():
+    # The system and code of one coding can't be paired with another's display
+    assert code_sources("code.coding") == [
+        {"display": {"terms": {"field": "code.coding.display.keyword"}}}
+    ]
+
+
+@mock.patch("phc.easy.query.composite_aggregation.execute_single_fhir_dsl")
+def test_index_is_persisted_and_refreshed_incrementally(
+    execute_single_fhir_dsl, tmp_path
+):
+    auth = Auth({"project_id": "project"})
+    execute_single_fhir_dsl.side_effect = [
+        composite_response(
+            "code.coding",
+            [
+                code_bucket("Hemoglobin", 5),
+                code_bucket("Sodium", 3),
+            ],
+        )
+    ]
+
+    with mock.patch("phc.easy.query.code_index.DIR", str(tmp_path)):
+        index = CodeIndex.load("observation", ["code.coding"], auth_args=auth)
+        assert index.codes.doc_count.tolist() == [5, 3]
+
+        # Persisted index is used without another request
+        CodeIndex.load("observation", ["code.coding"], auth_args=auth)
+        assert execute_single_fhir_dsl.call_count == 1
+
+        execute_single_fhir_dsl.side_effect = [
+            # Codes of the updated records
+            composite_response(
+                "code.coding",
+                [code_bucket("Hemoglobin", 1), code_bucket("Glucose", 2)],
+            ),
+            # Counts of those codes in every record
+            composite_response(
+                "code.coding",
+                [
+                    code_bucket("Hemoglobin", 5),
+                    code_bucket("Glucose", 2),
+                    # Other codes of the matching records are ignored
+                    code_bucket("Sodium", 1),
+                ],
+            ),
+        ]
+        index = CodeIndex.load(
+            "observation", ["code.coding"], auth_args=auth, refresh=True
+        )
+
+    updated_query, count_query = [
+        c[0][0] for c in execute_single_fhir_dsl.call_args_list[1:]
+    ]
+    assert "meta.lastUpdated" in updated_query["where"]["query"]["range"]
+    assert count_query["where"]["query"]["bool"]["should"] == [
+        {"terms": {"code.coding.display.keyword": ["Hemoglobin", "Glucose"]}}
+    ]
+
+    # Counts are replaced instead of incremented
+    assert index.search("").set_index("display").doc_count.to_dict() == {
+        "Hemoglobin": 5,
+        "Sodium": 3,
+        "Glucose": 2,
+    }
+
+
+def test_older_index_is_rebuilt(tmp_path):
+    auth = Auth({"project_id": "project"})
+
+    with mock.patch("phc.easy.query.code_index.DIR", str(tmp_path)):
+        filename = CodeIndex.filename_for_table("project", "observation")
+
+        with open(filename, "w") as file:
+            json.dump(
+                {"table_name": "observation", "built_at": 0, "codes": []}, file
+            )
+
+        with mock.patch.object(
+            CodeIndex,
+            "_aggregate",
+            return_value=pd.DataFrame(
+                [{"field": "code.coding", "display": "Glucose", "doc_count": 1}]
+            ),
+        ) as aggregate:
+            index = CodeIndex.load(
+                "observation", ["code.coding"], auth_args=auth
+            )
+
+    assert aggregate.call_count == 1
+    assert index.codes.display.tolist() == ["Glucose"]
+
+
+@mock.patch("phc.easy.query.Query.execute_fhir_dsl")
+def test_get_codes_extracts_codes_of_index_matches(execute_fhir_dsl):
+    index = CodeIndex(
+        "observation",
+        pd.DataFrame(
+            [
+                {
+                    "field": "code.coding",
+                    "display": "Hemoglobin",
+                    "doc_count": 5,
+                },
+                {"field": "code.coding", "display": "Glucose", "doc_count": 1},
+            ]
+        ),
+    )
+    execute_fhir_dsl.return_value = [
+        {
+            "_source": {
+                "code": {
+                    "coding": [
+                        {
+                            "system": "loinc",
+                            "code": "718-7",
+                            "display": "Hemoglobin",
+                        },
+                        {
+                            "system": "loinc",
+                            "code": "2345-7",
+                            "display": "Glucose",
+                        },
+                    ]
+                }
+            }
+        }
+    ]
+
+    with mock.patch.object(CodeIndex, "load", return_value=index) as load:
+        codes = Query.get_codes(
+            "observation",
+            ["code.coding"],
+            display_query="hemo",
+            use_index=True,
+            index_max_age=60,
+        )
+
+    assert load.call_args.kwargs["max_age"] == 60
+
+    query = execute_fhir_dsl.call_args[0][0]
+    assert query["where"]["query"]["bool"]["should"] == [
+        {"terms": {"code.coding.display.keyword": ["Hemoglobin"]}}
+    ]
+    assert codes.to_dict("records") == [
+        {
+            "field": "code.coding",
+            "system": "loinc",
+            "code": "718-7",
+            "display": "Hemoglobin",
+            "doc_count": 5,
+        }
+    ]
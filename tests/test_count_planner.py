@@ -0,0 +1,122 @@
+from unittest import mock
+
+from phc.easy.query import Query
+
+
+def aggregation_response(aggregations):
+    return mock.Mock(data={"aggregations": aggregations})
+
+
+def terms_result(values, sum_other_doc_count=0):
+    return {
+        "sum_other_doc_count": sum_other_doc_count,
+        "buckets": [{"key": k, "doc_count": c} for k, c in values.items()],
+    }
+
+
+@mock.patch("phc.easy.query.composite_aggregation.execute_single_fhir_dsl")
+@mock.patch("phc.easy.query.count_planner.execute_single_fhir_dsl")
+def test_counts_by_fields_plans_terms_and_composite(
+    execute_single_fhir_dsl, execute_composite_page
+):
+    execute_single_fhir_dsl.side_effect = [
+        # Cardinality probe
+        aggregation_response(
+            {
+                "gender": {"value": 2},
+                "status": {"value": 3},
+                "subject.reference": {"value": 5000},
+            }
+        ),
+        # Terms (status turns out to have more values than estimated)
+        aggregation_response(
+            {
+                "gender": terms_result({"male": 3, "female": 4}),
+                "status": terms_result({"final": 1}, sum_other_doc_count=2),
+            }
+        ),
+    ]
+    execute_composite_page.side_effect = lambda query, **_: (
+        aggregation_response(
+            {
+                key: {
+                    "buckets": [
+                        {"key": {"value": f"{key}-value"}, "doc_count": 1}
+                    ]
+                }
+                for key in query["columns"][0]["aggregations"].keys()
+            }
+        )
+    )
+
+    counts = Query.get_counts_by_fields(
+        table_name="observation",
+        fields=["gender", "status", "subject.reference"],
+        terms_threshold=10,
+        auth_args=mock.Mock(),
+    )
+
+    terms_query = execute_single_fhir_dsl.call_args_list[1][0][0]
+    assert list(terms_query["columns"][0]["aggregations"].keys()) == [
+        "gender",
+        "status",
+    ]
+    assert execute_composite_page.call_count == 2
+
+    assert counts["gender"].to_dict("records") == [
+        {"gender": "female", "doc_count": 4},
+        {"gender": "male", "doc_count": 3},
+    ]
+    assert counts["gender"].dtypes.to_dict() == {
+        "gender": "category",
+        "doc_count": "int64",
+    }
+    assert counts["status"][["status"]].astype(str).status.tolist() == [
+        "status-value"
+    ]
+
+
+@mock.patch("phc.easy.query.count_planner.execute_single_fhir_dsl")
+@mock.patch("phc.easy.query.composite_aggregation.execute_single_fhir_dsl")
+def test_count_by_field_pages_composite_aggregation(
+    execute_composite_page, execute_single_fhir_dsl
+):
+    execute_composite_page.side_effect = [
+        aggregation_response(
+            {
+                "gender": {
+                    "buckets": [
+                        {"key": {"value": "male"}, "doc_count": 3},
+                        {"key": {"value": "female"}, "doc_count": 4},
+                    ],
+                    "after_key": {"value": "female"},
+                }
+            }
+        ),
+        aggregation_response(
+            {
+                "gender": {
+                    "buckets": [{"key": {"value": "other"}, "doc_count": 1}]
+                }
+            }
+        ),
+    ]
+
+    frame = Query.get_count_by_field(
+        table_name="patient",
+        field="gender",
+        batch_size=2,
+        max_pages=1,
+        auth_args=mock.Mock(),
+    )
+
+    # No terms request is wasted without a cardinality probe
+    assert execute_single_fhir_dsl.call_count == 0
+    assert execute_composite_page.call_count == 1
+
+    # Buckets are kept in the order returned by the server
+    assert frame.to_dict("records") == [
+        {"gender": "male", "doc_count": 3},
+        {"gender": "female", "doc_count": 4},
+    ]
+    assert frame.gender.dtype == object
@@ -0,0 +1,52 @@
+import json
+from unittest import mock
+
+from phc.easy.dstu3 import DSTU3
+
+
+def fhir_response(data, status_code=200):
+    return mock.Mock(data=data, status_code=status_code)
+
+
+@mock.patch("phc.easy.dstu3.Auth")
+def test_get_decodes_text_or_json_response(Auth):
+    fhir_call = Auth.return_value.client.return_value._fhir_call
+
+    fhir_call.return_value = fhir_response(json.dumps({"id": "a"}))
+    assert DSTU3("Patient").get("a", auth_args=mock.Mock()) == {"id": "a"}
+
+    fhir_call.return_value = fhir_response({"id": "a"})
+    assert DSTU3("Patient").get("a", auth_args=mock.Mock()) == {"id": "a"}
+
+
+@mock.patch("phc.easy.dstu3.Auth")
+def test_put_many_sends_batch_bundles(Auth):
+    fhir_call = Auth.return_value.client.return_value._fhir_call
+    fhir_call.side_effect = lambda path, http_verb, json: fhir_response(
+        {
+            "entry": [
+                {"response": {"status": "200 OK"}, "resource": e["resource"]}
+                for e in json["entry"][:-1]
+            ]
+            + [{"response": {"status": "400 Bad Request", "outcome": "Bad"}}]
+        }
+    )
+
+    outcomes = DSTU3("Patient").put_many(
+        [{"id": str(i), "resourceType": "Patient"} for i in range(5)],
+        bundle_size=2,
+        max_concurrency=1,
+        auth_args=mock.Mock(),
+    )
+
+    assert fhir_call.call_count == 3
+    bundle = fhir_call.call_args_list[0].kwargs["json"]
+    assert bundle["type"] == "batch"
+    assert bundle["entry"][0]["request"] == {
+        "method": "PUT",
+        "url": "Patient/0",
+    }
+
+    assert [o["id"] for o in outcomes] == ["0", "1", "2", "3", "4"]
+    assert [o["ok"] for o in outcomes] == [True, False, True, False, False]
+    assert outcomes[1]["error"] == "Bad"
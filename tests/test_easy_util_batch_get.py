@@ -1,6 +1,6 @@
 from typing import List
 import pandas as pd
-from phc.easy.util.batch import batch_get_frame
+from phc.easy.util.batch import batch_get_frame, iter_frames
 
 
 def transform(ids: List[str], total: int):
@@ -22,3 +22,26 @@ def test_batch_get_frame():
 
 def test_empty_batch():
     assert batch_get_frame([], 2, transform).to_dict("records") == []
+
+
+def test_iter_frames_rechunks_pages():
+    pages = iter([[{"id": "a"}, {"id": "b"}, {"id": "c"}], [{"id": "d"}]])
+
+    frames = list(
+        iter_frames(
+            pages, chunk_rows=2, transform=lambda df: df.assign(n=len(df))
+        )
+    )
+
+    assert [f.to_dict("records") for f in frames] == [
+        [{"id": "a", "n": 2}, {"id": "b", "n": 2}],
+        [{"id": "c", "n": 2}, {"id": "d", "n": 2}],
+    ]
+
+
+def test_iter_frames_is_lazy():
+    def pages():
+        yield [{"id": "a"}]
+        raise AssertionError("Second page should not be requested")
+
+    assert next(iter_frames(pages())).id.tolist() == ["a"]
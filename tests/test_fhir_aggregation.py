@@ -1,3 +1,8 @@
+from unittest import mock
+
+from phc.easy.query.composite_aggregation import (
+    execute_composite_aggregations_concurrently,
+)
 from phc.easy.query.fhir_aggregation import FhirAggregation
 
 SAMPLE_COMPOSITE_RESULT = {
@@ -145,3 +150,50 @@ def test_reduce_composite_results():
             ]
         },
     }
+
+
+def fake_composite_response(query, auth_args):
+    "Serve two pages for 'code.coding' and one page for 'meta.tag'"
+    [(key, agg)] = query["columns"][0]["aggregations"].items()
+    after = agg["composite"].get("after")
+
+    pages = {
+        ("code.coding", None): (["a", "b"], {"value": "b"}),
+        ("code.coding", "b"): (["c"], {"value": "c"}),
+        ("meta.tag", None): (["x"], {"value": "x"}),
+    }
+    values, after_key = pages[(key, after and after["value"])]
+
+    return mock.Mock(
+        data={
+            "aggregations": {
+                key: {
+                    "after_key": after_key,
+                    "buckets": [
+                        {"key": {"value": v}, "doc_count": 1} for v in values
+                    ],
+                }
+            }
+        }
+    )
+
+
+@mock.patch("phc.easy.query.composite_aggregation.execute_single_fhir_dsl")
+def test_execute_composite_aggregations_pages_each_key(execute_single_fhir_dsl):
+    execute_single_fhir_dsl.side_effect = fake_composite_response
+
+    results = execute_composite_aggregations_concurrently(
+        table_name="observation",
+        key_sources_pairs=[
+            ("code.coding", [{"value": {"terms": {"field": "a"}}}]),
+            ("meta.tag", [{"value": {"terms": {"field": "b"}}}]),
+        ],
+        batch_size=2,
+        auth_args=mock.Mock(),
+    )
+
+    assert execute_single_fhir_dsl.call_count == 3
+    assert {
+        key: [b["key"]["value"] for b in value["buckets"]]
+        for key, value in results.items()
+    } == {"code.coding": ["a", "b", "c"], "meta.tag": ["x"]}
@@ -0,0 +1,83 @@
+import math
+
+import pandas as pd
+from phc.easy.util.fhir_date import _parse_with_pandas, parse_fhir_dates
+
+VALUES = pd.Series(
+    [
+        "2020",
+        "2020-02",
+        "2020-02-29",
+        "2020-09-15 12:31:00-0500",
+        "2020-08-08T11:00:00+03:00",
+        "2020-01-01T10:00Z",
+        "2019-12-31T23:59:59.5-08:00",
+        "2021-01-01T00:00:00.123456789+05:30",
+        "2021-02-24T12:58:32.058Z",
+        "0217-05-04 12:31:00-0500",
+        "May 3 2020",
+        None,
+    ]
+)
+
+
+def test_parse_fhir_dates_matches_pandas():
+    parsed = parse_fhir_dates(VALUES)
+    expected = _parse_with_pandas(VALUES)
+
+    pd.testing.assert_series_equal(parsed.utc, expected.utc)
+    pd.testing.assert_series_equal(parsed.local, expected.local)
+    pd.testing.assert_series_equal(parsed.tz, expected.tz)
+
+
+def test_parse_fhir_dates_splits_offset():
+    parsed = parse_fhir_dates(VALUES)
+
+    assert parsed.tz[3] == -5.0
+    assert parsed.local[3] == pd.Timestamp("2020-09-15 12:31:00", tz="utc")
+    assert parsed.utc[3] == pd.Timestamp("2020-09-15 17:31:00", tz="utc")
+
+    assert parsed.tz[7] == 5.5
+    assert parsed.local[7] == pd.Timestamp(
+        "2021-01-01 00:00:00.123456789", tz="utc"
+    )
+
+
+def test_parse_fhir_dates_partial_dates():
+    parsed = parse_fhir_dates(VALUES)
+
+    assert parsed.local[0] == pd.Timestamp("2020-01-01", tz="utc")
+    assert parsed.local[1] == pd.Timestamp("2020-02-01", tz="utc")
+    assert parsed.tz[0] == 0.0
+
+
+def test_parse_fhir_dates_missing_and_out_of_bounds():
+    parsed = parse_fhir_dates(VALUES)
+
+    assert pd.isna(parsed.local[9])
+    assert pd.isna(parsed.local[11])
+    assert math.isnan(parsed.tz[11])
+
+
+def test_parse_fhir_dates_keeps_index():
+    values = pd.Series(["2020-01-01", "2021"], index=[10, 20])
+
+    assert list(parse_fhir_dates(values).local.index) == [10, 20]
+
+
+def test_parse_fhir_dates_with_different_formats_of_the_same_length():
+    values = pd.Series(
+        [
+            "2020-01-01T10:00:00.12",
+            "2020-01-01T10:00+05:00",
+            "2020-01-01T10:00:00.12Z",
+            "2020-01-01T10:00:00.123",
+        ]
+        * 2
+    )
+    parsed = parse_fhir_dates(values)
+    expected = _parse_with_pandas(values)
+
+    pd.testing.assert_series_equal(parsed.utc, expected.utc)
+    pd.testing.assert_series_equal(parsed.local, expected.local)
+    pd.testing.assert_series_equal(parsed.tz, expected.tz)
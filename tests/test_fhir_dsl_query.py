@@ -1,8 +1,8 @@
 import math
 
 import pytest
-from phc.easy.query.fhir_dsl_query import (build_queries, get_limit,
-                                           update_limit)
+from phc.easy.query.fhir_dsl_query import (build_queries, chunk_terms,
+                                           get_limit, update_limit)
 
 
 def test_update_limit_with_base_query():
@@ -470,3 +470,45 @@ def test_add_terms_filter_with_max_for_multiple_chunks():
             }
         },
     ]
+
+
+def test_prefixed_patient_ids_are_not_repeated():
+    result = build_queries({}, patient_ids=["a", "Patient/b"])
+
+    assert result[0]["where"]["query"] == {
+        "terms": {"subject.reference.keyword": ["Patient/a", "Patient/b", "a"]}
+    }
+
+
+def test_chunk_terms_by_bytes():
+    assert chunk_terms(["a" * 10] * 5, max_terms=4, max_bytes=30) == [
+        ["a" * 10] * 2,
+        ["a" * 10] * 2,
+        ["a" * 10],
+    ]
+
+    # Values larger than max_bytes still get their own chunk
+    assert chunk_terms(["a" * 50, "b", "c"], max_terms=4, max_bytes=20) == [
+        ["a" * 50],
+        ["b", "c"],
+    ]
+
+    assert chunk_terms([1, 2, 3], max_terms=2, max_bytes=100) == [[1, 2], [3]]
+    assert chunk_terms([], max_terms=2) == []
+
+
+def test_chunked_queries_share_the_base_query():
+    base = {
+        "where": {
+            "type": "elasticsearch",
+            "query": {"bool": {"must": [{"term": {"a": "b"}}]}},
+        }
+    }
+
+    result = build_queries(base, ids=["1", "2", "3"], max_terms=2)
+
+    assert len(result) == 2
+    assert base["where"]["query"]["bool"]["must"] == [{"term": {"a": "b"}}]
+    assert result[1]["where"]["query"]["bool"]["must"][1] == {
+        "terms": {"id.keyword": ["3"]}
+    }
@@ -3,6 +3,7 @@ import os
 from phc.services import Fhir
 from unittest.mock import patch
 from test_session import jwt, sample
+from phc.util.es_sql_frame import datarows_to_frame, schema_dtypes
 
 
 @patch("phc.base_client.BaseClient._api_call")
@@ -30,3 +31,63 @@ def test_es_sql(mock_api_call):
     assert kwargs["api_path"] == f"fhir-search/sql/projects/{project_id}"
     assert kwargs["json"]["query"] == query
     assert kwargs["json"]["parameters"] == params
+
+
+@patch("phc.base_client.BaseClient._api_call")
+def test_iter_es_sql_follows_cursor(mock_api_call):
+    session = Session(token=jwt.encode(sample, "secret"), account="bar")
+    fhir = Fhir(session)
+
+    mock_api_call.side_effect = [
+        ApiResponseStub({"datarows": [["a"]], "cursor": "next-page"}),
+        ApiResponseStub({"datarows": [["b"]]}),
+    ]
+
+    pages = list(
+        fhir.iter_es_sql(
+            project_id="bar", statement="SELECT id FROM patient", fetch_size=1
+        )
+    )
+
+    assert [p.get("datarows") for p in pages] == [[["a"]], [["b"]]]
+    first_call, second_call = mock_api_call.call_args_list
+    assert first_call.kwargs["json"]["fetch_size"] == 1
+    assert second_call.kwargs["json"] == {"cursor": "next-page"}
+
+
+def test_datarows_to_frame_applies_schema_types():
+    dtypes = schema_dtypes(
+        [
+            {"name": "id", "type": "keyword"},
+            {"name": "count", "type": "long"},
+            {"name": "active", "type": "boolean"},
+            {"name": "date", "type": "timestamp"},
+            {"name": "address", "type": "object"},
+        ]
+    )
+
+    frame = datarows_to_frame(
+        [
+            ["a", 1, True, "2020-01-01 00:00:00", {"city": "x"}],
+            ["b", None, None, None, None],
+        ],
+        dtypes,
+    )
+
+    assert frame.dtypes.astype(str).tolist() == [
+        "string",
+        "Int64",
+        "boolean",
+        "datetime64[ns, UTC]",
+        "object",
+    ]
+    assert frame["count"].isna().tolist() == [False, True]
+    assert datarows_to_frame([], dtypes).columns.tolist() == list(dtypes)
+
+
+class ApiResponseStub:
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
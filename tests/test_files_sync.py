@@ -0,0 +1,105 @@
+import json
+from unittest.mock import Mock
+
+from phc.services import Files
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_sync_up_only_uploads_missing_or_changed_files(tmp_path):
+    write(tmp_path / "same.txt", "abc")
+    write(tmp_path / "changed.txt", "abcdef")
+    write(tmp_path / "sub" / "new.txt", "x")
+
+    files = Files(Mock())
+    files.iter_list = Mock(
+        return_value=[
+            {"id": "1", "name": "run/same.txt", "size": 3},
+            {"id": "2", "name": "run/changed.txt", "size": 3},
+        ]
+    )
+    files.upload = Mock(side_effect=lambda *_, **kw: {"id": kw["file_name"]})
+
+    result = files.sync_up("project", str(tmp_path), prefix="run")
+
+    assert sorted(result["transferred"]) == ["changed.txt", "sub/new.txt"]
+    assert result["skipped"] == ["same.txt"]
+    assert result["failed"] == {}
+    assert sorted(
+        (c.kwargs["file_name"], c.kwargs["overwrite"])
+        for c in files.upload.call_args_list
+    ) == [("run/changed.txt", True), ("run/sub/new.txt", False)]
+
+    manifest = json.loads((tmp_path / ".phc-sync-manifest.json").read_text())
+    assert sorted(manifest["files"].keys()) == ["changed.txt", "sub/new.txt"]
+
+
+def test_sync_down_resumes_from_manifest_with_checksums(tmp_path):
+    remote = [
+        {"id": "a", "name": "run/a.txt", "size": 1},
+        {"id": "b", "name": "run/b.txt", "size": 1},
+        # Matched by the listing prefix but not inside the folder
+        {"id": "c", "name": "runs/c.txt", "size": 1},
+    ]
+    files = Files(Mock())
+    files.iter_list = Mock(return_value=remote)
+
+    def download(file_id, file_path):
+        if file_id == "b":
+            raise OSError("Connection reset")
+        with open(file_path, "w") as f:
+            f.write(file_id)
+        return file_path
+
+    files._download_to = Mock(side_effect=download)
+
+    first = files.sync_down("project", "run", str(tmp_path), compare="checksum")
+
+    assert first["transferred"] == ["a.txt"]
+    assert list(first["failed"].keys()) == ["b.txt"]
+
+    files._download_to = Mock(
+        side_effect=lambda file_id, file_path: download("a", file_path)
+    )
+    second = files.sync_down(
+        "project", "run", str(tmp_path), compare="checksum"
+    )
+
+    assert second["skipped"] == ["a.txt"]
+    assert second["transferred"] == ["b.txt"]
+    assert [c.args[0] for c in files._download_to.call_args_list] == ["b"]
+
+
+def test_sync_down_never_writes_outside_of_local_dir(tmp_path):
+    local_dir = tmp_path / "output"
+    files = Files(Mock())
+    files.iter_list = Mock(
+        return_value=[
+            {"id": "a", "name": "run/a.txt", "size": 1},
+            {"id": "b", "name": "run/../../escaped.txt", "size": 1},
+            {"id": "c", "name": "run/sub/../../../escaped.txt", "size": 1},
+            {"id": "d", "name": "run/..", "size": 1},
+        ]
+    )
+
+    def download(file_id, file_path):
+        with open(file_path, "w") as f:
+            f.write(file_id)
+        return file_path
+
+    files._download_to = Mock(side_effect=download)
+
+    result = files.sync_down("project", "run", str(local_dir))
+
+    assert result["transferred"] == ["a.txt"]
+    assert sorted(result["failed"].keys()) == [
+        "..",
+        "../../escaped.txt",
+        "sub/../../../escaped.txt",
+    ]
+    assert all(isinstance(e, ValueError) for e in result["failed"].values())
+    assert [c.args[0] for c in files._download_to.call_args_list] == ["a"]
+    assert not (tmp_path / "escaped.txt").exists()
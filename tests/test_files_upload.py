@@ -0,0 +1,83 @@
+import gzip
+import io
+from unittest.mock import Mock
+
+import pytest
+
+from phc.services import Files
+
+MIB = 1024 * 1024
+
+
+def make_files():
+    files = Files(Mock())
+    files._api_call = Mock(
+        side_effect=lambda path, **_: {
+            "uploadId": "upload",
+            "uploadUrl": f"https://s3/{path}",
+        }
+    )
+    files._api_call_impl = Mock()
+    return files
+
+
+def uploaded_parts(files):
+    return [
+        c.kwargs["upload_file"] for c in files._api_call_impl.call_args_list
+    ]
+
+
+def test_upload_small_stream_with_single_put():
+    files = make_files()
+
+    files.upload("project", io.BytesIO(b"hello"), file_name="hello.txt")
+
+    assert files._api_call.call_args.args[0] == "files"
+    assert files._api_call.call_args.kwargs["json"]["name"] == "hello.txt"
+    assert uploaded_parts(files) == [b"hello"]
+    assert (
+        files._api_call_impl.call_args.kwargs["headers"]["Content-Length"]
+        == "5"
+    )
+
+
+def test_upload_generator_cuts_fixed_size_parts():
+    files = make_files()
+    chunks = (bytes([i]) * (2 * MIB) for i in range(6))
+
+    files.upload("project", chunks, file_name="data.bin")
+
+    parts = uploaded_parts(files)
+    assert [len(p) for p in parts] == [5 * MIB, 5 * MIB, 2 * MIB]
+    assert b"".join(parts) == b"".join(bytes([i]) * (2 * MIB) for i in range(6))
+    assert [c.args[0] for c in files._api_call.call_args_list] == [
+        "uploads",
+        "uploads/upload/parts/1",
+        "uploads/upload/parts/2",
+        "uploads/upload/parts/3",
+        "uploads/upload",
+    ]
+
+
+def test_upload_async_iterable_and_compressed_stream():
+    async def chunks():
+        for _ in range(3):
+            yield b"a" * (2 * MIB)
+
+    files = make_files()
+    files.upload("project", chunks(), file_name="a.bin")
+    assert [len(p) for p in uploaded_parts(files)] == [5 * MIB, 1 * MIB]
+
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as f:
+        f.write(b"line\n" * 1000)
+    buffer.seek(0)
+
+    files = make_files()
+    files.upload("project", buffer, file_name="lines.gz")
+    assert gzip.decompress(uploaded_parts(files)[0]) == b"line\n" * 1000
+
+
+def test_upload_stream_requires_file_name():
+    with pytest.raises(ValueError):
+        make_files().upload("project", iter([b"abc"]))
@@ -0,0 +1,127 @@
+import pandas as pd
+from phc.easy.condition import Condition
+from phc.easy.observation import Observation
+from phc.easy.util.frame_schema import (
+    STRING_DTYPE,
+    FrameSchema,
+    get_schema,
+    register_schema,
+    SCHEMAS,
+)
+
+RAW_OBSERVATIONS = pd.DataFrame(
+    [
+        {
+            "id": "obs-1",
+            "resourceType": "Observation",
+            "status": "final",
+            "subject": {"reference": "Patient/1"},
+            "code": {
+                "coding": [{"system": "http://loinc.org", "code": "1234-5"}]
+            },
+            "valueQuantity": {
+                "value": 5.4,
+                "unit": "mg/dL",
+                "system": "http://unitsofmeasure.org",
+            },
+            "effectiveDateTime": "2020-09-15T12:31:00-05:00",
+        },
+        {
+            "id": "obs-2",
+            "resourceType": "Observation",
+            "status": "amended",
+            "subject": {"reference": "Patient/2"},
+            "code": {
+                "coding": [{"system": "http://loinc.org", "code": "9876-5"}]
+            },
+            "valueQuantity": {
+                "value": 3,
+                "unit": "mg/dL",
+                "system": "http://unitsofmeasure.org",
+            },
+            "effectiveDateTime": "2021",
+        },
+    ]
+)
+
+
+def test_casting_observations():
+    frame = Observation.transform_results(RAW_OBSERVATIONS)
+    typed = Observation.schema().cast(frame)
+
+    assert typed["id"].dtype == STRING_DTYPE
+    assert typed["status"].dtype == "category"
+    assert typed["subject.reference"].dtype == STRING_DTYPE
+    assert typed["code.coding_system__loinc.org__code"].dtype == "category"
+    assert (
+        typed["valueQuantity.system__unitsofmeasure.org__unit"].dtype
+        == "category"
+    )
+    assert typed["effectiveDateTime.tz"].dtype == "float32"
+    assert typed["effectiveDateTime.tz"][0] == -5.0
+    assert typed["effectiveDateTime.local"][1] == pd.Timestamp(
+        "2021-01-01", tz="UTC"
+    )
+
+    # The original frame is not mutated
+    assert frame["status"].dtype == object
+
+
+def test_date_columns_are_parsed_from_strings():
+    # e.g. when read back from the CSV cache
+    frame = pd.DataFrame({"effectiveDateTime.local": ["2020-09-15 12:31:00"]})
+
+    typed = Observation.schema().cast(frame)
+
+    assert typed["effectiveDateTime.local"][0] == pd.Timestamp(
+        "2020-09-15 12:31:00", tz="UTC"
+    )
+
+
+def test_columns_that_do_not_fit_are_left_alone():
+    frame = pd.DataFrame({"status": [["a", "b"], None], "other": [1, 2]})
+
+    typed = FrameSchema({"status": "category"}).cast(frame)
+
+    assert typed["status"].dtype == object
+    assert typed["other"].dtype == "int64"
+
+
+def test_code_field_patterns_do_not_override_dates():
+    schema = get_schema("condition", Condition.code_fields())
+
+    assert schema.dtype_for("meta.tag_lastUpdated.local") == (
+        "datetime64[ns, UTC]"
+    )
+    assert schema.dtype_for("meta.tag_lastUpdated.tz") == "float32"
+    assert schema.dtype_for("bodySite.coding_system__snomed__code") == (
+        "category"
+    )
+    assert schema.dtype_for("unknown") is None
+
+
+def test_concat_keeps_categories():
+    schema = FrameSchema({"status": "category"})
+
+    frame = schema.concat(
+        [
+            pd.DataFrame({"status": ["final"]}),
+            pd.DataFrame({"status": ["amended", "final"]}),
+        ]
+    )
+
+    assert frame["status"].dtype == "category"
+    assert list(frame["status"]) == ["final", "amended", "final"]
+
+
+def test_register_schema():
+    previous = SCHEMAS.get("goal")
+
+    try:
+        register_schema("goal", FrameSchema({"priority": "category"}))
+        assert get_schema("goal").dtype_for("priority") == "category"
+    finally:
+        if previous is None:
+            del SCHEMAS["goal"]
+        else:
+            SCHEMAS["goal"] = previous
@@ -0,0 +1,108 @@
+from unittest.mock import Mock
+
+from phc.easy.query.ga4gh import (
+    execute_ga4gh_frame,
+    iter_ga4gh_pages,
+    partition_params,
+    recursive_execute_ga4gh,
+)
+from phc.services import Genomics
+
+
+def page(variants, token=""):
+    return Mock(data={"variants": variants, "nextPageToken": token})
+
+
+def search(genomics, params, **kwargs):
+    return iter_ga4gh_pages(
+        genomics, "variants/search", "POST", "variants", params, **kwargs
+    )
+
+
+def test_pages_are_followed_until_an_empty_page():
+    genomics = Genomics(Mock())
+    genomics._ga4gh_call = Mock(
+        side_effect=[
+            page([{"id": "a"}, {"id": "b"}], "t2"),
+            # A capped page size doesn't end the search
+            page([{"id": "c"}], "t3"),
+            page([], "t4"),
+        ]
+    )
+
+    pages = list(search(genomics, {"variantSetIds": ["v"]}, scroll=True))
+
+    assert pages == [[{"id": "a"}, {"id": "b"}], [{"id": "c"}], []]
+    assert genomics._ga4gh_call.call_count == 3
+
+    first, second, _ = genomics._ga4gh_call.call_args_list
+    assert first.kwargs["json"]["pageSize"] == 1000
+    assert first.kwargs["json"]["pageToken"] is None
+    assert second.kwargs["json"]["pageToken"] == "t2"
+
+
+def test_sample_is_one_page():
+    genomics = Genomics(Mock())
+    genomics._ga4gh_call = Mock(return_value=page([{"id": "a"}], "t2"))
+
+    pages = list(search(genomics, {"variantSetIds": ["v1", "v2"]}))
+
+    assert pages == [[{"id": "a"}]]
+    assert genomics._ga4gh_call.call_args.kwargs["json"]["pageSize"] == 50
+
+
+def test_variant_sets_are_paged_concurrently():
+    genomics = Genomics(Mock())
+
+    def variants(path, json, **_):
+        [variant_set_id] = json["variantSetIds"]
+
+        if json["pageToken"] is None:
+            return page([{"id": f"{variant_set_id}-1"}], "next")
+
+        return page([])
+
+    genomics._ga4gh_call = Mock(side_effect=variants)
+
+    frame = execute_ga4gh_frame(
+        genomics,
+        "variants/search",
+        "POST",
+        "variants",
+        {"variantSetIds": ["x", "y", "z"]},
+        scroll=True,
+        page_size=10,
+    )
+
+    assert sorted(frame["id"]) == ["x-1", "y-1", "z-1"]
+    assert genomics._ga4gh_call.call_count == 6
+
+
+def test_partition_params():
+    assert partition_params(
+        {"datasetIds": ["p"], "variantSetIds": ["a", "b"]}
+    ) == [
+        {"datasetIds": ["p"], "variantSetIds": ["a"]},
+        {"datasetIds": ["p"], "variantSetIds": ["b"]},
+    ]
+    assert partition_params({"datasetIds": ["p"]}) == [{"datasetIds": ["p"]}]
+
+
+def test_recursive_execute_ga4gh_keeps_previous_behavior():
+    genomics = Genomics(Mock())
+    genomics._ga4gh_call = Mock(
+        side_effect=[page([{"id": "a"}], "t2"), page([{"id": "b"}], "")]
+    )
+
+    results = recursive_execute_ga4gh(
+        auth=None,
+        client=genomics,
+        path="variants/search",
+        http_verb="POST",
+        results_key="variants",
+        params={"variantSetIds": ["v"]},
+        scroll=True,
+    )
+
+    assert results == [{"id": "a"}, {"id": "b"}]
+    assert genomics._ga4gh_call.call_args.kwargs["json"]["pageSize"] == 50
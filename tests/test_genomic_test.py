@@ -3,6 +3,7 @@ from unittest.mock import ANY
 from math import nan
 
 import pandas as pd
+from phc.easy.frame import Frame
 from phc.easy.omics.genomic_test import GenomicTest
 
 raw_df = pd.DataFrame(
@@ -179,3 +180,68 @@ def test_get_data_frame(execute_paging_api):
     ]
 
     assert frame.setType.unique().tolist() == ["expression", "shortVariant"]
+
+
+@mock.patch("phc.easy.query.Query.iter_paging_api")
+def test_iter_data_frames(iter_paging_api):
+    iter_paging_api.return_value = iter(
+        [raw_df.iloc[0:2].to_dict("records"), raw_df.iloc[2:].to_dict("records")]
+    )
+
+    frames = list(
+        GenomicTest.iter_data_frames(
+            patient_id=None, status="ACTIVE", test_type="shortVariant"
+        )
+    )
+
+    iter_paging_api.assert_called_once_with(
+        "genomics/projects/{project_id}/tests",
+        {"patientId": None, "status": "ACTIVE", "type": "shortVariant"},
+        all_results=True,
+        response_to_items=ANY,
+    )
+
+    assert [len(f) for f in frames] == [1, 1]
+    assert frames[0].setType.unique().tolist() == ["shortVariant"]
+
+
+
+
+def test_tests_without_matching_sets_are_dropped():
+    df = raw_df.set_index(pd.Index([5, 7, 9])).assign(
+        sets=[raw_df.sets[0], [], raw_df.sets[2]]
+    )
+
+    frame = GenomicTest.transform_results(df, params={})
+
+    assert frame["id.test"].tolist() == [raw_df.id[0], raw_df.id[2]]
+    assert frame["patient.name_text"].tolist()[1] == "A7A3RF LO"
+
+    assert (
+        len(GenomicTest.transform_results(df, params={"type": "copyNumber"}))
+        == 0
+    )
+
+
+def test_columns_of_tests_without_sets_are_kept():
+    body_site = {"coding": [{"system": "s", "code": "c", "display": "Breast"}]}
+    df = raw_df.assign(
+        sets=[[], raw_df.sets[1], raw_df.sets[2]],
+        bodySite=[body_site, nan, nan],
+    )
+
+    frame = GenomicTest.transform_results(df, params={})
+
+    # Test columns are in the same order as expanding the whole page
+    tests = Frame.expand(
+        df,
+        code_columns=["bodySite", "patient"],
+        custom_columns=[Frame.codeable_like_column_expander("sourceFile")],
+    ).drop(["sets"], axis=1)
+    set_columns = frame.columns[: -len(tests.columns)]
+
+    assert len(frame) == 2
+    assert frame.columns[-len(tests.columns) :].tolist() == [
+        f"{c}.test" if c in set_columns else c for c in tests.columns
+    ]
+    assert any(c.startswith("bodySite.") for c in frame.columns)
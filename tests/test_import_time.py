@@ -0,0 +1,68 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["pandas", "numpy", "pydantic", "phc.services.patient_ml"]
+
+
+def imported_modules(code: str):
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, json; {code}; print(json.dumps(list(sys.modules)))",
+        ]
+    )
+    return set(json.loads(output.decode().splitlines()[-1]))
+
+
+def test_importing_the_sdk_does_not_import_heavy_dependencies():
+    modules = imported_modules(
+        "import phc, phc.easy, phc.services; "
+        "phc.easy.Auth; phc.services.Files; phc.services.Fhir"
+    )
+
+    assert [m for m in HEAVY_MODULES if m in modules] == []
+
+
+def test_lazy_names_are_imported_on_first_access():
+    import phc.easy
+    import phc.services
+
+    assert phc.easy.Patient.table_name() == "patient"
+    assert phc.services.IngestionStep.__module__ == (
+        "phc.services.genomic_ingestions"
+    )
+    assert "Patient" in dir(phc.easy)
+    assert "services" in dir(__import__("phc"))
+
+
+def test_every_module_can_be_imported_first():
+    "Each module is imported as if it were the first phc import (no cycles)"
+    script = """
+import importlib, json, pkgutil, sys, traceback
+import phc
+
+names = [m.name for m in pkgutil.walk_packages(phc.__path__, "phc.")]
+failures = {}
+
+for name in names:
+    # Forget every phc module so this one is imported first
+    for loaded in [m for m in sys.modules if m.split(".")[0] == "phc"]:
+        del sys.modules[loaded]
+    try:
+        importlib.import_module(name)
+    except ModuleNotFoundError as e:
+        # Optional dependencies that aren't installed
+        if not (e.name or "").startswith("phc"):
+            continue
+        failures[name] = traceback.format_exc()
+    except Exception:
+        failures[name] = traceback.format_exc()
+
+print(json.dumps(failures))
+"""
+    output = subprocess.check_output([sys.executable, "-c", script])
+    failures = json.loads(output.decode().splitlines()[-1])
+
+    assert failures == {}, "\n".join(failures.values())
@@ -0,0 +1,75 @@
+from unittest.mock import Mock, patch
+
+from phc.services import Tasks
+
+
+def page(tasks, next_page_token=None):
+    response = Mock(data={"tasks": tasks, "nextPageToken": next_page_token})
+    response.get = response.data.get
+    return response
+
+
+@patch("phc.util.job_watcher.time.sleep")
+def test_watch_tasks_through_list_pages(sleep):
+    tasks = Tasks(Mock())
+    tasks._api_call = Mock(
+        side_effect=[
+            # First poll: both tasks running (across two pages)
+            page([{"id": "a", "state": "RUNNING"}], next_page_token="2"),
+            page([{"id": "b", "state": "QUEUED"}]),
+            # Second poll: nothing changed
+            page([{"id": "a", "state": "RUNNING"}], next_page_token="2"),
+            page([{"id": "b", "state": "RUNNING"}]),
+            # Third poll: "a" completes ("b" is found on the first page)
+            page(
+                [
+                    {"id": "a", "state": "COMPLETE"},
+                    {"id": "b", "state": "RUNNING"},
+                ],
+                next_page_token="2",
+            ),
+            # Fourth poll: "b" fails
+            page([{"id": "b", "state": "EXECUTOR_ERROR"}]),
+        ]
+    )
+    on_complete = Mock()
+
+    results = tasks.watch(
+        "project", ["a", "b"], initial_interval=1, backoff_factor=2
+    ).wait(on_complete=on_complete)
+
+    assert {k: v["state"] for k, v in results.items()} == {
+        "a": "COMPLETE",
+        "b": "EXECUTOR_ERROR",
+    }
+    assert [c.args[0] for c in on_complete.call_args_list] == ["a", "b"]
+    assert tasks._api_call.call_count == 6
+    assert "view=MINIMAL" in tasks._api_call.call_args_list[0].args[0]
+    assert [c.args[0] for c in sleep.call_args_list] == [2, 4, 1]
+
+
+def test_jobs_missing_from_the_list_are_fetched_on_their_own():
+    tasks = Tasks(Mock())
+    tasks._api_call = Mock(
+        side_effect=[
+            # First poll: "old" is not on any page
+            page([{"id": "a", "state": "RUNNING"}], next_page_token="2"),
+            page([{"id": "other", "state": "COMPLETE"}]),
+            # Second poll: stops at the first page since "a" is there
+            page([{"id": "a", "state": "COMPLETE"}], next_page_token="2"),
+        ]
+    )
+    tasks.get = Mock(
+        side_effect=[
+            Mock(data={"id": "old", "state": "RUNNING"}),
+            Mock(data={"id": "old", "state": "COMPLETE"}),
+        ]
+    )
+
+    watcher = tasks.watch("project", ["a", "old"])
+
+    assert watcher.poll() == []
+    assert [job_id for job_id, _ in watcher.poll()] == ["a", "old"]
+    assert tasks._api_call.call_count == 3
+    assert tasks.get.call_count == 2
+    assert watcher.pending == set()
@@ -0,0 +1,156 @@
+import json
+import time
+from unittest import mock
+
+import jwt
+import pandas as pd
+import pytest
+
+from phc.easy.auth import Auth
+from phc.easy.projects import Project, ProjectCatalog
+
+PROJECTS = pd.DataFrame(
+    [
+        {
+            "id": "p-1",
+            "name": "Breast Cancer Study",
+            "description": "Tumor samples",
+            "account": "research",
+        },
+        {
+            "id": "p-2",
+            "name": "Cardiology",
+            "description": None,
+            "account": "clinic",
+        },
+    ]
+)
+
+
+@pytest.fixture
+def catalog_files(tmp_path):
+    ProjectCatalog.clear_cache()
+
+    def filename_for_auth(auth, account=None):
+        return str(tmp_path / f"{account or 'all'}.json")
+
+    with mock.patch.object(
+        ProjectCatalog, "filename_for_auth", side_effect=filename_for_auth
+    ):
+        yield tmp_path
+
+    ProjectCatalog.clear_cache()
+
+
+def test_search_by_name_description_and_id():
+    catalog = ProjectCatalog(PROJECTS)
+
+    assert catalog.search("cancer").id.tolist() == ["p-1"]
+    assert catalog.search("TUMOR").id.tolist() == ["p-1"]
+    assert catalog.search("p-2").id.tolist() == ["p-2"]
+    assert catalog.search("p-").id.tolist() == ["p-1", "p-2"]
+    # Missing values are not searched
+    assert catalog.search("none").id.tolist() == []
+    # The search is not a regular expression
+    assert catalog.search("c.rdiology").id.tolist() == []
+
+
+def test_catalog_is_persisted_across_processes(catalog_files):
+    with mock.patch.object(
+        Project, "_list_projects", return_value=PROJECTS
+    ) as list_projects:
+        assert len(Project.get_data_frame(auth_args=Auth())) == 2
+
+        # Another process reads the catalog from disk
+        ProjectCatalog.clear_cache()
+        assert Project.get_data_frame(auth_args=Auth()).id.tolist() == [
+            "p-1",
+            "p-2",
+        ]
+
+        # The catalog of all accounts is used for one account
+        assert Project.get_data_frame(
+            auth_args=Auth(), account="clinic"
+        ).id.tolist() == ["p-2"]
+
+        assert list_projects.call_count == 1
+
+    with open(catalog_files / "all.json") as file:
+        assert len(json.load(file)["projects"]) == 2
+
+
+def test_stale_catalog_is_refreshed(catalog_files):
+    ProjectCatalog(
+        PROJECTS,
+        built_at=time.time() - 7200,
+        filename=str(catalog_files / "all.json"),
+    ).write()
+
+    with mock.patch.object(
+        Project, "_list_projects", return_value=PROJECTS.iloc[:1]
+    ) as list_projects:
+        assert len(ProjectCatalog.load(Auth()).projects) == 1
+        assert len(ProjectCatalog.load(Auth(), max_age=None).projects) == 1
+        assert list_projects.call_count == 1
+
+
+def test_find_refreshes_cached_catalog_on_miss(catalog_files):
+    ProjectCatalog(PROJECTS, filename=str(catalog_files / "all.json")).write()
+    auth = Auth({"account": "other"})
+
+    new_project = pd.DataFrame(
+        [{"id": "p-3", "name": "Oncology", "account": "research"}]
+    )
+
+    with mock.patch.object(
+        Project,
+        "_list_projects",
+        return_value=pd.concat([PROJECTS, new_project]),
+    ) as list_projects:
+        matches = Project.set_current("oncology", auth=auth)
+
+        assert matches.id.tolist() == ["p-3"]
+        assert auth.project_id == "p-3"
+        assert auth.account == "research"
+        assert list_projects.call_count == 1
+
+        assert len(Project.find("unknown")) == 0
+        # Only listed again once per miss
+        assert list_projects.call_count == 2
+
+
+def test_projects_of_accounts_are_listed_concurrently():
+    auth = Auth()
+
+    def get_data_frame(auth_args, **kwargs):
+        return pd.DataFrame([{"id": f"{auth_args.account}-project"}])
+
+    with mock.patch.object(
+        Auth, "accounts", return_value=[{"id": "a"}, {"id": "b"}]
+    ), mock.patch(
+        "phc.easy.abstract.paging_api_item.PagingApiItem.get_data_frame",
+        side_effect=get_data_frame,
+    ):
+        projects = Project._list_projects(auth, max_concurrency=2)
+
+    assert projects.id.tolist() == ["a-project", "b-project"]
+    assert projects.account.tolist() == ["a", "b"]
+
+
+def test_catalog_filename_is_per_user():
+    def auth_for(sub):
+        return Auth(
+            {
+                "token": jwt.encode(
+                    {"iss": "https://api.dev.lifeomic.com/v1", "sub": sub},
+                    "secret",
+                ),
+                "account": "my-account",
+            }
+        )
+
+    first = ProjectCatalog.filename_for_auth(auth_for("user-1"))
+
+    assert first == ProjectCatalog.filename_for_auth(auth_for("user-1"))
+    assert first != ProjectCatalog.filename_for_auth(auth_for("user-2"))
+    assert "project_catalog_all_" in first
@@ -0,0 +1,130 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from phc import Session
+from phc.replay_adapter import RecordingAdapter, ReplayAdapter
+from phc.services import Files
+
+API = "https://api.us.lifeomic.com/v1"
+
+
+def send(adapter, http_verb, url, **req_args):
+    return asyncio.run(
+        adapter.send(
+            http_verb=http_verb,
+            api_url=url,
+            req_args=req_args,
+            trust_env=False,
+            timeout=30,
+        )
+    )
+
+
+@mock.patch(
+    "phc.base_client.BaseClient._get_user_agent", return_value="phc-sdk-py"
+)
+def test_replays_pages_in_order_for_service_clients(_get_user_agent):
+    adapter = (
+        ReplayAdapter()
+        .add(
+            "GET",
+            f"{API}/projects/p/files?pageSize=1",
+            {"items": [{"id": "a"}], "links": {"next": "?nextPageToken=t"}},
+        )
+        .add(
+            "GET",
+            f"{API}/projects/p/files?nextPageToken=t&pageSize=1",
+            {"items": [{"id": "b"}], "links": {}},
+        )
+    )
+    files = Files(Session(adapter=adapter))
+
+    ids = [f["id"] for f in files.iter_list("p", page_size=1)]
+
+    assert ids == ["a", "b"]
+    assert adapter.stats["requests"] == 2
+
+    with pytest.raises(ValueError):
+        files.get_list("p", page_size=1)
+
+
+def test_recorded_cassettes_can_be_replayed(tmp_path):
+    source = ReplayAdapter().add(
+        "POST",
+        f"{API}/fhir-search/projects/p",
+        {"hits": []},
+        params={"scroll": "true"},
+    )
+    recorder = RecordingAdapter(str(tmp_path / "cassette.json"), source)
+
+    send(
+        recorder,
+        "POST",
+        f"{API}/fhir-search/projects/p",
+        params={"scroll": "true"},
+    )
+    recorder.save()
+
+    replay = ReplayAdapter(str(tmp_path), repeat=True)
+    for _ in range(2):
+        res = send(
+            replay,
+            "POST",
+            # Hosts are ignored when matching
+            "https://api.dev.lifeomic.com/v1/fhir-search/projects/p",
+            params={"scroll": "true"},
+        )
+        assert res["data"] == {"hits": []}
+
+
+@mock.patch("phc.replay_adapter.asyncio.sleep", new_callable=mock.AsyncMock)
+def test_latency_bandwidth_and_error_injection(sleep):
+    adapter = ReplayAdapter(latency=0.5, bandwidth=100).add(
+        "GET", f"{API}/files/a", "x" * 100
+    )
+
+    assert send(adapter, "GET", f"{API}/files/a")["data"] == "x" * 100
+    assert sleep.call_args.args[0] == pytest.approx(1.5)
+
+    # Presigned uploads are accepted without a recording
+    assert (
+        send(adapter, "PUT", "https://s3/upload", data=b"1234")["status_code"]
+        == 200
+    )
+    assert adapter.stats["bytes_sent"] == 4
+
+    failing = ReplayAdapter(error_rate=1)
+    assert send(failing, "GET", f"{API}/files/a")["status_code"] == 503
+
+    with pytest.raises(ConnectionResetError):
+        send(ReplayAdapter(error_rate=1, error_status=None), "GET", f"{API}/x")
+
+
+def test_seeded_errors_and_stats_do_not_depend_on_threads():
+    urls = [f"{API}/files/{i}" for i in range(200)]
+
+    def failed_urls(max_workers):
+        adapter = ReplayAdapter(error_rate=0.5, seed=7)
+        for url in urls:
+            adapter.add("GET", url, "x")
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            failed = list(
+                executor.map(
+                    lambda url: send(adapter, "GET", url)["status_code"] == 503,
+                    urls,
+                )
+            )
+
+        assert adapter.stats["requests"] == len(urls)
+        assert adapter.stats["errors"] == sum(failed)
+        assert adapter.stats["bytes_received"] == len(urls) - sum(failed)
+        return [url for url, f in zip(urls, failed) if f]
+
+    failed = failed_urls(1)
+
+    assert 0 < len(failed) < len(urls)
+    assert failed_urls(16) == failed
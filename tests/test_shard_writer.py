@@ -0,0 +1,170 @@
+import json
+import os
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from phc.easy.query import Query
+from phc.util.shard_writer import ShardWriter
+
+
+def read_ndjson_shard(dest, shard):
+    return pd.read_json(os.path.join(dest, shard["path"]), lines=True)
+
+
+def test_ndjson_shards_rotate_on_row_count(tmp_path):
+    writer = ShardWriter(str(tmp_path), format="ndjson", shard_rows=3)
+
+    writer.write(pd.DataFrame({"id": ["a", "b"]}))
+    writer.write(pd.DataFrame({"id": ["c", "d", "e", "f", "g"]}))
+    manifest = writer.close()
+
+    assert manifest["total_rows"] == 7
+    assert [s["rows"] for s in manifest["shards"]] == [3, 3, 1]
+    assert [
+        read_ndjson_shard(tmp_path, s).id.tolist() for s in manifest["shards"]
+    ] == [["a", "b", "c"], ["d", "e", "f"], ["g"]]
+
+    with open(tmp_path / "manifest.json") as file:
+        assert json.load(file) == manifest
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError):
+        ShardWriter(str(tmp_path), format="csv")
+
+
+def hits_response(ids, total):
+    return mock.Mock(
+        data={
+            "_scroll_id": "next",
+            "hits": {
+                "total": {"value": total},
+                "hits": [{"_source": {"id": i}} for i in ids],
+            },
+        }
+    )
+
+
+@mock.patch("phc.easy.query.fhir_dsl.execute_single_fhir_dsl")
+def test_export_fhir_dsl_streams_pages_to_shards(
+    execute_single_fhir_dsl, tmp_path
+):
+    execute_single_fhir_dsl.side_effect = [
+        hits_response(["a", "b"], 3),
+        hits_response(["c"], 3),
+        hits_response([], 3),
+    ]
+
+    manifest = Query.export_fhir_dsl(
+        {"type": "select", "columns": "*", "from": [{"table": "patient"}]},
+        str(tmp_path),
+        format="ndjson",
+        shard_rows=2,
+        transform=lambda df: df.assign(upper=df.id.str.upper()),
+        auth_args=mock.Mock(),
+    )
+
+    assert execute_single_fhir_dsl.call_count == 3
+    assert [s["rows"] for s in manifest["shards"]] == [2, 1]
+    assert read_ndjson_shard(tmp_path, manifest["shards"][1]).to_dict(
+        "records"
+    ) == [{"id": "c", "upper": "C"}]
+
+
+@pytest.fixture
+def fake_parquet():
+    "Store parquet shards as pickles (pyarrow is an optional dependency)"
+
+    def to_parquet(frame, path, index=True):
+        frame.to_pickle(path)
+
+    with mock.patch.object(
+        pd.DataFrame, "to_parquet", to_parquet
+    ), mock.patch.object(pd, "read_parquet", pd.read_pickle):
+        yield
+
+
+def read_parquet_shards(dest, manifest):
+    return [
+        pd.read_parquet(os.path.join(dest, s["path"]))
+        for s in manifest["shards"]
+    ]
+
+
+def test_parquet_shards_share_a_schema(tmp_path, fake_parquet):
+    writer = ShardWriter(str(tmp_path), format="parquet", shard_rows=2)
+
+    writer.write(pd.DataFrame({"id": ["a", "b"], "value": [1, 2]}))
+    writer.write(
+        pd.DataFrame(
+            {"id": ["c"], "value": [1.5], "code": [{"coding": [{"code": "x"}]}]}
+        )
+    )
+    writer.write(pd.DataFrame({"id": ["d"], "value": [None]}))
+    manifest = writer.close()
+
+    assert manifest["schema"] == {
+        "id": "string",
+        "value": "float64",
+        "code": "string",
+    }
+
+    first, second = read_parquet_shards(tmp_path, manifest)
+
+    for shard in [first, second]:
+        assert shard.dtypes.astype(str).to_dict() == manifest["schema"]
+
+    assert first.value.tolist() == [1.0, 2.0]
+    assert json.loads(second.code[0]) == {"coding": [{"code": "x"}]}
+    assert second.code.isna().tolist() == [False, True]
+
+
+def scroll_response(sources, total):
+    return mock.Mock(
+        data={
+            "_scroll_id": "next",
+            "hits": {
+                "total": {"value": total},
+                "hits": [{"_source": source} for source in sources],
+            },
+        }
+    )
+
+
+@mock.patch("phc.easy.query.fhir_dsl.execute_single_fhir_dsl")
+def test_entity_export_of_raw_pages_has_one_schema(
+    execute_single_fhir_dsl, tmp_path, fake_parquet
+):
+    from phc.easy.observation import Observation
+
+    execute_single_fhir_dsl.side_effect = [
+        scroll_response([{"id": "a", "status": "final"}], 2),
+        scroll_response(
+            [
+                {
+                    "id": "b",
+                    "valueQuantity": {"value": 4.2, "unit": "g/dL"},
+                    "meta": {"tag": [{"system": "s", "code": "c"}]},
+                }
+            ],
+            2,
+        ),
+        scroll_response([], 2),
+    ]
+
+    manifest = Observation.export(
+        str(tmp_path), shard_rows=1, raw=True, auth_args=mock.Mock()
+    )
+
+    first, second = read_parquet_shards(tmp_path, manifest)
+
+    assert [s["rows"] for s in manifest["shards"]] == [1, 1]
+    assert list(first.columns) == list(second.columns)
+    assert (first.dtypes == second.dtypes).all()
+    assert json.loads(second.valueQuantity[0]) == {
+        "value": 4.2,
+        "unit": "g/dL",
+    }
+    assert first.valueQuantity.isna().all()